@@ -0,0 +1,91 @@
+"""
+Deterministic Fake LLM
+
+A LangChain chat model that answers every agent prompt in the format the
+agent parses (category name, YES/NO, score triples, judge JSON, waste score,
+prose summaries), derived from a hash of the input so runs are repeatable.
+Latency is configurable to model provider round-trips without a network.
+"""
+
+import asyncio
+import json
+import time
+import zlib
+from typing import Any, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+from src.agents import CATEGORIES
+from src.prompts import count_tokens
+
+RELEVANT_PERCENT = 70  # Share of articles the relevance gate passes
+TARGET_CATEGORY_PERCENT = 80  # Share of LLM categorizations that pick the target category
+
+
+class FakeLLM(BaseChatModel):
+    """
+    Fake chat model for benchmarks.
+
+    Attributes:
+        latency: Seconds slept per call (asyncio.sleep for async calls)
+        category: Category most categorization calls answer with (None = hash-spread)
+    """
+
+    latency: float = 0.0
+    category: Optional[str] = None
+    model_name: str = 'fake-llm'
+
+    @property
+    def _llm_type(self) -> str:
+        return 'fake-llm'
+
+    def _respond(self, messages: List[BaseMessage]) -> AIMessage:
+        system = next((str(m.content) for m in messages if m.type == 'system'), '')
+        human = str(messages[-1].content) if messages else ''
+        text = fake_response(system, human, self.category)
+        prompt_tokens = sum(count_tokens(str(m.content)) for m in messages)
+        output_tokens = count_tokens(text)
+        return AIMessage(content=text, usage_metadata={
+            'input_tokens': prompt_tokens,
+            'output_tokens': output_tokens,
+            'total_tokens': prompt_tokens + output_tokens,
+        })
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Any = None, **kwargs) -> ChatResult:
+        if self.latency:
+            time.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager: Any = None, **kwargs) -> ChatResult:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+
+def fake_response(system: str, human: str, category: Optional[str] = None) -> str:
+    """
+    Answer in the format each agent prompt asks for.
+    """
+    h = zlib.crc32(human.encode('utf-8'))
+    if system.startswith('Categorize articles'):
+        if category and h % 100 < TARGET_CATEGORY_PERCENT:
+            return category
+        return CATEGORIES[h % len(CATEGORIES)]
+    if 'JSON object' in system:
+        return json.dumps({
+            'relevant': 'YES' if h % 100 < RELEVANT_PERCENT else 'NO',
+            'novelty': 5 + h % 5, 'practical': 4 + h % 6, 'significance': 5 + h % 5, 'waste': h % 8,
+        })
+    if 'YES or NO' in human:
+        return 'YES' if h % 100 < RELEVANT_PERCENT else 'NO'
+    if 'three numbers separated by commas' in human:
+        return f"{5 + h % 5},{4 + h % 6},{5 + h % 5}"
+    if 'number 0-10' in human:
+        return str(h % 8)
+    # Summaries, chunk notes, jokes, refreshers: short deterministic prose from the input
+    words = [word for word in human.split() if word.isalpha()][:60]
+    return ' '.join(words) or 'No content.'
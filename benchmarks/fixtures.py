@@ -0,0 +1,168 @@
+"""
+Benchmark Fixtures
+
+Recorded articles (benchmarks/fixtures/seed_articles.json) are expanded into
+a synthetic corpus of any size and rendered in each source's wire format
+(RSS 2.0, arXiv Atom, Hacker News JSON, article HTML), so the real fetchers
+and scrapers parse exactly what they would parse in production.
+
+Re-record the seed from live sources with:
+    python -m benchmarks.run_benchmarks --record
+"""
+
+import json
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from pathlib import Path
+from typing import Dict, List
+from xml.sax.saxutils import escape
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+SEED_FILE = FIXTURES_DIR / 'seed_articles.json'
+
+# Share of the corpus served by each source type (RSS takes the rest)
+ARXIV_SHARE = 0.2
+HN_SHARE = 0.1
+HN_MAX_STORIES = 150  # fetch_all_articles() only reads the first 150 top stories
+DUPLICATE_RATE = 0.05  # Same story re-syndicated with tracking params (exercises dedup)
+LONG_FORM_EVERY = 4  # Every Nth article body is repeated to exercise map-reduce summarization
+LONG_FORM_REPEAT = 8
+
+
+def load_seed(path: Path = SEED_FILE) -> Dict[str, List[dict]]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def build_corpus(size: int, seed: Dict[str, List[dict]], random_seed: int = 42) -> Dict[str, List[dict]]:
+    """
+    Expand seed records into `size` articles split across source types.
+
+    Returns:
+        {'rss': [...], 'arxiv': [...], 'hn': [...]} with unique ids, titles and
+        publish times inside the fetchers' 7-day window
+    """
+    rng = random.Random(random_seed)
+    now = datetime.now(timezone.utc)
+    counts = {
+        'arxiv': int(size * ARXIV_SHARE),
+        'hn': min(int(size * HN_SHARE), HN_MAX_STORIES),
+    }
+    counts['rss'] = size - counts['arxiv'] - counts['hn']
+
+    corpus = {}
+    next_id = 0
+    for kind, count in counts.items():
+        records = []
+        for i in range(count):
+            template = seed[kind][i % len(seed[kind])]
+            if records and rng.random() < DUPLICATE_RATE:
+                duplicate = dict(rng.choice(records))
+                duplicate['id'] = next_id
+                duplicate['tracking'] = True
+                records.append(duplicate)
+            else:
+                body = template['body']
+                if next_id % LONG_FORM_EVERY == 0:
+                    body = body * LONG_FORM_REPEAT
+                records.append({
+                    'id': next_id,
+                    'title': f"{template['title']} ({i // len(seed[kind]) + 1})",
+                    'summary': template['summary'],
+                    'body': body,
+                    'published': now - timedelta(minutes=rng.randint(10, 6 * 24 * 60)),
+                    'tracking': False,
+                })
+            next_id += 1
+        corpus[kind] = records
+    return corpus
+
+
+def article_url(base_url: str, record: dict) -> str:
+    url = f"{base_url}/article/{record['id']}"
+    return f"{url}?utm_source=rss&utm_medium=feed" if record['tracking'] else url
+
+
+def render_rss(records: List[dict], feed_title: str, base_url: str) -> bytes:
+    items = []
+    for record in records:
+        items.append(
+            f"<item><title>{escape(record['title'])}</title>"
+            f"<link>{escape(article_url(base_url, record))}</link>"
+            f"<description>{escape(record['summary'])}</description>"
+            f"<pubDate>{format_datetime(record['published'])}</pubDate></item>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>'
+        f"<title>{escape(feed_title)}</title><link>{base_url}</link>"
+        f"{''.join(items)}</channel></rss>"
+    ).encode('utf-8')
+
+
+def render_arxiv(records: List[dict]) -> bytes:
+    entries = []
+    for record in records:
+        arxiv_id = f"2410.{record['id']:05d}"
+        entries.append(
+            f"<entry><id>http://arxiv.org/abs/{arxiv_id}v1</id>"
+            f"<published>{record['published'].strftime('%Y-%m-%dT%H:%M:%SZ')}</published>"
+            f"<title>{escape(record['title'])}</title>"
+            f"<summary>{escape(record['summary'])}</summary>"
+            "<author><name>Ada Lovelace</name></author>"
+            '<arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cs.LG"/>'
+            "</entry>"
+        )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+        f"{''.join(entries)}</feed>"
+    ).encode('utf-8')
+
+
+def render_hn_item(record: dict, base_url: str) -> bytes:
+    return json.dumps({
+        'id': record['id'],
+        'type': 'story',
+        'title': record['title'],
+        'url': article_url(base_url, record),
+        'text': record['summary'],
+        'time': int(record['published'].timestamp()),
+        'score': 50 + record['id'] % 400,
+        'descendants': record['id'] % 120,
+    }).encode('utf-8')
+
+
+def render_article_html(record: dict) -> bytes:
+    paragraphs = ''.join(f"<p>{escape(paragraph)}</p>" for paragraph in record['body'])
+    return (
+        f"<html><head><title>{escape(record['title'])}</title></head><body>"
+        "<nav><a href='/'>Home</a> <a href='/subscribe'>Subscribe</a></nav>"
+        f"<article><h1>{escape(record['title'])}</h1>{paragraphs}</article>"
+        "<footer>All rights reserved.</footer></body></html>"
+    ).encode('utf-8')
+
+
+def record_seed(path: Path = SEED_FILE, per_type: int = 12):
+    """
+    Record a fresh seed from the live sources using the production fetchers.
+    Requires network access and the full requirements.txt environment.
+    """
+    from src.agents import fetch_all_articles, get_full_article_text
+
+    seed = {'rss': [], 'arxiv': [], 'hn': []}
+    for article in fetch_all_articles():
+        kind = 'arxiv' if article.source.startswith('arXiv') else 'hn' if article.source == 'Hacker News' else 'rss'
+        if len(seed[kind]) >= per_type:
+            continue
+        body = [] if kind == 'arxiv' else (get_full_article_text(article.link) or '').split('. ')
+        seed[kind].append({
+            'title': article.title,
+            'summary': article.summary[:1000],
+            'body': [sentence.strip() for sentence in body if sentence.strip()],
+        })
+
+    if not all(seed.values()):
+        raise RuntimeError(f"Recording incomplete: {', '.join(k for k, v in seed.items() if not v)} returned nothing")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(seed, f, indent=2)
+    print(f"✓ Recorded {sum(len(v) for v in seed.values())} seed articles to {path}")
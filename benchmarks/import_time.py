@@ -0,0 +1,83 @@
+"""
+CLI Startup Benchmark
+
+Measures how long `import main_scheduled` takes in a fresh interpreter
+(python -X importtime) and checks that none of the heavy client libraries
+are loaded before a stage actually needs them:
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --budget 0.5 --top 15
+
+Exits non-zero if the import exceeds the budget or a heavy module is loaded
+eagerly, so CI catches a stray top-level import.
+"""
+
+import argparse
+import subprocess
+import sys
+
+MODULE = "main_scheduled"
+IMPORT_BUDGET_SECONDS = 0.5
+RUNS = 3  # Best of N, to keep disk-cache noise out of the number
+
+# Must only be imported by the functions that use them
+HEAVY_MODULES = [
+    'langchain', 'langchain_core', 'langchain_groq', 'langchain_openai', 'langchain_community',
+    'chromadb', 'bs4', 'feedparser', 'numpy', 'tiktoken', 'ddgs', 'langsmith', 'opentelemetry',
+]
+
+
+def measure_import(module):
+    """
+    Import `module` in a fresh interpreter with -X importtime.
+
+    Returns:
+        (total seconds, {module name: cumulative seconds})
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, self_us, cumulative_us, name = (part.strip() for part in line.replace('import time:', '|').split('|'))
+        cumulative[name] = int(cumulative_us) / 1e6
+    return cumulative[module], cumulative
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import-time benchmark for the CLI")
+    parser.add_argument('--module', default=MODULE, help="Module to import")
+    parser.add_argument('--budget', type=float, default=IMPORT_BUDGET_SECONDS, help="Maximum import seconds")
+    parser.add_argument('--top', type=int, default=10, help="Slowest top-level imports to list")
+    args = parser.parse_args()
+
+    runs = [measure_import(args.module) for _ in range(RUNS)]
+    total, cumulative = min(runs, key=lambda run: run[0])
+
+    print(f"\n⏱️  import {args.module}: {total:.3f}s (best of {RUNS}, budget {args.budget:.2f}s)")
+    top_level = {name: seconds for name, seconds in cumulative.items() if name != args.module and '.' not in name}
+    for name, seconds in sorted(top_level.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<30} {seconds:>7.3f}s")
+
+    eager = sorted(name for name in cumulative if name.split('.')[0] in HEAVY_MODULES)
+    failed = False
+    if eager:
+        roots = sorted({name.split('.')[0] for name in eager})
+        print(f"\n✗ Heavy modules imported at startup: {', '.join(roots)}")
+        failed = True
+    if total > args.budget:
+        print(f"\n✗ Import took {total:.3f}s, over the {args.budget:.2f}s budget")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("\n✓ Startup within budget, no heavy modules loaded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Local HTTP Stand-In
+
+Serves a rendered fixture corpus on 127.0.0.1 so the production fetchers,
+scraper and citation lookup run unmodified with no network access:
+    /rss/<n>.xml          RSS feed n
+    /arxiv/query          arXiv Atom API
+    /hn/topstories.json   Hacker News top story ids
+    /hn/item/<id>.json    Hacker News story
+    /s2/paper/<id>        Semantic Scholar paper (citation count)
+    /s2/paper/batch       Semantic Scholar bulk lookup (POST)
+    /article/<id>         Article HTML
+Every response can be delayed by a fixed latency plus jitter to model real
+source round-trips.
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import urlsplit
+
+from benchmarks.fixtures import (
+    render_article_html, render_arxiv, render_hn_item, render_rss,
+)
+
+
+class ReplayServer:
+    """
+    Pre-renders every response for a corpus and serves it from memory.
+
+    Args:
+        corpus: Output of fixtures.build_corpus()
+        feed_count: Number of RSS feeds the RSS records are spread across
+        latency: Seconds added to every response
+        jitter: Maximum extra random seconds added to every response
+    """
+
+    def __init__(self, corpus: Dict[str, List[dict]], feed_count: int, latency: float = 0.0, jitter: float = 0.0):
+        self.corpus = corpus
+        self.feed_count = max(1, feed_count)
+        self.latency = latency
+        self.jitter = jitter
+        self.routes: Dict[str, bytes] = {}
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler_class())
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        self.thread = None
+        self._render()
+
+    def _render(self):
+        rss_records = self.corpus['rss']
+        for n in range(self.feed_count):
+            self.routes[f"/rss/{n}.xml"] = render_rss(rss_records[n::self.feed_count], f"Replay Feed {n}", self.base_url)
+        # The stand-in ignores max_results so the arXiv share scales with the corpus size
+        self.routes['/arxiv/query'] = render_arxiv(self.corpus['arxiv'])
+        self.routes['/hn/topstories.json'] = json.dumps([record['id'] for record in self.corpus['hn']]).encode('utf-8')
+        for record in self.corpus['hn']:
+            self.routes[f"/hn/item/{record['id']}.json"] = render_hn_item(record, self.base_url)
+        for records in self.corpus.values():
+            for record in records:
+                self.routes[f"/article/{record['id']}"] = render_article_html(record)
+
+    def feed_urls(self) -> List[str]:
+        return [f"{self.base_url}/rss/{n}.xml" for n in range(self.feed_count)]
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if server.latency or server.jitter:
+                    time.sleep(server.latency + random.uniform(0, server.jitter))
+                path = urlsplit(self.path).path
+                if path.startswith('/s2/paper/'):
+                    body = json.dumps({'citationCount': sum(map(ord, path)) % 200}).encode('utf-8')
+                else:
+                    body = server.routes.get(path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                if path.endswith('.json') or path.startswith('/s2/'):
+                    content_type = 'application/json'
+                elif path.startswith(('/rss', '/arxiv')):
+                    content_type = 'application/xml'
+                else:
+                    content_type = 'text/html'
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                if server.latency or server.jitter:
+                    time.sleep(server.latency + random.uniform(0, server.jitter))
+                if urlsplit(self.path).path != '/s2/paper/batch':
+                    self.send_error(404)
+                    return
+                ids = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}').get('ids', [])
+                body = json.dumps([
+                    {'citationCount': sum(map(ord, f"/s2/paper/{paper_id}")) % 200, 'title': None, 'year': None}
+                    for paper_id in ids
+                ]).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep benchmark output readable
+
+        return Handler
+
+    def __enter__(self) -> 'ReplayServer':
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
@@ -0,0 +1,198 @@
+"""
+Offline Pipeline Benchmark
+
+Replays recorded fixtures through a local HTTP stand-in and a deterministic
+fake LLM, then times each pipeline stage at several corpus sizes:
+
+    python -m benchmarks.run_benchmarks                      # 100, 1k, 10k articles
+    python -m benchmarks.run_benchmarks --sizes 100 1000 --llm-latency 0.05 --http-latency 0.02
+    python -m benchmarks.run_benchmarks --baseline outputs/benchmarks/<previous>.json
+    python -m benchmarks.run_benchmarks --record             # refresh the seed from live sources
+
+Results (seconds, items/sec and LLM/HTTP latency per stage) are saved to
+outputs/benchmarks/. With --baseline, any stage whose throughput dropped by
+more than --tolerance exits non-zero so CI can catch regressions.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# No network and no provider limits: the fake LLM is reported as the 'default' provider
+os.environ.pop('OPENAI_API_KEY', None)
+os.environ.pop('GROQ_API_KEY', None)
+os.environ.setdefault('DEFAULT_RPM', '1000000000')
+os.environ.setdefault('DEFAULT_TPM', '1000000000')
+os.environ['USE_REACT_SCORING'] = 'false'
+os.environ['USE_REJECTION_CACHE'] = 'false'  # Every run must judge the full corpus
+os.environ['USE_SOURCE_SCHEDULER'] = 'false'  # Every run must fetch every replayed feed
+os.environ['USE_RANKER'] = 'false'  # Fake LLM scores must not train (or replace) the real scorer
+
+import main_scheduled
+import src.agents as agents
+import src.citations as citations
+from benchmarks.fake_llm import FakeLLM
+from benchmarks.fixtures import build_corpus, load_seed, record_seed
+from benchmarks.replay_server import ReplayServer
+from config import WEEKLY_SCHEDULE
+from src.perf import start_perf_run
+
+DEFAULT_SIZES = [100, 1000, 10000]
+DEFAULT_CATEGORY = "AI Business & Industry News"
+RESULTS_DIR = "outputs/benchmarks"
+REGRESSION_TOLERANCE = 0.2  # Allowed throughput drop vs. baseline before failing
+
+
+@contextmanager
+def replay_environment(server, llm):
+    """Point the source URLs at the replay server and get_llm() at the fake model"""
+    saved = {
+        'ARXIV_API_URL': agents.ARXIV_API_URL,
+        'HN_API_URL': agents.HN_API_URL,
+        'SEMANTIC_SCHOLAR_API_URL': citations.SEMANTIC_SCHOLAR_API_URL,
+        'citation_index': citations._index_instance,
+        'DATA_SCIENCE_FEEDS': agents.DATA_SCIENCE_FEEDS,
+        'rss': agents.SOURCES['rss'],
+        'get_llm': agents.get_llm,
+        'scheduled_get_llm': main_scheduled.get_llm,
+    }
+    agents.ARXIV_API_URL = f"{server.base_url}/arxiv/query"
+    agents.HN_API_URL = f"{server.base_url}/hn"
+    citations.SEMANTIC_SCHOLAR_API_URL = f"{server.base_url}/s2"
+    citations._index_instance = citations.CitationIndex(Path(':memory:'))  # Every run resolves its own citations
+    agents.DATA_SCIENCE_FEEDS = server.feed_urls()
+    agents.SOURCES['rss'] = server.feed_urls()
+    agents.get_llm = main_scheduled.get_llm = lambda: llm
+    try:
+        yield
+    finally:
+        agents.ARXIV_API_URL = saved['ARXIV_API_URL']
+        agents.HN_API_URL = saved['HN_API_URL']
+        citations.SEMANTIC_SCHOLAR_API_URL = saved['SEMANTIC_SCHOLAR_API_URL']
+        citations._index_instance = saved['citation_index']
+        agents.DATA_SCIENCE_FEEDS = saved['DATA_SCIENCE_FEEDS']
+        agents.SOURCES['rss'] = saved['rss']
+        agents.get_llm = saved['get_llm']
+        main_scheduled.get_llm = saved['scheduled_get_llm']
+
+
+def timed(results, stage, items, compute):
+    """Run one stage, record its wall-clock and throughput, and return its output"""
+    started = time.perf_counter()
+    output = compute()
+    seconds = time.perf_counter() - started
+    results[stage] = {
+        'items': items,
+        'seconds': round(seconds, 4),
+        'items_per_second': round(items / seconds, 2) if seconds > 0 else None,
+    }
+    print(f"  {stage:<12} {items:>7} items  {seconds:>9.3f}s")
+    return output
+
+
+def benchmark_size(size, seed, args):
+    """Run every offline-capable stage once at one corpus size"""
+    schedule = next(s for s in WEEKLY_SCHEDULE.values() if s['category'] == args.category)
+    corpus = build_corpus(size, seed, random_seed=args.seed)
+    feed_count = len(agents.DATA_SCIENCE_FEEDS if args.category == "Data Science & Analytics" else agents.SOURCES['rss'])
+    llm = FakeLLM(latency=args.llm_latency, category=args.category)
+    perf = start_perf_run(f"benchmark_{size}")
+    random.seed(args.seed)
+
+    print(f"\n▶ {size} articles ({args.category})")
+    results = {}
+    with ReplayServer(corpus, feed_count, args.http_latency, args.http_jitter) as server, replay_environment(server, llm):
+        fetched = timed(results, 'fetch', size, lambda: main_scheduled.stage_fetch(args.category))
+        # Dedup scaling: every fetched article twice, as if two feeds syndicated the same stories
+        timed(results, 'dedup', 2 * len(fetched), lambda: agents.deduplicate_articles(fetched + fetched))
+        matched = timed(results, 'categorize', len(fetched),
+                        lambda: main_scheduled.stage_categorize(fetched, args.category))
+        timed(results, 'enrich', len(matched), lambda: citations.enrich_citations(matched))
+        relevant = timed(results, 'relevance', len(matched),
+                         lambda: main_scheduled.stage_relevance(matched, args.category))
+        scored = timed(results, 'score', len(relevant), lambda: main_scheduled.stage_score(relevant, args.category))
+        veto = timed(results, 'veto', len(scored), lambda: main_scheduled.stage_veto(scored, args.category))
+        finalists = {args.category: veto['final']}
+        if veto['final']:
+            timed(results, 'summarize', len(veto['final']), lambda: main_scheduled.stage_summarize(finalists))
+            timed(results, 'render', len(veto['final']), lambda: main_scheduled.format_themed_email(
+                schedule, finalists, agents.generate_joke(veto['final'][0]), veto['final'][0]))
+
+    report = perf.report()
+    return {
+        'stages': results,
+        'llm': {agent: {key: stats[key] for key in ('calls', 'seconds', 'limiter_wait_seconds', 'input_tokens', 'output_tokens')}
+                for agent, stats in report['llm'].items()},
+        'http': {source: {key: stats[key] for key in ('requests', 'errors', 'p50_seconds', 'p95_seconds')}
+                 for source, stats in report['http'].items()},
+    }
+
+
+def compare_to_baseline(results, baseline_file, tolerance):
+    """
+    Print throughput changes vs. a previous results file.
+
+    Returns:
+        List of (size, stage, change) for stages slower than the tolerance
+    """
+    with open(baseline_file, 'r') as f:
+        baseline = json.load(f)['sizes']
+
+    regressions = []
+    print(f"\n📉 Compared to {baseline_file}")
+    for size, run in results.items():
+        for stage, stats in run['stages'].items():
+            before = baseline.get(size, {}).get('stages', {}).get(stage, {}).get('items_per_second')
+            after = stats['items_per_second']
+            if not before or not after:
+                continue
+            change = after / before - 1
+            flag = '  ✗ REGRESSION' if change < -tolerance else ''
+            print(f"  {size:>6} {stage:<12} {before:>10.1f} → {after:>10.1f} items/s ({change:+.0%}){flag}")
+            if flag:
+                regressions.append((size, stage, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark (no network, fake LLM)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="Corpus sizes to run")
+    parser.add_argument('--category', default=DEFAULT_CATEGORY, help="Newsletter category to run the pipeline for")
+    parser.add_argument('--llm-latency', type=float, default=0.0, help="Seconds per fake LLM call")
+    parser.add_argument('--http-latency', type=float, default=0.0, help="Seconds per replayed HTTP response")
+    parser.add_argument('--http-jitter', type=float, default=0.0, help="Maximum extra random seconds per HTTP response")
+    parser.add_argument('--seed', type=int, default=42, help="Random seed for corpus generation")
+    parser.add_argument('--baseline', help="Previous results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE, help="Allowed throughput drop (0.2 = 20%%)")
+    parser.add_argument('--record', action='store_true', help="Record a new seed from live sources and exit")
+    args = parser.parse_args()
+
+    if args.record:
+        record_seed()
+        return
+
+    seed = load_seed()
+    results = {str(size): benchmark_size(size, seed, args) for size in args.sizes}
+
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    results_file = f"{RESULTS_DIR}/{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json"
+    with open(results_file, 'w') as f:
+        json.dump({
+            'created_at': datetime.now().isoformat(),
+            'config': {key: value for key, value in vars(args).items() if key not in ('baseline', 'record')},
+            'sizes': results,
+        }, f, indent=2)
+    print(f"\n✓ Benchmark results saved to: {results_file}")
+
+    if args.baseline and compare_to_baseline(results, args.baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
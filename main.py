@@ -26,7 +26,7 @@ def main():
     print("\n--- Source Validation Report ---")
     source_counts = defaultdict(int)
     for article in all_articles:
-        source_counts[article['source']] += 1
+        source_counts[article.source] += 1
     
     if not source_counts:
         print("No articles fetched from any source. Exiting.")
@@ -49,7 +49,7 @@ def main():
     final_articles_to_summarize = []
     final_categorized_articles = {}
     for category, articles in categorized_articles.items():
-        sorted_articles = sorted(articles, key=lambda x: x.get('published', ''), reverse=True)
+        sorted_articles = sorted(articles, key=lambda x: x.published, reverse=True)
         selected = sorted_articles[:ARTICLES_PER_CATEGORY]
         final_categorized_articles[category] = selected
         final_articles_to_summarize.extend(selected)
@@ -64,13 +64,13 @@ def main():
     with tqdm(total=len(final_articles_to_summarize), desc="Summarizing Articles") as pbar:
         for category, articles in final_categorized_articles.items():
             for article in articles:
-                content_to_summarize = article['summary']
-                if "arxiv" not in article['link']:
-                    full_text = get_full_article_text(article['link'])
+                content_to_summarize = article.summary
+                if "arxiv" not in article.link:
+                    full_text = get_full_article_text(article.link)
                     if full_text:
                         content_to_summarize = full_text
                 
-                article['summary'] = summarize_article(content_to_summarize)
+                article.summary = summarize_article(content_to_summarize)
                 pbar.update(1)
 
     # 6. Print summaries to terminal for validation
@@ -78,9 +78,9 @@ def main():
     for category, articles in final_categorized_articles.items():
         print(f"\n## {category}\n")
         for article in articles:
-            print(f"  - Source: {article['source']}")
-            print(f"  - Title: {article['title']}")
-            print(f"  - Summary: {article['summary']}\n")
+            print(f"  - Source: {article.source}")
+            print(f"  - Title: {article.title}")
+            print(f"  - Summary: {article.summary}\n")
     print("--------------------------\n")
 
     # 7. Get a joke from a random article
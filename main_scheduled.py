@@ -1,15 +1,19 @@
+import calendar
 import os
 import random
 import json
+import threading
+import time
 from collections import defaultdict
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from src.agents import (
     fetch_all_articles,
     fetch_articles_for_category,
+    fetch_articles_for_categories,
     categorize_article,
-    get_full_article_text,
-    summarize_article,
+    summarize_finalists,
     generate_joke,
     format_html_email,
     send_email,
@@ -18,17 +22,34 @@ from src.agents import (
     ensure_minimum_articles,
     relevance_gate_agent,
     negative_filter_agent,
+    use_fused_judge,
+    get_citation_count,
     get_llm
 )
-from src.refresher import get_refresher_for_category, generate_refresher_explanation, format_refresher_html
+from src.refresher import get_refresher_for_category, generate_refresher_explanation
 from src.article_memory import get_article_memory  # v4.0: RAG deduplication
 from src.react_agents import score_article_with_react  # v4.0: ReACT agents
+from src.article_store import get_article_store, ingest, use_article_store, MAX_STALENESS_HOURS
+from src.ingest_deadline import finish_ingest_run
+from src.rejection_cache import ANY_CATEGORY, get_rejection_cache, record_rejections, use_rejection_cache
+from src.source_scheduler import SourceScheduler, order_by_source_prior
+from src.funnel import FunnelCounter
+from src.citations import enrich_citations
+from src.ranker import get_ranker, is_fallback_score
+from src.selection import select_diverse
+from src.work_queue import dispatch, run_worker, use_work_queue
+from src.anytime import Leaderboard, order_by_priority, run_until_deadline, selection_deadline, use_anytime_pipeline
+from src.checkpoint import PipelineCheckpoint, BATCH_RUN_ID, make_day_key, prune_checkpoints, run_stage
+from src.models import Article
+from src.perf import start_perf_run
+from src.rendering import build_digest_view, digest_blog_payload, render_digest_email, stream_to_file
 from config import get_current_day_schedule, get_schedule_for_day, WEEKLY_SCHEDULE
 from tqdm import tqdm
 
 ARTICLES_PER_CATEGORY = 5  # Increased since we're focusing on one category per day
 MIN_ARTICLES_REQUIRED = 3  # Minimum articles required for a digest
 MIN_QUALITY_THRESHOLD = 6.0  # Minimum quality score (0-10) to publish article
+BLOG_OUTPUT_DIR = "outputs/blog_digests"  # Blog digest records (title, published_date, content)
 
 # Map newsletter categories to refresher categories
 CATEGORY_TO_REFRESHER = {
@@ -38,70 +59,6 @@ CATEGORY_TO_REFRESHER = {
     "Data Science & Analytics": "data_science"
 }
 
-def track_source_performance(all_articles, categorized, passed_relevance, passed_quality, passed_veto, final, target_category):
-    """
-    Track source performance through the filtering pipeline.
-    Returns analytics dict showing conversion rates by source.
-    """
-    from collections import defaultdict
-    
-    source_stats = defaultdict(lambda: {
-        'fetched': 0,
-        'categorized': 0,
-        'passed_relevance': 0,
-        'passed_quality': 0,
-        'passed_veto': 0,
-        'final': 0
-    })
-    
-    # Track fetched
-    for article in all_articles:
-        source = article.get('source', 'Unknown')
-        source_stats[source]['fetched'] += 1
-    
-    # Track categorized
-    for article in categorized.get(target_category, []):
-        source = article.get('source', 'Unknown')
-        source_stats[source]['categorized'] += 1
-    
-    # Track passed relevance
-    for article in passed_relevance:
-        source = article.get('source', 'Unknown')
-        source_stats[source]['passed_relevance'] += 1
-    
-    # Track passed quality
-    for score, article in passed_quality:
-        source = article.get('source', 'Unknown')
-        source_stats[source]['passed_quality'] += 1
-    
-    # Track passed veto
-    for score, article in passed_veto:
-        source = article.get('source', 'Unknown')
-        source_stats[source]['passed_veto'] += 1
-    
-    # Track final
-    for article in final:
-        source = article.get('source', 'Unknown')
-        source_stats[source]['final'] += 1
-    
-    # Calculate conversion rates
-    source_analytics = []
-    for source, stats in source_stats.items():
-        if stats['fetched'] > 0:
-            source_analytics.append({
-                'source': source,
-                'fetched': stats['fetched'],
-                'categorized': stats['categorized'],
-                'final': stats['final'],
-                'cat_rate': f"{100 * stats['categorized'] / stats['fetched']:.1f}%",
-                'final_rate': f"{100 * stats['final'] / stats['fetched'] if stats['fetched'] > 0 else 0:.1f}%"
-            })
-    
-    # Sort by final count (most productive first)
-    source_analytics.sort(key=lambda x: x['final'], reverse=True)
-    
-    return source_analytics
-
 def load_cached_data():
     """Load cached test data for fast testing"""
     try:
@@ -110,7 +67,488 @@ def load_cached_data():
     except FileNotFoundError:
         return None
 
-def run_digest_for_day(day_name=None, test_mode=False):
+def stage_fetch(target_category):
+    """
+    Stage: fetch articles from the sources relevant to the category, or read the
+    candidate window from the article store (USE_ARTICLE_STORE=true).
+    """
+    if not use_article_store():
+        return fetch_articles_for_category(target_category)
+    
+    store = get_article_store()
+    age = store.last_ingest_age_hours()
+    if age is None or age > MAX_STALENESS_HOURS:
+        print(f"🗄️  Article store is {'empty' if age is None else f'{age:.0f}h old'}, ingesting first...")
+        ingest(store)
+    candidates = store.candidates()
+    print(f"🗄️  Loaded {len(candidates)} candidate articles from the article store")
+    return candidates
+
+def drop_rejected(articles, target_category):
+    """Drops articles an earlier run already rejected for this category (before any LLM work)"""
+    if not use_rejection_cache():
+        return articles
+    remaining = get_rejection_cache().filter(articles, target_category)
+    if len(remaining) < len(articles):
+        print(f"🚫 Skipped {len(articles) - len(remaining)} articles rejected by earlier runs")
+    return remaining
+
+def print_source_validation(all_articles):
+    """
+    Prints the per-source fetch counts, plus the sources that were slow, failed or
+    missed the deadline if this run fetched. Returns False if nothing was fetched.
+    """
+    print("\n--- Source Validation Report ---")
+    ingest_run = finish_ingest_run()
+    if ingest_run:
+        ingest_run.print_report()
+    source_counts = defaultdict(int)
+    for article in all_articles:
+        source_counts[article.source] += 1
+    
+    if not source_counts:
+        print("No articles fetched from any source. Exiting.")
+        return False
+        
+    for source, count in source_counts.items():
+        print(f"- {source}: {count} articles")
+    print("--------------------------\n")
+    return True
+
+# Per-article work of the LLM stages: (article, target_category) -> JSON-serializable result
+QUEUE_HANDLERS = {
+    'categorize': lambda article, target_category: categorize_article(article),
+    'relevance': lambda article, target_category: relevance_gate_agent(article, target_category),
+    'score': lambda article, target_category: score_candidate(article, target_category, get_llm(), use_react_scoring()),
+    'veto': lambda article, target_category: negative_filter_agent(article, target_category),
+    'summarize': lambda article, target_category: summarize_finalists([article]),
+}
+
+def map_stage(kind, articles, target_category, desc, scope=None):
+    """
+    Runs QUEUE_HANDLERS[kind] for every article, in process or, with USE_WORK_QUEUE=true,
+    through the durable work queue (src.work_queue). Returns the results in article order.
+    scope is the run's checkpoint key: only a resumed run (same key) reuses finished tasks.
+    """
+    if not use_work_queue():
+        return [QUEUE_HANDLERS[kind](article, target_category) for article in tqdm(articles, desc=desc)]
+    with tqdm(total=len(articles), desc=f"{desc} (queue)") as pbar:
+        return dispatch(kind, articles, target_category, QUEUE_HANDLERS, scope=scope, on_complete=pbar.update)
+
+def run_queue_workers(processes=1):
+    """Work-queue consumer (`python main_scheduled.py worker [--processes N]`); runs until interrupted"""
+    load_dotenv()
+    if processes <= 1:
+        run_worker(QUEUE_HANDLERS)
+        return
+    import multiprocessing
+    context = multiprocessing.get_context('spawn')
+    workers = [context.Process(target=run_queue_workers, name=f"worker-{index}") for index in range(processes)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+def stage_categorize(all_articles, target_category, scope=None):
+    """Stage 1: keep only articles categorized into the target category (best-converting sources first)"""
+    print("  Stage 1: Categorizing articles...")
+    matched = []
+    rejections = []
+    ordered = order_by_source_prior(all_articles)
+    # Articles from the store (or a batch pool) were already categorized at ingest
+    pending = [article for article in ordered if not article.stage.category]
+    for article, category in zip(pending, map_stage('categorize', pending, ANY_CATEGORY, "Categorizing", scope)):
+        article.stage.category = category
+    for article in ordered:
+        category = article.stage.category
+        if category == target_category:
+            matched.append(article)
+        elif category == "Irrelevant" and 'categorize' not in article.stage.fallbacks:
+            rejections.append((article, ANY_CATEGORY, 'categorize', category))
+    record_rejections(rejections)
+    
+    print(f"  ✓ Categorization complete: {len(matched)} articles matched {target_category}")
+    return matched
+
+def stage_fetch_all(target_categories):
+    """Batch stage: one fetch covering the sources of every scheduled category"""
+    return fetch_articles_for_categories(target_categories)
+
+def stage_categorize_all(all_articles, target_categories, scope=None):
+    """
+    Batch stage 1: categorize every article once and pool it under its category.
+    Returns {category: [articles]} for the requested categories.
+    """
+    print("  Stage 1: Categorizing articles (all categories)...")
+    pools = {category: [] for category in target_categories}
+    rejections = []
+    ordered = order_by_source_prior(all_articles)
+    pending = [article for article in ordered if not article.stage.category]
+    for article, category in zip(pending, map_stage('categorize', pending, ANY_CATEGORY, "Categorizing", scope)):
+        article.stage.category = category
+    for article in ordered:
+        category = article.stage.category
+        if category in pools:
+            pools[category].append(article)
+        elif category == "Irrelevant" and 'categorize' not in article.stage.fallbacks:
+            rejections.append((article, ANY_CATEGORY, 'categorize', category))
+    record_rejections(rejections)
+    
+    for category, articles in pools.items():
+        print(f"  ✓ {category}: {len(articles)} articles")
+    return pools
+
+def stage_dedup(articles, memory):
+    """Stage 1.5: RAG memory check against recently sent articles"""
+    print("  Stage 1.5: RAG memory check (deduplication)...")
+    if not memory.collection:  # Only if RAG is enabled
+        print("  ⚠️  RAG disabled (no OpenAI API key)")
+        return articles
+    
+    deduplicated_articles = []
+    duplicates_found = 0
+    for article in articles:
+        is_dup, reason = memory.check_if_duplicate(article)
+        if not is_dup:
+            deduplicated_articles.append(article)
+        else:
+            duplicates_found += 1
+            print(f"  → Rejected duplicate: {article.title[:60]}... ({reason})")
+    
+    print(f"  ✓ RAG deduplication: {duplicates_found} duplicates removed, {len(deduplicated_articles)} articles remain")
+    return deduplicated_articles
+
+def stage_relevance(articles, target_category, scope=None):
+    """Stage 2: strict binary relevance gate"""
+    print("  Stage 2: Relevance gate filtering...")
+    relevant_articles = []
+    rejections = []
+    for article, relevant in zip(articles, map_stage('relevance', articles, target_category, "Relevance Check", scope)):
+        if relevant:
+            relevant_articles.append(article)
+        elif 'relevance' not in article.stage.fallbacks:  # A failed call is dropped this run, not cached
+            rejections.append((article, target_category, 'relevance', 'Failed relevance gate'))
+    record_rejections(rejections)
+    print(f"  ✓ Relevance gate passed: {len(relevant_articles)} articles")
+    return relevant_articles
+
+def use_react_scoring():
+    """v4.0: ReACT is enabled by default when OPENAI_API_KEY is set (never with the fused judge)"""
+    react_enabled = os.getenv("OPENAI_API_KEY") and os.getenv("USE_REACT_SCORING", "true").lower() == "true"
+    return bool(react_enabled) and not use_fused_judge()
+
+def score_candidate(article, target_category, llm, react_enabled):
+    """Quality score for one article: ReACT first (if enabled), fallback to regular scoring"""
+    if react_enabled:
+        try:
+            score, reasoning = score_article_with_react(article, target_category, llm)
+            article.stage.react_reasoning = reasoning
+            return score
+        except Exception as e:
+            print(f"  ⚠️  ReACT failed for '{article.title[:40]}...', using fallback: {e}")
+    return score_article_quality(article, target_category)
+
+def stage_score(articles, target_category, scope=None):
+    """
+    Stage 3: quality scoring (ReACT when enabled, otherwise LLM). Returns [(score, article)].
+    Once the learned ranker (src.ranker) is trained, only its borderline predictions and
+    a calibration sample reach the LLM; every LLM score becomes a training example.
+    """
+    print("  Stage 3: Quality scoring (ReACT + LLM)...")
+    scored_articles = []
+    react_enabled = use_react_scoring()
+    # Fused judge already scored every article during the relevance gate (no extra LLM calls)
+    fused_judge = use_fused_judge()
+    
+    # Predict every candidate at once; with the fused judge the scores are free, so they only train the ranker
+    ranker = get_ranker() if articles else None
+    features, probabilities, needs_llm = ranker.split(articles, target_category) if ranker else (None, None, None)
+    if probabilities is None or fused_judge:
+        needs_llm = [True] * len(articles)
+    
+    llm_indices = [index for index in range(len(articles)) if needs_llm[index]]
+    llm_scored = list(zip(llm_indices, map_stage('score', [articles[index] for index in llm_indices],
+                                                 target_category, "Scoring", scope)))
+    llm_scores = dict(llm_scored)
+    for index, article in enumerate(articles):
+        if index in llm_scores:
+            scored_articles.append((llm_scores[index], article))
+            continue
+        score = round(10 * float(probabilities[index]), 1)
+        article.stage.set_fallback('score', False)
+        article.stage.metrics = {'final_score': score, 'ranker_probability': round(float(probabilities[index]), 3),
+                                 'citations': get_citation_count(article), 'scored_at': time.time()}
+        scored_articles.append((score, article))
+    
+    # Neutral scores from failed calls are not judgments: never train on them
+    learned = [(index, score) for index, score in llm_scored if not is_fallback_score(articles[index])]
+    if ranker and learned:
+        ranker.examples.add(target_category, [articles[index] for index, _ in learned],
+                            features[[index for index, _ in learned]], [score for _, score in learned],
+                            MIN_QUALITY_THRESHOLD)
+    
+    mode = 'ReACT' if react_enabled else 'fused judge' if fused_judge else 'LLM'
+    if probabilities is not None and not fused_judge:
+        print(f"  ✓ Quality scoring complete (ranker + {mode}): {len(scored_articles)} articles scored, "
+              f"{len(llm_scored)} by the LLM")
+    else:
+        print(f"  ✓ Quality scoring complete ({mode}): {len(scored_articles)} articles scored")
+    return scored_articles
+
+def stage_veto(scored_articles, target_category, scope=None):
+    """
+    Stages 4-5: minimum quality threshold, then the negative filter over the top candidates
+    (picked by utility with diversity, see src.selection).
+    Returns dict with the threshold survivors, veto survivors and the final selection.
+    """
+    print(f"  Stage 4: Applying minimum threshold ({MIN_QUALITY_THRESHOLD}/10)...")
+    high_quality_articles = [(score, article) for score, article in scored_articles if score >= MIN_QUALITY_THRESHOLD]
+    record_rejections([
+        (article, target_category, 'quality', f"Score {score:.1f} below {MIN_QUALITY_THRESHOLD}")
+        for score, article in scored_articles
+        if score < MIN_QUALITY_THRESHOLD and 'score' not in article.stage.fallbacks
+    ])
+    print(f"  ✓ Threshold filter: {len(high_quality_articles)} articles above {MIN_QUALITY_THRESHOLD}/10")
+    
+    if len(high_quality_articles) == 0:
+        print(f"  ✗ No articles met quality threshold. Exiting.")
+        return {'high_quality': [], 'approved': [], 'final': []}
+    
+    # Sort by quality score (highest first, newest first on ties)
+    high_quality_articles.sort(key=lambda x: (x[0], x[1].published.timestamp() if isinstance(x[1].published, datetime) else 0),
+                               reverse=True)
+    
+    # Veto candidates in utility order with near-duplicate stories spread out (src.selection)
+    candidates = select_diverse(high_quality_articles, ARTICLES_PER_CATEGORY * 2)  # Check 2x articles in case some get vetoed
+    
+    print("  Stage 5: Negative filter (waste-of-time check)...")
+    approved_articles = []
+    rejections = []
+    verdicts = map_stage('veto', [article for _, article in candidates], target_category, "Veto Check", scope)
+    for (score, article), should_reject in zip(candidates, verdicts):
+        if not should_reject:
+            approved_articles.append((score, article))
+        else:
+            waste_score = article.stage.waste_score if article.stage.waste_score is not None else 'N/A'
+            print(f"    ✗ VETOED: '{article.title[:60]}...' (waste_score: {waste_score})")
+            rejections.append((article, target_category, 'veto', f"Waste score {waste_score}"))
+    record_rejections(rejections)
+    ranker = get_ranker()
+    if ranker and rejections:
+        ranker.examples.mark_vetoed(target_category, [article for article, _, _, _ in rejections])
+    
+    print(f"  ✓ Negative filter complete: {len(approved_articles)} articles approved")
+    
+    # Take top N articles that passed all filters (preserve quality scores)
+    final_articles = []
+    for score, article in approved_articles[:ARTICLES_PER_CATEGORY]:
+        # Store final score in article metadata
+        article.stage.metrics['final_score'] = score
+        final_articles.append(article)
+    
+    # Check if we have minimum articles
+    if len(final_articles) < MIN_ARTICLES_REQUIRED:
+        print(f"  ⚠ Only {len(final_articles)} articles passed all filters (need {MIN_ARTICLES_REQUIRED}).")
+        print(f"  Using dynamic fallback content...")
+        final_articles = ensure_minimum_articles(final_articles, target_category, MIN_ARTICLES_REQUIRED)
+    
+    return {'high_quality': high_quality_articles, 'approved': approved_articles, 'final': final_articles}
+
+def print_source_analytics(funnel):
+    """Prints this run's source conversion table (the full funnel is kept in data/funnel.db)"""
+    print("\n📊 SOURCE ANALYTICS")
+    print("="*80)
+    
+    # Print top 15 sources by productivity
+    print(f"{'Source':<50} {'Fetched':<10} {'Categorized':<12} {'Final':<8} {'Conv %':<10}")
+    print("-"*80)
+    for stats in funnel.source_analytics()[:15]:
+        print(f"{stats['source']:<50} {stats['fetched']:<10} {stats['categorized']:<12} {stats['final']:<8} {stats['final_rate']:<10}")
+    print(f"\n✓ Funnel saved to the analytics store (python main_scheduled.py funnel)\n")
+
+def stage_summarize(final_categorized_articles, scope=None):
+    """Summarizes every finalist (concurrently, streamed) and returns the updated mapping"""
+    total = sum(len(articles) for articles in final_categorized_articles.values())
+    if use_work_queue():
+        for category, articles in final_categorized_articles.items():
+            map_stage('summarize', articles, category, "Summarizing Articles", scope)
+        return final_categorized_articles
+    with tqdm(total=total, desc="Summarizing Articles") as pbar:
+        summarize_finalists(
+            [article for articles in final_categorized_articles.values() for article in articles],
+            on_complete=lambda article: pbar.update(1)
+        )
+    return final_categorized_articles
+
+def stage_render(schedule, final_categorized_articles):
+    """Joke, refresher and themed HTML email. Returns the rendered email and joke context."""
+    target_category = schedule['category']
+    final_articles = [article for articles in final_categorized_articles.values() for article in articles]
+    
+    # Get a joke from a random article
+    random_article = random.choice(final_articles)
+    joke = generate_joke(random_article)
+    print(f"Joke of the day:\n{joke}\n")
+
+    # Get refresher of the day
+    refresher_category_map = {target_category: CATEGORY_TO_REFRESHER.get(target_category)}
+    refresher_topic = get_refresher_for_category(refresher_category_map)
+    if refresher_topic:
+        llm = get_llm()
+        refresher = {'topic': refresher_topic, 'explanation': generate_refresher_explanation(refresher_topic, llm)}
+        print(f"Refresher: {refresher_topic['name']}\n")
+    else:
+        refresher = None
+
+    # One view for every output: the email (archived as-is) and the blog payload
+    view = build_digest_view(schedule, final_categorized_articles, joke, random_article, refresher)
+    return {
+        'html': render_digest_email(view),
+        'blog': digest_blog_payload(view),
+        'joke': joke,
+        'joke_article': random_article,
+    }
+
+def stage_send(day_name, html_content, blog_payload=None):
+    """Sends the email and saves the archive copy (and blog payload). Returns the archive path."""
+    send_email(html_content)
+    
+    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
+    output_dir = "outputs/email_archives"
+    os.makedirs(output_dir, exist_ok=True)
+    output_file = f"{output_dir}/{day_name or 'today'}_{timestamp}.html"
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    print(f"✅ Email sent and saved to {output_file}")
+    
+    if blog_payload:
+        os.makedirs(BLOG_OUTPUT_DIR, exist_ok=True)
+        blog_file = f"{BLOG_OUTPUT_DIR}/{day_name or 'today'}_{timestamp}.json"
+        with open(blog_file, 'w', encoding='utf-8') as f:
+            json.dump(blog_payload, f, indent=2, ensure_ascii=False)
+        print(f"📝 Blog digest saved to {blog_file}")
+    return {'archive': output_file}
+
+def stage_publish(schedule, final_categorized_articles, memory):
+    """Stores sent articles in RAG memory and posts to LinkedIn"""
+    # Store sent articles in RAG memory (v4.0)
+    if memory.collection:
+        for category, articles in final_categorized_articles.items():
+            for article in articles:
+                quality_score = article.stage.metrics.get('quality_score', 5.0)
+                memory.store_article(article, category, quality_score)
+        print(f"  ✓ Stored {sum(len(articles) for articles in final_categorized_articles.values())} articles in RAG memory")
+    
+    # Post to LinkedIn
+    print("\n" + "="*60)
+    print("  LINKEDIN POSTING")
+    print("="*60)
+    result = send_to_linkedin(final_categorized_articles, schedule)
+    return {'linkedin': bool(result and result.get('success'))}
+
+def stage_anytime(articles, target_category, deadline):
+    """
+    Anytime mode: categorize → dedup → relevance → score → veto → summarize per article,
+    likeliest finalists first, until every candidate is done or the deadline passes.
+    Returns the survivors of each stage and the best fully summarized finalists.
+    """
+    print(f"  Anytime pipeline: {len(articles)} candidates, "
+          f"{max(deadline - time.time(), 0) / 60:.1f} min until the selection deadline...")
+    memory = get_article_memory()
+    enrich_citations(articles)
+    llm = get_llm()
+    react_enabled = use_react_scoring()
+    leaderboard = Leaderboard(ARTICLES_PER_CATEGORY)
+    survivors = {stage: [] for stage in ('categorized', 'dedup', 'relevance', 'quality', 'veto')}
+    lock = threading.Lock()
+    
+    def passed(stage, article):
+        with lock:
+            survivors[stage].append(article)
+    
+    def process(article, cancelled):
+        # Checked before every stage and before recording each result: a candidate
+        # still running at the deadline stops after its current call without side effects
+        if cancelled.is_set():
+            return
+        category = article.stage.category or categorize_article(article)
+        if cancelled.is_set():
+            return
+        article.stage.category = category
+        if category != target_category:
+            if category == "Irrelevant" and 'categorize' not in article.stage.fallbacks:
+                record_rejections([(article, ANY_CATEGORY, 'categorize', category)])
+            return
+        passed('categorized', article)
+        if memory.collection and memory.check_if_duplicate(article)[0]:
+            return
+        if cancelled.is_set():
+            return
+        passed('dedup', article)
+        relevant = relevance_gate_agent(article, target_category)
+        if cancelled.is_set():
+            return
+        if not relevant:
+            if 'relevance' not in article.stage.fallbacks:
+                record_rejections([(article, target_category, 'relevance', 'Failed relevance gate')])
+            return
+        passed('relevance', article)
+        score = score_candidate(article, target_category, llm, react_enabled)
+        if cancelled.is_set():
+            return
+        if score < MIN_QUALITY_THRESHOLD:
+            if 'score' not in article.stage.fallbacks:
+                record_rejections([(article, target_category, 'quality', f"Score {score:.1f} below {MIN_QUALITY_THRESHOLD}")])
+            return
+        passed('quality', article)
+        if not leaderboard.admits(score):
+            return  # Could not make the digest: skip the veto and summary calls
+        vetoed = negative_filter_agent(article, target_category)
+        if cancelled.is_set():
+            return
+        if vetoed:
+            record_rejections([(article, target_category, 'veto', f"Waste score {article.stage.waste_score}")])
+            return
+        passed('veto', article)
+        article.stage.metrics['final_score'] = score
+        leaderboard.add(score, article)
+        summarize_finalists([article])
+        if cancelled.is_set():
+            return
+        leaderboard.complete(article)
+    
+    counts = run_until_deadline(order_by_priority(articles), process, deadline)
+    with lock:
+        result = {stage: list(stage_articles) for stage, stage_articles in survivors.items()}
+    result['final'] = leaderboard.best()
+    print(f"  ✓ Anytime pipeline: {counts['processed']} candidates processed, {len(result['final'])} finalists ready")
+    if counts['abandoned'] or counts['not_started']:
+        print(f"  ⏰ Deadline reached: {counts['abandoned']} in flight abandoned, {counts['not_started']} never started")
+    return result
+
+def select_anytime(checkpoint, funnel, target_category, all_articles, deadline):
+    """
+    Stages 1-5 and summarization in anytime mode. Returns {category: finalists}, or None
+    if nothing passed the quality threshold before the deadline.
+    """
+    print("\n🤖 Starting Anytime Filtering Pipeline...")
+    result = run_stage(checkpoint, 'anytime', lambda: stage_anytime(
+        drop_rejected(all_articles, target_category), target_category, deadline), funnel)
+    for stage in ('categorized', 'dedup', 'relevance', 'quality', 'veto'):
+        funnel.count(stage, result[stage])
+    final_articles = result['final']
+    if result['quality'] and len(final_articles) < MIN_ARTICLES_REQUIRED:
+        print(f"  ⚠ Only {len(final_articles)} articles completed by the deadline (need {MIN_ARTICLES_REQUIRED}).")
+        final_articles = ensure_minimum_articles(final_articles, target_category, MIN_ARTICLES_REQUIRED)
+    funnel.count('final', final_articles)
+    
+    print_source_analytics(funnel)
+    if use_article_store():
+        get_article_store().save_stage_results(result['relevance'])
+    return {target_category: final_articles} if final_articles else None
+
+def run_digest_for_day(day_name=None, test_mode=False, resume=False, perf_report=True, prepare_only=False, send_at=None,
+                       batch_seed=True):
     """
     Runs the digest for a specific day or for today.
     
@@ -118,6 +556,13 @@ def run_digest_for_day(day_name=None, test_mode=False):
         day_name: Specific day to run (e.g., 'monday', 'wednesday', 'friday')
                   If None, uses current day
         test_mode: If True, uses fast cached mode (no LLM calls)
+        resume: If True, restarts today's last unfinished run from its last completed stage
+        perf_report: If False, records into the caller's perf run instead of writing its own report
+        prepare_only: If True, stops after summarization; a later resume=True run renders and sends
+        send_at: Epoch seconds the digest is due (ANYTIME_PIPELINE only; defaults to
+                 SEND_DEADLINE_MINUTES from now)
+        batch_seed: If False, a run pre-seeded by batch mode is neither started from nor
+                    resumed (the daemon's hourly article store is fresher than any batch fetch)
     """
     load_dotenv()
     
@@ -149,450 +594,244 @@ def run_digest_for_day(day_name=None, test_mode=False):
             print("📝 Using placeholder content for fast testing")
             
             # Create minimal test content
-            test_articles = [{
-                "title": f"Sample {target_category} Article {i+1}",
-                "link": "https://example.com",
-                "source": "Test Source",
-                "summary": f"This is a sample article summary for testing the {target_category} category. It demonstrates how the email will look with real content.",
-                "published": "2025-10-19T12:00:00+00:00"
-            } for i in range(3)]
+            test_articles = [Article(
+                title=f"Sample {target_category} Article {i+1}",
+                link="https://example.com",
+                source="Test Source",
+                summary=f"This is a sample article summary for testing the {target_category} category. It demonstrates how the email will look with real content.",
+                published="2025-10-19T12:00:00+00:00"
+            ) for i in range(3)]
             
             final_categorized_articles = {target_category: test_articles}
             joke = f"Why did the data scientist break up with their model? Because it kept overfitting to their expectations!"
-            joke_article = {"title": "Sample Article 1", "link": "https://example.com"}
-            
-            # Generate HTML with test data
-            html_content = format_themed_email(schedule, final_categorized_articles, joke, joke_article)
+            joke_article = Article(title="Sample Article 1", link="https://example.com", source="Test Source")
             
-            # Save HTML file
+            # Stream the HTML for the test data straight to the archive file
             timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
             output_dir = "outputs/email_archives"
             os.makedirs(output_dir, exist_ok=True)
             output_file = f"{output_dir}/{day_name or 'today'}_{timestamp}.html"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            view = build_digest_view(schedule, final_categorized_articles, joke, joke_article)
+            stream_to_file(output_file, 'themed_email.html.j2', digest=view)
             print(f"✅ FAST TEST: Email structure saved to {output_file}")
             return
         else:
             print("⚠️ No cached data found, falling back to full processing...")
     
-    # Full processing (production)
+    # Full processing (production), checkpointed per stage
+    pruned = prune_checkpoints()
+    if pruned:
+        print(f"🧹 Pruned checkpoints of {pruned} past days")
+    day_key = make_day_key(day_name or datetime.now().strftime('%A'))
+    # Batch mode may already have fetched and categorized for this day
+    if resume:
+        checkpoint = PipelineCheckpoint.latest(day_key, include_batch=batch_seed)
+    else:
+        checkpoint = PipelineCheckpoint.seeded(day_key) if batch_seed else None
+    if checkpoint:
+        print(f"↻ Resuming run {checkpoint.run_id} (completed: {', '.join(checkpoint.completed_stages()) or 'none'})\n")
+    else:
+        if resume:
+            print(f"No unfinished run found for {day_key}, starting a new one.\n")
+        checkpoint = PipelineCheckpoint(day_key)
     
+    # Time every stage, LLM call and HTTP request; the report and the funnel are written even if the run fails
+    perf = start_perf_run(day_key) if perf_report else None
+    funnel = FunnelCounter(checkpoint.key, target_category)
+    try:
+        deadline = selection_deadline(send_at) if use_anytime_pipeline() else None
+        run_pipeline(schedule, day_name, checkpoint, funnel, prepare_only, deadline)
+    finally:
+        funnel.flush()
+        if perf:
+            perf.write_report(day_name)
+
+def run_pipeline(schedule, day_name, checkpoint, funnel, prepare_only=False, deadline=None):
+    """
+    Runs the production pipeline stages for one digest.
+    With prepare_only, stops after summarization and leaves the run unfinished.
+    With a deadline (epoch seconds), stages 1-5 and summarization run per article in the
+    anytime pipeline (src.anytime) and stop there with the best complete set.
+    Each stage's survivors are counted into funnel (src.funnel.FunnelCounter) as it finishes.
+    """
+    target_category = schedule['category']
+
     # 1. Fetch articles from relevant sources only (efficient)
-    all_articles = fetch_articles_for_category(target_category)
+    all_articles = funnel.count('fetched', run_stage(checkpoint, 'fetch', lambda: stage_fetch(target_category), funnel))
     
     # 2. Source Validation Step
-    print("\n--- Source Validation Report ---")
-    source_counts = defaultdict(int)
-    for article in all_articles:
-        source_counts[article['source']] += 1
-    
-    if not source_counts:
-        print("No articles fetched from any source. Exiting.")
+    if not print_source_validation(all_articles):
         return
-        
-    for source, count in source_counts.items():
-        print(f"- {source}: {count} articles")
-    print("--------------------------\n")
 
     print(f"Fetched {len(all_articles)} potential articles.")
+    if deadline is not None:
+        final_categorized_articles = select_anytime(checkpoint, funnel, target_category, all_articles, deadline)
+        if final_categorized_articles:
+            publish_digest(schedule, day_name, checkpoint, funnel, final_categorized_articles, prepare_only)
+        return
     print("\n🤖 Starting Multi-Agent Filtering Pipeline...")
 
     # 3. STAGE 1: Categorization
-    print("  Stage 1: Categorizing articles...")
-    categorized_articles = defaultdict(list)
-    for article in tqdm(all_articles, desc="Categorizing"):
-        category = categorize_article(article)
-        if category == target_category:
-            categorized_articles[category].append(article)
-    
-    print(f"  ✓ Categorization complete: {len(categorized_articles.get(target_category, []))} articles matched {target_category}")
+    matched_articles = funnel.count('categorized', run_stage(
+        checkpoint, 'categorize',
+        lambda: stage_categorize(drop_rejected(all_articles, target_category), target_category, checkpoint.key), funnel))
 
     # 3.5. STAGE 1.5: RAG Memory Check (v4.0 - deduplication)
-    print("  Stage 1.5: RAG memory check (deduplication)...")
     memory = get_article_memory()
-    if memory.collection:  # Only if RAG is enabled
-        deduplicated_articles = []
-        duplicates_found = 0
-        for article in categorized_articles.get(target_category, []):
-            is_dup, reason = memory.check_if_duplicate(article)
-            if not is_dup:
-                deduplicated_articles.append(article)
-            else:
-                duplicates_found += 1
-                print(f"  → Rejected duplicate: {article['title'][:60]}... ({reason})")
-        
-        categorized_articles[target_category] = deduplicated_articles
-        print(f"  ✓ RAG deduplication: {duplicates_found} duplicates removed, {len(deduplicated_articles)} articles remain")
-    else:
-        print("  ⚠️  RAG disabled (no OpenAI API key)")
+    deduplicated_articles = funnel.count('dedup', run_stage(checkpoint, 'dedup', lambda: stage_dedup(matched_articles, memory), funnel))
+
+    # 3.75. Citation counts for every arXiv candidate in one batch (read by the judge, scorer and ReACT tool)
+    enrich_citations(deduplicated_articles)
 
     # 4. STAGE 2: Relevance Gate (strict binary filter)
-    print("  Stage 2: Relevance gate filtering...")
-    if target_category in categorized_articles:
-        relevant_articles = []
-        for article in tqdm(categorized_articles[target_category], desc="Relevance Check"):
-            if relevance_gate_agent(article, target_category):
-                relevant_articles.append(article)
-        categorized_articles[target_category] = relevant_articles
-        print(f"  ✓ Relevance gate passed: {len(relevant_articles)} articles")
-    
-    if not categorized_articles or len(categorized_articles.get(target_category, [])) == 0:
+    relevant_articles = funnel.count('relevance', run_stage(
+        checkpoint, 'relevance', lambda: stage_relevance(deduplicated_articles, target_category, checkpoint.key), funnel))
+    if not relevant_articles:
         print(f"  ✗ No articles passed relevance gate. Exiting.")
         return
 
     # 5. STAGE 3: Quality Scoring (v4.0 - with ReACT)
-    print("  Stage 3: Quality scoring (ReACT + LLM)...")
-    final_articles_to_summarize = []
-    final_categorized_articles = {}
-    
-    if target_category in categorized_articles:
-        target_articles = categorized_articles[target_category]
-        
-        llm = get_llm()
-        scored_articles = []
-        # v4.0: ReACT is enabled by default when OPENAI_API_KEY is set
-        react_enabled = os.getenv("OPENAI_API_KEY") and os.getenv("USE_REACT_SCORING", "true").lower() == "true"
-        
-        for article in tqdm(target_articles, desc="Scoring"):
-            # Try ReACT scoring first (if enabled), fallback to regular scoring
-            if react_enabled:
-                try:
-                    score, reasoning = score_article_with_react(article, target_category, llm)
-                    article['react_reasoning'] = reasoning
-                except Exception as e:
-                    print(f"  ⚠️  ReACT failed for '{article['title'][:40]}...', using fallback: {e}")
-                    score = score_article_quality(article, target_category)
-            else:
-                score = score_article_quality(article, target_category)
-            
-            scored_articles.append((score, article))
-        
-        if react_enabled:
-            print(f"  ✓ Quality scoring complete (ReACT): {len(scored_articles)} articles scored")
-        else:
-            print(f"  ✓ Quality scoring complete (LLM): {len(scored_articles)} articles scored")
-        
-        # 6. STAGE 4: Minimum Quality Threshold
-        print(f"  Stage 4: Applying minimum threshold ({MIN_QUALITY_THRESHOLD}/10)...")
-        high_quality_articles = [(score, article) for score, article in scored_articles if score >= MIN_QUALITY_THRESHOLD]
-        print(f"  ✓ Threshold filter: {len(high_quality_articles)} articles above {MIN_QUALITY_THRESHOLD}/10")
-        
-        if len(high_quality_articles) == 0:
-            print(f"  ✗ No articles met quality threshold. Exiting.")
-            return
-        
-        # Sort by quality score (highest first)
-        high_quality_articles.sort(key=lambda x: (-x[0], x[1].get('published', '')), reverse=True)
-        
-        # 7. STAGE 5: Negative Filter (veto power)
-        print("  Stage 5: Negative filter (waste-of-time check)...")
-        approved_articles = []
-        for score, article in tqdm(high_quality_articles[:ARTICLES_PER_CATEGORY * 2], desc="Veto Check"):  # Check 2x articles in case some get vetoed
-            should_reject = negative_filter_agent(article, target_category)
-            if not should_reject:
-                approved_articles.append((score, article))
-            else:
-                print(f"    ✗ VETOED: '{article['title'][:60]}...' (waste_score: {article.get('waste_score', 'N/A')})")
-        
-        print(f"  ✓ Negative filter complete: {len(approved_articles)} articles approved")
-        
-        # Take top N articles that passed all filters (preserve quality scores)
-        final_articles_to_summarize = []
-        for score, article in approved_articles[:ARTICLES_PER_CATEGORY]:
-            # Store final score in article metadata
-            if 'metrics' not in article:
-                article['metrics'] = {}
-            article['metrics']['final_score'] = score
-            final_articles_to_summarize.append(article)
-        
-        # Check if we have minimum articles
-        if len(final_articles_to_summarize) < MIN_ARTICLES_REQUIRED:
-            print(f"  ⚠ Only {len(final_articles_to_summarize)} articles passed all filters (need {MIN_ARTICLES_REQUIRED}).")
-            print(f"  Using dynamic fallback content...")
-            final_articles_to_summarize = ensure_minimum_articles(final_articles_to_summarize, target_category, MIN_ARTICLES_REQUIRED)
-        
-        final_categorized_articles[target_category] = final_articles_to_summarize
+    scored_articles = run_stage(checkpoint, 'score', lambda: stage_score(relevant_articles, target_category, checkpoint.key), funnel)
+    
+    # 6-7. STAGES 4-5: Minimum Quality Threshold + Negative Filter (veto power)
+    veto_result = run_stage(checkpoint, 'veto', lambda: stage_veto(scored_articles, target_category, checkpoint.key), funnel)
+    funnel.count('quality', [article for _, article in veto_result['high_quality']])
+    funnel.count('veto', [article for _, article in veto_result['approved']])
+    final_articles_to_summarize = funnel.count('final', veto_result['final'])
+    if not final_articles_to_summarize:
+        return
+    final_categorized_articles = {target_category: final_articles_to_summarize}
 
     print(f"\n✅ Pipeline complete: {len(final_articles_to_summarize)} articles ready for summarization")
-    print(f"   Average quality score: {sum(a.get('metrics', {}).get('final_score', 0) for a in final_articles_to_summarize) / len(final_articles_to_summarize):.1f}/10\n")
+    print(f"   Average quality score: {sum(a.stage.metrics.get('final_score', 0) for a in final_articles_to_summarize) / len(final_articles_to_summarize):.1f}/10\n")
 
     # Track source performance
-    print("\n📊 SOURCE ANALYTICS")
-    print("="*80)
-    source_analytics = track_source_performance(
-        all_articles=all_articles,
-        categorized=categorized_articles,
-        passed_relevance=relevant_articles if 'relevant_articles' in locals() else [],
-        passed_quality=high_quality_articles if 'high_quality_articles' in locals() else [],
-        passed_veto=approved_articles if 'approved_articles' in locals() else [],
-        final=final_articles_to_summarize,
-        target_category=target_category
-    )
-    
-    # Print top 10 sources by productivity
-    print(f"{'Source':<50} {'Fetched':<10} {'Categorized':<12} {'Final':<8} {'Conv %':<10}")
-    print("-"*80)
-    for stats in source_analytics[:15]:  # Top 15
-        print(f"{stats['source']:<50} {stats['fetched']:<10} {stats['categorized']:<12} {stats['final']:<8} {stats['final_rate']:<10}")
-    
-    # Save detailed analytics to file
-    analytics_dir = "outputs/source_analytics"
-    os.makedirs(analytics_dir, exist_ok=True)
-    analytics_file = f"{analytics_dir}/{day_name or 'today'}_{datetime.now().strftime('%Y-%m-%d')}.json"
-    with open(analytics_file, 'w') as f:
-        json.dump(source_analytics, f, indent=2)
-    print(f"\n✓ Detailed analytics saved to: {analytics_file}\n")
+    print_source_analytics(funnel)
+    if use_article_store():
+        get_article_store().save_stage_results(relevant_articles)  # Scores, veto and judge stay with each row
 
-    # 5. Summarize the curated list of articles
-    with tqdm(total=len(final_articles_to_summarize), desc="Summarizing Articles") as pbar:
-        for category, articles in final_categorized_articles.items():
-            for article in articles:
-                content_to_summarize = article['summary']
-                
-                # Only scrape for non-arXiv and non-HackerNews articles
-                # HN articles link to external sites with unreliable scraping
-                if "arxiv" not in article['link'] and article['source'] != "Hacker News":
-                    full_text = get_full_article_text(article['link'])
-                    if full_text:
-                        content_to_summarize = full_text
-                
-                # For HN articles, use title as summary if summary is empty
-                if article['source'] == "Hacker News" and not content_to_summarize.strip():
-                    content_to_summarize = article['title']
-                
-                article['summary'] = summarize_article(content_to_summarize)
-                pbar.update(1)
-
-    # 6. Print summaries to terminal for validation
+    # 8. Summarize the curated list of articles (all finalists concurrently, streamed)
+    final_categorized_articles = run_stage(checkpoint, 'summarize', lambda: stage_summarize(final_categorized_articles, checkpoint.key), funnel)
+    publish_digest(schedule, day_name, checkpoint, funnel, final_categorized_articles, prepare_only)
+
+def publish_digest(schedule, day_name, checkpoint, funnel, final_categorized_articles, prepare_only=False):
+    """Steps 9-12 for summarized finalists: print, render, send and publish (prepare_only stops before render)"""
+    memory = get_article_memory()
+
+    # 9. Print summaries to terminal for validation
     print(f"\n--- {schedule['name']} Digest ---")
     for category, articles in final_categorized_articles.items():
         print(f"\n## {category}\n")
         for article in articles:
-            print(f"  - Source: {article['source']}")
-            print(f"  - Title: {article['title']}")
-            print(f"  - Summary: {article['summary']}\n")
+            print(f"  - Source: {article.source}")
+            print(f"  - Title: {article.title}")
+            print(f"  - Summary: {article.summary}\n")
     print("--------------------------\n")
+    if prepare_only:
+        print(f"⏸️  Prepared {checkpoint.day_key}/{checkpoint.run_id}; render and send will resume from here")
+        return
 
-    # 7. Get a joke from a random article
-    random_article = random.choice(final_articles_to_summarize)
-    joke = generate_joke(random_article)
-    print(f"Joke of the day:\n{joke}\n")
-
-    # 8. Get refresher of the day
-    refresher_category_map = {target_category: CATEGORY_TO_REFRESHER.get(target_category)}
-    refresher_topic = get_refresher_for_category(refresher_category_map)
-    if refresher_topic:
-        llm = get_llm()
-        refresher_explanation = generate_refresher_explanation(refresher_topic, llm)
-        refresher_html = format_refresher_html(refresher_topic, refresher_explanation)
-        print(f"Refresher: {refresher_topic['name']}\n")
-    else:
-        refresher_html = None
-
-    # 9. Format email with themed title
-    html_content = format_themed_email(schedule, final_categorized_articles, joke, random_article, refresher_html)
+    # 10. Joke, refresher and themed email
+    rendered = run_stage(checkpoint, 'render', lambda: stage_render(schedule, final_categorized_articles), funnel)
     
-    # 9. Always send email and save archive
-    send_email(html_content)
+    # 11. Always send email and save archive
+    run_stage(checkpoint, 'send', lambda: stage_send(day_name, rendered['html'], rendered.get('blog')), funnel)
     
-    # 10. Save email archive
-    timestamp = datetime.now().strftime('%Y-%m-%d_%H-%M-%S')
-    output_dir = "outputs/email_archives"
-    os.makedirs(output_dir, exist_ok=True)
-    output_file = f"{output_dir}/{day_name or 'today'}_{timestamp}.html"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    print(f"✅ Email sent and saved to {output_file}")
-    
-    # 10.5. Store sent articles in RAG memory (v4.0)
-    if memory.collection:
-        for category, articles in final_categorized_articles.items():
-            for article in articles:
-                quality_score = article.get('metrics', {}).get('quality_score', 5.0)
-                memory.store_article(article, category, quality_score)
-        print(f"  ✓ Stored {sum(len(articles) for articles in final_categorized_articles.values())} articles in RAG memory")
-    
-    # 11. Post to LinkedIn
-    print("\n" + "="*60)
-    print("  LINKEDIN POSTING")
-    print("="*60)
-    send_to_linkedin(final_categorized_articles, schedule)
+    # 12. Store sent articles in RAG memory (v4.0) and post to LinkedIn
+    run_stage(checkpoint, 'publish', lambda: stage_publish(schedule, final_categorized_articles, memory), funnel)
+    checkpoint.mark_complete()
 
-def format_article_metrics(article):
+def format_themed_email(schedule, categorized_articles, joke, joke_article, refresher=None):
     """
-    Format article metrics (date, citations, engagement) as HTML.
-    Only shows metrics that are actually available for the source.
+    Formats the categorized articles, joke, and refresher into a themed HTML email.
+    Order: Header → Joke → Refresher → Tip → Articles (see src/templates/themed_email.html.j2)
     """
-    metrics_html = '<ul class="metrics">'
-    
-    # Publication date (all sources)
-    if article.get('published'):
-        pub_date = article['published']
-        if isinstance(pub_date, str):
-            from dateutil import parser
-            try:
-                pub_date = parser.parse(pub_date)
-                metrics_html += f'<li>Published: {pub_date.strftime("%b %d, %Y")}</li>'
-            except:
-                metrics_html += f'<li>Published: {pub_date}</li>'
-        else:
-            metrics_html += f'<li>Published: {pub_date.strftime("%b %d, %Y")}</li>'
-    
-    # Citation count (arXiv only, via Semantic Scholar)
-    if article.get('metrics', {}).get('citations', 0) > 0:
-        metrics_html += f'<li>Citations: {article["metrics"]["citations"]}</li>'
-    
-    # Hacker News engagement metrics
-    if 'hacker news' in article.get('source', '').lower():
-        if article.get('score'):
-            metrics_html += f'<li>Upvotes: {article["score"]}</li>'
-        if article.get('num_comments'):
-            metrics_html += f'<li>Comments: {article["num_comments"]}</li>'
-    
-    metrics_html += '</ul>'
-    return metrics_html
+    return render_digest_email(build_digest_view(schedule, categorized_articles, joke, joke_article, refresher))
 
-def format_themed_email(schedule, categorized_articles, joke, joke_article, refresher_html=None):
-    """
-    Formats the categorized articles, joke, and refresher into a themed HTML email.
-    Order: Header → Joke → Refresher → Tip → Articles
+def next_schedule_date(day_name, today=None):
+    """Date of the next occurrence of day_name (today if it is that day)"""
+    today = today or datetime.now()
+    weekday = [day.lower() for day in calendar.day_name].index(day_name.lower())
+    return today + timedelta(days=(weekday - today.weekday()) % 7)
+
+def run_batch(day_names=None, run_now=False, for_today=False):
     """
-    featured_category = schedule['category']
-    joke_article_title = joke_article['title'][:60] + "..." if len(joke_article['title']) > 60 else joke_article['title']
-    
-    html = f"""
-    <html>
-        <head>
-            <style>
-                body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 0; padding: 0; background-color: #f5f5f5; }}
-                .container {{ max-width: 700px; margin: 20px auto; background-color: white; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }}
-                .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 40px 30px; text-align: center; }}
-                .header h1 {{ margin: 0; font-size: 32px; font-weight: 700; color: white; }}
-                .header p {{ margin: 10px 0 0 0; font-size: 16px; color: white; opacity: 0.95; }}
-                .content {{ padding: 30px; }}
-                h2 {{ color: #2c3e50; border-bottom: 3px solid #667eea; padding-bottom: 10px; margin-top: 40px; margin-bottom: 20px; }}
-                h3 {{ color: #34495e; margin-bottom: 8px; margin-top: 0; }}
-                p {{ line-height: 1.8; color: #555; }}
-                a {{ color: #667eea; text-decoration: none; font-weight: 600; }}
-                a:hover {{ text-decoration: underline; }}
-                .article {{ margin-bottom: 30px; border-left: 4px solid #667eea; padding: 20px; background-color: #fafafa; border-radius: 0 8px 8px 0; }}
-                .joke {{ background-color: #f8f9fa; border-left: 4px solid #fbbf24; padding: 20px; margin: 30px 0; border-radius: 0 8px 8px 0; }}
-                .joke-label {{ color: #f59e0b; font-weight: 600; font-size: 14px; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 10px; }}
-                .joke-text {{ color: #374151; font-size: 15px; line-height: 1.6; font-style: italic; }}
-                .source {{ color: #7f8c8d; font-size: 14px; font-style: italic; margin-bottom: 10px; }}
-                .metrics {{ color: #6b7280; font-size: 12px; margin: 10px 0; padding-left: 0; list-style-type: none; }}
-                .metrics li {{ display: inline; margin-right: 15px; }}
-                .metrics li:before {{ content: "• "; color: #667eea; font-weight: bold; }}
-                .section-intro {{ color: #6b7280; font-size: 15px; margin-bottom: 25px; font-style: italic; }}
-                .footer {{ background-color: #2c3e50; color: white; padding: 20px; text-align: center; font-size: 12px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <img src="https://raw.githubusercontent.com/Nordic-OG-Raven/AInews/main/assets/nordic-raven-logo.png" alt="Nordic Raven Solutions" style="height: 40px; margin-bottom: 15px;">
-                    <h1>{schedule['name']}</h1>
-                    <p>{schedule['description']}</p>
-                    <p style="font-size: 14px; margin-top: 10px; color: white; opacity: 0.9;">{datetime.now().strftime('%B %d, %Y')}</p>
-                </div>
-                <div class="content">
+    Batch mode: fetch once and categorize once for several scheduled days, then
+    fan the category pools out to each day's pipeline.
+    
+    Every day gets a pre-seeded checkpoint (fetch + categorize done) that its
+    scheduled run picks up automatically, so the rest of the week skips ingestion.
+    
+    Args:
+        day_names: Days to prepare (defaults to every day in WEEKLY_SCHEDULE)
+        run_now: If True, also runs all per-category pipelines now, concurrently
+        for_today: If True, seeds runs dated today instead of each day's next occurrence
+                   (implied by run_now; used by test-all)
     """
+    load_dotenv()
+    day_names = day_names or list(WEEKLY_SCHEDULE.keys())
+    schedules = {day: get_schedule_for_day(day) for day in day_names}
+    target_categories = list(dict.fromkeys(schedule['category'] for schedule in schedules.values()))
     
-    # Featured category with joke at top, then tip, then joke article, then others
-    if featured_category in categorized_articles and categorized_articles[featured_category]:
-        html += f"""
-                    <h2>{featured_category}</h2>
-                    <div class="joke">
-                        <div class="joke-label">💡 Joke of the Day</div>
-                        <div class="joke-text">{joke}</div>
-                        <div style="margin-top: 12px; font-size: 13px; color: #9ca3af; font-style: normal;">(See "{joke_article_title}" below for context)</div>
-                    </div>
-        """
-        
-        # Add refresher if available
-        if refresher_html:
-            html += refresher_html
-        
-        html += """
-                    <div style="background-color: #f0f8ff; border-left: 4px solid #4a90e2; padding: 12px; margin: 20px 0; border-radius: 0 6px 6px 0;">
-                        <p style="margin: 0; color: #2c3e50; font-size: 12px; line-height: 1.4;">
-                            <strong>💡 Tip:</strong> Click any article title below to read the full article from the original source.
-                        </p>
-                    </div>
-        """
+    print(f"\n{'='*60}")
+    print(f"  BATCH MODE: {', '.join(day.capitalize() for day in day_names)}")
+    print(f"{'='*60}\n")
+    
+    batch_key = make_day_key('batch')
+    perf = start_perf_run(batch_key)
+    try:
+        checkpoint = PipelineCheckpoint.latest(batch_key) or PipelineCheckpoint(batch_key)
+        all_articles = run_stage(checkpoint, 'fetch', lambda: stage_fetch_all(target_categories))
+        if not print_source_validation(all_articles):
+            return
+        pools = run_stage(checkpoint, 'categorize',
+                          lambda: stage_categorize_all(drop_rejected(all_articles, ANY_CATEGORY), target_categories, checkpoint.key))
+        checkpoint.mark_complete()
         
-        # First, add the joke article
-        for article in categorized_articles[featured_category]:
-            if joke_article and article['link'] == joke_article.get('link'):
-                html += f"""
-                    <div class="article">
-                        <h3><a href="{article['link']}" style="color: #2c3e50; text-decoration: none;">{article['title']}</a></h3>
-                        <div class="source">Source: {article['source']}</div>
-                        {format_article_metrics(article)}
-                        <div class="summary">{article['summary']}</div>
-                    </div>
-                """
-                break
+        # Seed each day's run with the shared fetch and its own category pool
+        for day, schedule in schedules.items():
+            day_key = make_day_key(day, None if run_now or for_today else next_schedule_date(day))
+            day_checkpoint = PipelineCheckpoint(day_key, BATCH_RUN_ID)
+            day_checkpoint.save('fetch', all_articles)
+            pool = drop_rejected(pools[schedule['category']], schedule['category'])
+            day_checkpoint.save('categorize', pool)
+            print(f"  ✓ Seeded {day_key}: {len(pool)} {schedule['category']} articles")
         
-        # Then add the remaining articles
-        for article in categorized_articles[featured_category]:
-            if not joke_article or article['link'] != joke_article.get('link'):
-                html += f"""
-                    <div class="article">
-                        <h3><a href="{article['link']}" style="color: #2c3e50; text-decoration: none;">{article['title']}</a></h3>
-                        <div class="source">Source: {article['source']}</div>
-                        {format_article_metrics(article)}
-                        <div class="summary">{article['summary']}</div>
-                    </div>
-                """
-    
-    # Other categories (if any articles found)
-    other_categories = {k: v for k, v in categorized_articles.items() if k != featured_category and v}
-    if other_categories:
-        html += f"""
-                    <p class="section-intro">Also worth checking out from the past few days...</p>
-        """
-        for category, articles in other_categories.items():
-            html += f"""
-                    <h2>{category}</h2>
-            """
-            for article in articles:
-                html += f"""
-                    <div class="article">
-                        <h3><a href="{article['link']}">{article['title']}</a></h3>
-                        <p class="source">Source: {article['source']}</p>
-                        {format_article_metrics(article)}
-                        <p>{article['summary']}</p>
-                    </div>
-                """
-    
-    html += """
-                </div>
-                <div class="footer">
-                    <p>AI News Digest • Delivered with 🤖</p>
-                    <p style="font-size: 11px; margin-top: 10px; opacity: 0.8;">
-                        This newsletter was created using an AI-powered MAS (Multi-Agent System) that automatically curates, categorizes, and summarizes AI news from multiple sources. 
-                        <a href="https://github.com/Nordic-OG-Raven/AInews" style="color: #4a90e2;">View the source code on GitHub</a>
-                    </p>
-                    <p style="font-size: 11px; margin-top: 8px; opacity: 0.9;">
-                        <strong>Open to work & collaboration:</strong> <a href="mailto:jonas.haahr@aol.com" style="color: #4a90e2;">jonas.haahr@aol.com</a> - Let's build something amazing together! 🚀
-                    </p>
-                </div>
-            </div>
-        </body>
-    </html>
+        if run_now:
+            # One thread per digest; they share the LLM rate limiter and this perf run
+            with ThreadPoolExecutor(max_workers=len(day_names)) as executor:
+                futures = {day: executor.submit(run_digest_for_day, day, perf_report=False) for day in day_names}
+            for day, future in futures.items():
+                if future.exception():
+                    print(f"✗ {day.capitalize()} digest failed: {future.exception()}")
+    finally:
+        perf.write_report('batch')
+
+def run_ingest():
     """
-    return html
+    Incremental ingestion into the article store (run hourly from cron or the workflow).
+    """
+    load_dotenv()
+    perf = start_perf_run(make_day_key('ingest'))
+    try:
+        ingest()
+        print(f"🗄️  Article store: {get_article_store().get_stats()}")
+    finally:
+        perf.write_report('ingest')
 
 def run_test_all_days():
     """
     Runs the digest for all scheduled days and saves them (test mode).
+    Without cached test data every day falls back to full processing, so the
+    days are batch-seeded first to share one fetch and categorization pass.
     """
     print("\n" + "="*60)
     print("  TESTING ALL WEEKLY DIGESTS")
     print("="*60 + "\n")
     
+    if not load_cached_data():
+        run_batch(list(WEEKLY_SCHEDULE.keys()), for_today=True)
+    
     for day_name in WEEKLY_SCHEDULE.keys():
         print(f"\n{'='*60}")
         print(f"  Running test for {day_name.upper()}")
@@ -603,15 +842,54 @@ def run_test_all_days():
 if __name__ == "__main__":
     import sys
     
-    if len(sys.argv) > 1:
-        arg = sys.argv[1].lower()
+    args = [arg.lower() for arg in sys.argv[1:]]
+    resume = "--resume" in args
+    run_now = "--run" in args
+    args = [arg for arg in args if arg not in ("--resume", "--run")]
+    
+    if args and args[0] == "ingest":
+        run_ingest()
+    elif args and args[0] == "sources":
+        # Conversion priors and tiers the source scheduler derives from the funnel history
+        SourceScheduler().print_report()
+    elif args and args[0] == "funnel":
+        # Conversion, latency and cost trends from data/funnel.db (see src/funnel.py for options)
+        from src.funnel import main as funnel_main
+        funnel_main(sys.argv[2:])
+    elif args and args[0] == "ranker":
+        # Learned quality ranker: stats (default), train, or bootstrap from the article store
+        from src.ranker import main as ranker_main
+        ranker_main(args[1:], MIN_QUALITY_THRESHOLD)
+    elif args and args[0] == "worker":
+        # Consume LLM stage tasks from data/work_queue.db (start as many as your API keys allow)
+        processes = int(args[args.index("--processes") + 1]) if "--processes" in args else 1
+        run_queue_workers(processes)
+    elif args and args[0] == "daemon":
+        # Long-running: hourly ingest, digests prepared ahead and sent on the timetable
+        from src.daemon import run_daemon
+        load_dotenv()
+        run_daemon(run_digest_for_day, run_ingest)
+    elif args and args[0] == "batch":
+        # Fetch + categorize once for the given days (default: all), then seed or run each day
+        days = args[1:]
+        if any(day not in WEEKLY_SCHEDULE for day in days):
+            print(f"Usage: python main_scheduled.py batch [monday wednesday friday saturday] [--run]")
+        else:
+            run_batch(days or None, run_now=run_now)
+    elif resume:
+        # Production run for the given day (or today), restarting from the last checkpoint
+        if args and args[0] not in WEEKLY_SCHEDULE:
+            print(f"Usage: python main_scheduled.py [monday|wednesday|friday|saturday] --resume")
+        else:
+            run_digest_for_day(args[0] if args else None, resume=True)
+    elif args:
+        arg = args[0]
         if arg == "test-all":
             run_test_all_days()
         elif arg in WEEKLY_SCHEDULE:
             run_digest_for_day(arg, test_mode=True)
         else:
-            print(f"Usage: python main_scheduled.py [monday|wednesday|friday|test-all]")
+            print(f"Usage: python main_scheduled.py [monday|wednesday|friday|saturday|test-all|batch|ingest|daemon|sources|funnel|ranker|worker] [--resume]")
     else:
         # Run for today
         run_digest_for_day()
-
@@ -1,17 +1,21 @@
-import requests
-from bs4 import BeautifulSoup
 from datetime import datetime, timedelta, timezone
 import os
-import feedparser
+import time
+from functools import lru_cache
 import xml.etree.ElementTree as ET
+from urllib.parse import urlsplit
 
-from langchain_groq import ChatGroq
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
-import smtplib
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+from src.models import Article
+from src.prompts import build_messages, format_article_suffix, count_tokens, truncate_to_tokens, split_into_token_chunks
+from src.llm_client import invoke_llm, ainvoke_llm, astream_llm, LLMUnavailableError
+from src.perf import get_perf, timed_request
+from src.feeds import fetch_feeds
+from src.ingest_deadline import get_ingest_run, start_ingest_run
+from src.source_scheduler import has_source_history, poll_limits, record_polls
+from src.citations import get_citation_index
+
+# Heavy client libraries (langchain_*, bs4, smtplib) are imported inside the
+# functions that use them, so importing this module doesn't slow CLI startup
 
 # A unified list of all high-quality sources
 SOURCES = {
@@ -42,6 +46,10 @@ SOURCES = {
     }
 }
 
+# Source API endpoints (module-level so benchmarks/ can point them at a local replay server)
+ARXIV_API_URL = "http://export.arxiv.org/api/query"
+HN_API_URL = "https://hacker-news.firebaseio.com/v0"
+
 CATEGORIES = ["AI Research & Technical Deep Dives", "AI Business & Industry News", "AI Ethics, Policy & Society", "Data Science & Analytics", "Irrelevant"]
 
 def fetch_arxiv_papers():
@@ -50,11 +58,19 @@ def fetch_arxiv_papers():
     """
     articles = []
     yesterday_utc = datetime.now(timezone.utc) - timedelta(days=7)
+    run = get_ingest_run()
+    if run.expired():
+        run.record('arXiv API', 'skipped', detail='ingestion deadline already passed')
+        return articles
+    limits = poll_limits(['arXiv API'], default=50)
+    if not limits:
+        return articles
     
+    started = time.monotonic()
     try:
         query = "cat:cs.AI OR cat:cs.LG OR cat:cs.CL"
-        url = f"http://export.arxiv.org/api/query?search_query={query}&sortBy=submittedDate&sortOrder=descending&max_results=50"
-        response = requests.get(url)
+        url = f"{ARXIV_API_URL}?search_query={query}&sortBy=submittedDate&sortOrder=descending&max_results={limits['arXiv API']}"
+        response = timed_request('GET', url, 'arXiv API', timeout=run.timeout())
         root = ET.fromstring(response.content)
         
         for entry in root.findall('{http://www.w3.org/2005/Atom}entry'):
@@ -90,28 +106,40 @@ def fetch_arxiv_papers():
                             first_author = name_parts[-1] + " et al."
                         category_name = f"{category_name} • {first_author}"
                 
-                articles.append({
-                    "source": category_name,
-                    "title": entry.find('{http://www.w3.org/2005/Atom}title').text.strip(),
-                    "link": entry.find('{http://www.w3.org/2005/Atom}id').text.strip(),
-                    "summary": entry.find('{http://www.w3.org/2005/Atom}summary').text.strip().replace('\n', ' '),
-                    "published": published_time.isoformat()
-                })
+                articles.append(Article(
+                    source=category_name,
+                    title=entry.find('{http://www.w3.org/2005/Atom}title').text.strip(),
+                    link=entry.find('{http://www.w3.org/2005/Atom}id').text.strip(),
+                    summary=entry.find('{http://www.w3.org/2005/Atom}summary').text.strip().replace('\n', ' '),
+                    published=published_time
+                ))
         print(f"Found {len(articles)} articles from arXiv via direct API call.")
+        run.record('arXiv API', 'ok', time.monotonic() - started)
+        record_polls(['arXiv API'])
     except Exception as e:
         print(f"Error fetching from arXiv directly: {e}")
+        run.record_error('arXiv API', time.monotonic() - started, e)
     return articles
 
 def fetch_arxiv_stats_papers():
     """Fetch statistics and data science papers from arXiv"""
     articles = []
     yesterday_utc = datetime.now(timezone.utc) - timedelta(days=7)
+    run = get_ingest_run()
+    if run.expired():
+        run.record('arXiv API (statistics)', 'skipped', detail='ingestion deadline already passed')
+        return articles
+    limits = poll_limits(['arXiv API (statistics)'], default=30)
+    if not limits:
+        return articles
     
+    started = time.monotonic()
     try:
         # Statistics and data science categories
         query = "cat:stat.ML OR cat:stat.ME OR cat:stat.AP OR cat:stat.CO"
-        url = f"http://export.arxiv.org/api/query?search_query={query}&sortBy=submittedDate&sortOrder=descending&max_results=30"
-        response = requests.get(url)
+        url = (f"{ARXIV_API_URL}?search_query={query}&sortBy=submittedDate&sortOrder=descending"
+               f"&max_results={limits['arXiv API (statistics)']}")
+        response = timed_request('GET', url, 'arXiv API (statistics)', timeout=run.timeout())
         root = ET.fromstring(response.content)
         
         for entry in root.findall('{http://www.w3.org/2005/Atom}entry'):
@@ -141,89 +169,101 @@ def fetch_arxiv_stats_papers():
                             first_author = name_parts[-1] + " et al."
                         category_name = f"{category_name} • {first_author}"
                 
-                articles.append({
-                    "source": category_name,
-                    "title": entry.find('{http://www.w3.org/2005/Atom}title').text.strip(),
-                    "link": entry.find('{http://www.w3.org/2005/Atom}id').text.strip(),
-                    "summary": entry.find('{http://www.w3.org/2005/Atom}summary').text.strip().replace('\n', ' '),
-                    "published": published_time.isoformat()
-                })
+                articles.append(Article(
+                    source=category_name,
+                    title=entry.find('{http://www.w3.org/2005/Atom}title').text.strip(),
+                    link=entry.find('{http://www.w3.org/2005/Atom}id').text.strip(),
+                    summary=entry.find('{http://www.w3.org/2005/Atom}summary').text.strip().replace('\n', ' '),
+                    published=published_time
+                ))
         print(f"Found {len(articles)} statistics papers from arXiv.")
+        run.record('arXiv API (statistics)', 'ok', time.monotonic() - started)
+        record_polls(['arXiv API (statistics)'])
     except Exception as e:
         print(f"Error fetching stats from arXiv: {e}")
+        run.record_error('arXiv API (statistics)', time.monotonic() - started, e)
     return articles
 
+# Data Science RSS feeds only (used for the Saturday digest instead of SOURCES["rss"])
+DATA_SCIENCE_FEEDS = [
+    # General Data Science
+    "https://www.kdnuggets.com/feed",
+    "https://towardsdatascience.com/feed",
+    "https://www.datacamp.com/blog/rss.xml",
+    "https://www.analyticsvidhya.com/feed/",
+    "https://www.dataquest.io/blog/feed/",
+    
+    # Statistics & R
+    "https://www.r-bloggers.com/feed/",
+    "https://simplystatistics.org/index.xml",
+    
+    # Python Data Science
+    "https://realpython.com/atom.xml",
+    
+    # SQL & Databases
+    "https://www.postgresql.org/news.rss",
+    "https://blog.getdbt.com/rss.xml",
+    "https://mode.com/blog/rss.xml",
+    
+    # Data Visualization
+    "https://observablehq.com/@observablehq/rss",
+    
+    # Data Engineering
+    "https://airbyte.com/blog/rss.xml",
+    "https://www.fivetran.com/blog/rss.xml",
+    
+    # Cloud Data Platforms
+    "https://blog.snowflake.com/rss.xml",
+    "https://cloud.google.com/blog/products/data-analytics/rss.xml",
+    "https://aws.amazon.com/blogs/big-data/feed/",
+    
+    # BI & Analytics
+    "https://www.tableau.com/blog/rss.xml",
+    "https://blog.powerbi.microsoft.com/rss.xml",
+    "https://www.looker.com/blog/rss.xml"
+]
+
 def fetch_data_science_sources():
     """Fetch only data science RSS feeds and relevant Hacker News"""
     articles = []
     
-    # DISABLED: arXiv statistics papers had 0% conversion rate (too academic/theoretical)
-    # articles.extend(fetch_arxiv_stats_papers())
-    
-    # Data Science RSS feeds only
-    data_science_feeds = [
-        # General Data Science
-        "https://www.kdnuggets.com/feed",
-        "https://towardsdatascience.com/feed",
-        "https://www.datacamp.com/blog/rss.xml",
-        "https://www.analyticsvidhya.com/feed/",
-        "https://www.dataquest.io/blog/feed/",
-        
-        # Statistics & R
-        "https://www.r-bloggers.com/feed/",
-        "https://simplystatistics.org/index.xml",
-        
-        # Python Data Science
-        "https://realpython.com/atom.xml",
-        
-        # SQL & Databases
-        "https://www.postgresql.org/news.rss",
-        "https://blog.getdbt.com/rss.xml",
-        "https://mode.com/blog/rss.xml",
-        
-        # Data Visualization
-        "https://observablehq.com/@observablehq/rss",
-        
-        # Data Engineering
-        "https://airbyte.com/blog/rss.xml",
-        "https://www.fivetran.com/blog/rss.xml",
-        
-        # Cloud Data Platforms
-        "https://blog.snowflake.com/rss.xml",
-        "https://cloud.google.com/blog/products/data-analytics/rss.xml",
-        "https://aws.amazon.com/blogs/big-data/feed/",
-        
-        # BI & Analytics
-        "https://www.tableau.com/blog/rss.xml",
-        "https://blog.powerbi.microsoft.com/rss.xml",
-        "https://www.looker.com/blog/rss.xml"
-    ]
+    # arXiv statistics papers had ~0% conversion (too academic/theoretical): off unless the
+    # source scheduler has funnel history for them, which then sets how much is fetched
+    if has_source_history('arXiv API (statistics)'):
+        articles.extend(fetch_arxiv_stats_papers())
     
-    for feed_url in data_science_feeds:
-        try:
-            feed = feedparser.parse(feed_url)
-            for entry in feed.entries[:5]:  # Limit per feed
-                if entry.get('published_parsed'):
-                    published_time = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-                    if published_time > datetime.now(timezone.utc) - timedelta(days=7):
-                        articles.append({
-                            "title": entry.title,
-                            "link": entry.link,
-                            "source": feed.feed.get('title', 'Data Science Source'),
-                            "summary": entry.get('summary', ''),
-                            "published": published_time.isoformat()
-                        })
-        except Exception as e:
-            continue
+    articles.extend(fetch_data_science_feeds())
     
     # Hacker News with data science keywords only
     articles.extend(fetch_all_articles())
     
     return articles
 
+def fetch_data_science_feeds(feed_state=None):
+    """
+    Fetch the DATA_SCIENCE_FEEDS RSS feeds (latest 5 entries each from the last week;
+    the source scheduler adjusts the count per feed and holds back low-conversion feeds)
+    """
+    articles = []
+    last_week_utc = datetime.now(timezone.utc) - timedelta(days=7)
+    limits = poll_limits(DATA_SCIENCE_FEEDS, default=5)
+    feeds = fetch_feeds(list(limits), feed_state, limits=limits)
+    record_polls(feeds, {url: feed['title'] for url, feed in feeds.items() if feed['title']})
+    for feed in feeds.values():
+        for entry in feed['entries']:
+            if entry['published'] and entry['published'] > last_week_utc:
+                articles.append(Article(
+                    title=entry['title'],
+                    link=entry['link'],
+                    source=feed['title'] or 'Data Science Source',
+                    summary=entry['summary'],
+                    published=entry['published']
+                ))
+    return articles
+
 def deduplicate_articles(articles):
     """
-    Remove duplicate articles based on URL and title similarity.
+    Remove duplicate articles based on canonical URL and normalized title hash.
     Keeps the first occurrence of each unique article.
     """
     seen_urls = set()
@@ -231,8 +271,8 @@ def deduplicate_articles(articles):
     unique_articles = []
     
     for article in articles:
-        url = article.get('link', '').strip().lower()
-        title = article.get('title', '').strip().lower()
+        url = article.canonical_url
+        title = article.content_hash
         
         # Skip if we've seen this exact URL
         if url and url in seen_urls:
@@ -259,7 +299,9 @@ def fetch_articles_for_category(target_category):
     """
     Fetch articles only from sources relevant to the target category.
     Much more efficient than fetching everything.
+    Runs under a fresh ingestion deadline (see src.ingest_deadline).
     """
+    start_ingest_run()
     articles = []
     
     if target_category == "Data Science & Analytics":
@@ -284,10 +326,26 @@ def fetch_articles_for_category(target_category):
     
     return articles
 
-def fetch_all_articles():
+def fetch_articles_for_categories(target_categories, feed_state=None):
+    """
+    Fetch the union of the sources needed by several categories in one pass.
+    Used by batch mode so a week of digests costs one ingestion instead of one per day.
+    fetch_all_articles() already covers arXiv, all RSS feeds and Hacker News, so only
+    the data science feeds are added on top.
+    Runs under a fresh ingestion deadline (see src.ingest_deadline).
+    """
+    start_ingest_run()
+    articles = fetch_all_articles(feed_state)
+    if "Data Science & Analytics" in target_categories:
+        print("📊 Adding Data Science sources...")
+        articles.extend(fetch_data_science_feeds(feed_state))
+    return deduplicate_articles(articles)
+
+def fetch_all_articles(feed_state=None):
     """
     Fetches all articles from all defined sources into a single list.
     Uses a 7-day lookback window for weekly digests.
+    Pass feed_state (see src.feeds.fetch_feeds) to skip RSS feeds unchanged since the last fetch.
     """
     all_articles = []
     last_week_utc = datetime.now(timezone.utc) - timedelta(days=7)
@@ -295,134 +353,176 @@ def fetch_all_articles():
     # --- Direct arXiv Fetch ---
     all_articles.extend(fetch_arxiv_papers())
     
-    # --- RSS Feed Fetching ---
-    for url in SOURCES["rss"]:
-        feed = feedparser.parse(url)
-        source_title = feed.feed.title if hasattr(feed.feed, 'title') else url
-        for entry in feed.entries:
-            published_time = datetime(*entry.published_parsed[:6], tzinfo=timezone.utc) if hasattr(entry, 'published_parsed') else datetime.now(timezone.utc)
+    # --- RSS Feed Fetching (downloaded concurrently, parsed in a process pool) ---
+    limits = poll_limits(SOURCES["rss"])
+    feeds = fetch_feeds(list(limits), feed_state, limits=limits)
+    record_polls(feeds, {url: feed['title'] for url, feed in feeds.items() if feed['title']})
+    for url, feed in feeds.items():
+        source_title = feed['title'] or url
+        for entry in feed['entries']:
+            published_time = entry['published'] or datetime.now(timezone.utc)
             if published_time > last_week_utc:
-                all_articles.append({
-                    "source": source_title,
-                    "title": entry.title,
-                    "link": entry.link,
-                    "summary": entry.summary,
-                    "published": published_time.isoformat()
-                })
+                all_articles.append(Article(
+                    source=source_title,
+                    title=entry['title'],
+                    link=entry['link'],
+                    summary=entry['summary'],
+                    published=published_time
+                ))
     
     # --- Hacker News Fetching ---
+    all_articles.extend(fetch_hacker_news(last_week_utc))
+    
+    return all_articles
+
+def fetch_hacker_news(since):
+    """
+    Hacker News top stories matching the AI/ML or data science keywords.
+    Stops at the ingestion deadline and keeps the stories checked so far.
+    """
+    run = get_ingest_run()
+    if run.expired():
+        run.record('Hacker News', 'skipped', detail='ingestion deadline already passed')
+        return []
+    limits = poll_limits(['Hacker News'], default=150)
+    if not limits:
+        return []
+    
+    started = time.monotonic()
+    keywords = SOURCES["hackernews_keywords"]["ai_ml"] + SOURCES["hackernews_keywords"]["data_science"]
+    hn_articles = []
     try:
-        hn_top_stories_url = "https://hacker-news.firebaseio.com/v0/topstories.json"
-        story_ids = requests.get(hn_top_stories_url).json()
-        hn_articles = []
-        for story_id in story_ids[:150]: # Increased search range
-            story_url = f"https://hacker-news.firebaseio.com/v0/item/{story_id}.json"
-            story = requests.get(story_url).json()
-            if story and story.get("time"):
-                published_time = datetime.fromtimestamp(story["time"], tz=timezone.utc)
-                if published_time > last_week_utc:
-                    title = story.get('title', '').lower()
-                    if any(keyword in title for keyword in SOURCES["hackernews_keywords"]["ai_ml"] + SOURCES["hackernews_keywords"]["data_science"]):
-                        hn_articles.append({
-                            "source": "Hacker News",
-                            "title": story.get('title'),
-                            "link": story.get('url', f"https://news.ycombinator.com/item?id={story_id}"),
-                            "summary": story.get('text', ''),
-                            "published": published_time.isoformat()
-                        })
-        print(f"Found {len(hn_articles)} articles from Hacker News.")
-        all_articles.extend(hn_articles)
+        hn_top_stories_url = f"{HN_API_URL}/topstories.json"
+        story_ids = timed_request('GET', hn_top_stories_url, 'Hacker News', timeout=run.timeout()).json()[:limits['Hacker News']]
     except Exception as e:
         print(f"Error fetching from Hacker News: {e}")
-        
-    return all_articles
+        run.record_error('Hacker News', time.monotonic() - started, e)
+        return hn_articles
+    
+    checked = failed = 0
+    for story_id in story_ids:
+        if run.expired():
+            break
+        checked += 1
+        try:
+            story_url = f"{HN_API_URL}/item/{story_id}.json"
+            story = timed_request('GET', story_url, 'Hacker News', timeout=run.timeout()).json()
+        except Exception:
+            failed += 1
+            continue
+        if story and story.get("time"):
+            published_time = datetime.fromtimestamp(story["time"], tz=timezone.utc)
+            if published_time > since:
+                title = story.get('title', '').lower()
+                if any(keyword in title for keyword in keywords):
+                    hn_articles.append(Article(
+                        source="Hacker News",
+                        title=story.get('title'),
+                        link=story.get('url', f"https://news.ycombinator.com/item?id={story_id}"),
+                        summary=story.get('text', ''),
+                        published=published_time,
+                        score=story.get('score'),
+                        num_comments=story.get('descendants')
+                    ))
+    print(f"Found {len(hn_articles)} articles from Hacker News.")
+    
+    seconds = time.monotonic() - started
+    if checked < len(story_ids):
+        run.record('Hacker News', 'partial', seconds, f"{checked}/{len(story_ids)} stories checked before the deadline")
+    elif failed:
+        run.record('Hacker News', 'partial', seconds, f"{failed}/{len(story_ids)} story requests failed")
+    else:
+        run.record('Hacker News', 'ok', seconds)
+    record_polls(['Hacker News'])
+    return hn_articles
 
 def get_citation_count(article):
     """
-    Get citation count for arXiv papers via Semantic Scholar API.
-    Returns 0 for non-arXiv articles or if API fails.
+    Citation count for arXiv papers, read from the citation index that the
+    enrichment stage filled in one batch (see src.citations).
+    Returns 0 for non-arXiv articles or if Semantic Scholar has no answer.
     """
-    if 'arxiv' not in article['link'].lower():
-        return 0
-    
-    try:
-        # Extract arXiv ID from link
-        import re
-        arxiv_match = re.search(r'arxiv\.org/abs/(\d+\.\d+)', article['link'])
-        if not arxiv_match:
-            return 0
-        
-        arxiv_id = arxiv_match.group(1)
-        
-        # Query Semantic Scholar API
-        import requests
-        url = f"https://api.semanticscholar.org/graph/v1/paper/arXiv:{arxiv_id}?fields=citationCount"
-        response = requests.get(url, timeout=5)
-        
-        if response.status_code == 200:
-            data = response.json()
-            return data.get('citationCount', 0)
-        return 0
-    except:
-        return 0
+    return get_citation_index().citation_count(article)
+
+@lru_cache(maxsize=None)
+def quality_score_prefix(target_category):
+    """
+    Static part of the quality scoring prompt, cached per category for prompt caching.
+    """
+    return f"""Rate articles for a newsletter targeting {target_category} readers (ML engineers, data scientists, AI researchers).
+
+Rate on three dimensions (0-10 each):
+1. NOVELTY: New methods, breakthrough results, innovative approaches
+2. PRACTICAL: Can readers immediately apply this? Tools, tutorials, how-tos
+3. SIGNIFICANCE: Will this matter in 6 months? Industry impact, paradigm shifts
+
+You will receive one article. Respond ONLY with three numbers separated by commas: novelty,practical,significance
+Example: 8,6,9"""
 
 def score_article_quality(article, target_category):
     """
     LLM-based multi-dimensional scoring for article quality.
     Scores on: novelty, practical applicability, and significance.
     Returns a dict with individual scores and final weighted score.
+    Error paths return a neutral 5.0 flagged as the 'score' fallback on article.stage.
     """
+    article.stage.set_fallback('score', False)
+    if use_fused_judge():
+        judgment = judge_article(article, target_category)
+        if judgment:
+            return store_quality_metrics(article, judgment['novelty'], judgment['practical'],
+                                         judgment['significance'], judgment['citations'])
+        cached = article.stage.judge or {}
+        article.stage.set_fallback('score')
+        return store_quality_metrics(article, 5.0, 5.0, 5.0, cached.get('citations', 0))
+
     llm = get_llm()
-    
+
     # Get citation count for context
     citation_count = get_citation_count(article)
     
-    prompt = f"""Rate this article for a newsletter targeting {target_category} readers (ML engineers, data scientists, AI researchers).
-
-Title: {article['title']}
-Summary: {article.get('summary', '')[:500]}
-Source: {article.get('source', 'Unknown')}
-Citations: {citation_count if citation_count > 0 else 'N/A'}
-
-Rate on three dimensions (0-10 each):
-1. NOVELTY: New methods, breakthrough results, innovative approaches
-2. PRACTICAL: Can readers immediately apply this? Tools, tutorials, how-tos
-3. SIGNIFICANCE: Will this matter in 6 months? Industry impact, paradigm shifts
-
-Respond ONLY with three numbers separated by commas: novelty,practical,significance
-Example: 8,6,9"""
+    messages = build_messages(
+        quality_score_prefix(target_category),
+        format_article_suffix(article.title, article.summary, 'quality_score',
+                              extra={'Source': article.source,
+                                     'Citations': citation_count if citation_count > 0 else 'N/A'},
+                              instruction="Respond ONLY with three numbers separated by commas: novelty,practical,significance")
+    )
 
     try:
-        response = llm.invoke(prompt)
+        response = invoke_llm(llm, messages, agent='quality_score')
         scores_text = response.content if hasattr(response, 'content') else str(response)
         scores = [float(s.strip()) for s in scores_text.split(',')[:3]]
         
         novelty, practical, significance = scores
-        
-        # Weighted final score: 40% novelty, 30% practical, 30% significance
-        final_score = 0.4 * novelty + 0.3 * practical + 0.3 * significance
-        
-        # Store scores in article for display
-        article['metrics'] = {
-            'novelty': round(novelty, 1),
-            'practical': round(practical, 1),
-            'significance': round(significance, 1),
-            'final_score': round(final_score, 1),
-            'citations': citation_count
-        }
-        
-        return final_score
+
+        return store_quality_metrics(article, novelty, practical, significance, citation_count)
+    except LLMUnavailableError:
+        raise
     except Exception as e:
-        print(f"LLM scoring failed for '{article['title']}': {e}")
+        print(f"LLM scoring failed for '{article.title}': {e}")
         # Fallback to neutral score
-        article['metrics'] = {
-            'novelty': 5.0,
-            'practical': 5.0,
-            'significance': 5.0,
-            'final_score': 5.0,
-            'citations': citation_count
-        }
-        return 5.0
+        article.stage.set_fallback('score')
+        return store_quality_metrics(article, 5.0, 5.0, 5.0, citation_count)
+
+def store_quality_metrics(article, novelty, practical, significance, citation_count):
+    """
+    Stores the three quality dimensions on the article and returns the weighted final score.
+    """
+    # Weighted final score: 40% novelty, 30% practical, 30% significance
+    final_score = 0.4 * novelty + 0.3 * practical + 0.3 * significance
+
+    # Store scores in article for display
+    article.stage.metrics = {
+        'novelty': round(novelty, 1),
+        'practical': round(practical, 1),
+        'significance': round(significance, 1),
+        'final_score': round(final_score, 1),
+        'citations': citation_count,
+        'scored_at': time.time()  # Ranker features measure age as of scoring
+    }
+
+    return final_score
 
 def generate_dynamic_fallback(target_category, needed_count):
     """
@@ -494,13 +594,13 @@ def generate_dynamic_fallback(target_category, needed_count):
         # Add some randomness to avoid identical content
         random_offset = (day_of_year + i * 13) % 30  # Pseudo-random offset
         
-        fallback_articles.append({
-            "title": topic,
-            "link": f"https://fallback-content.example.com/{rotation_index}-{i}-{random_offset}",
-            "source": source,
-            "summary": f"Comprehensive guide covering {topic.lower()}. This essential resource provides practical insights and best practices for professionals looking to deepen their understanding of this critical topic.",
-            "published": (datetime.now(timezone.utc) - timedelta(days=random_offset)).isoformat()
-        })
+        fallback_articles.append(Article(
+            title=topic,
+            link=f"https://fallback-content.example.com/{rotation_index}-{i}-{random_offset}",
+            source=source,
+            summary=f"Comprehensive guide covering {topic.lower()}. This essential resource provides practical insights and best practices for professionals looking to deepen their understanding of this critical topic.",
+            published=datetime.now(timezone.utc) - timedelta(days=random_offset)
+        ))
     
     return fallback_articles
 
@@ -523,67 +623,57 @@ def ensure_minimum_articles(articles, target_category, min_count=3):
     print(f"✅ Added {needed} dynamic fallback articles. Total: {len(articles)}")
     return articles
 
-def pre_filter_article(article):
-    """
-    Rule-based pre-filtering for obvious cases.
-    """
-    title = article['title'].lower()
-    summary = article.get('summary', '').lower()
-    
+# Title keywords for the rule-based pre-filter, checked in this order (also used as ranker features)
+PRE_FILTER_KEYWORDS = {
     # FIRST: Filter out irrelevant topics
-    irrelevant_keywords = [
+    "Irrelevant": [
         'gig work', 'gig economy', 'uber driver', 'delivery driver',  # Gig work
         'python 3.14', 'gil removal', 'javascript', 'java', 'programming language', 'compiler', 'runtime',  # Programming languages
         'billionaire', 'tower', 'real estate', 'cracks', 'building',  # Real estate/general news
-    ]
-    if any(keyword in title for keyword in irrelevant_keywords):
-        return "Irrelevant"
-    
+    ],
     # AI Ethics keywords - regulation, policy, privacy, safety, fairness
     # NOTE: Use specific phrases to avoid false positives (e.g., "ai transparency" not "transparency")
-    ethics_keywords = [
+    "AI Ethics, Policy & Society": [
         'regulation', 'ai policy', 'eu policy', 'gdpr', 'privacy', 'surveillance', 
         'ai act', 'eu ai', 'bias', 'fairness', 'ethics', 'ai safety',
         'explainability', 'ai transparency', 'model transparency', 'accountability', 'responsible ai',
         'alignment', 'misinformation', 'deepfake', 'data privacy', 'algorithmic bias'
-    ]
-    if any(keyword in title for keyword in ethics_keywords):
-        return "AI Ethics, Policy & Society"
-    
+    ],
     # Data Science Tools - BROADER keywords
-    data_science_keywords = [
+    "Data Science & Analytics": [
         'sql', 'database', 'analytics', 'statistics', 'visualization', 
         'bi', 'etl', 'pipeline', 'warehouse', 'snowflake', 'bigquery', 
         'tableau', 'power bi', 'python data', 'r programming', 'jupyter', 'pandas',
         'data commons', 'learn python', 'data engineering', 'kafka', 'spark', 'airflow',
         'aws', 'mainframe data'
-    ]
-    if any(keyword in title for keyword in data_science_keywords):
-        return "Data Science & Analytics"
-    
+    ],
     # AI Research - neural networks, algorithms, papers
-    ai_research_keywords = ['neural network', 'transformer', 'algorithm', 'model', 'paper', 'research', 'arxiv']
-    if any(keyword in title for keyword in ai_research_keywords):
-        return "AI Research & Technical Deep Dives"
-    
+    "AI Research & Technical Deep Dives": ['neural network', 'transformer', 'algorithm', 'model', 'paper', 'research', 'arxiv'],
     # AI Business - companies, funding, products, financials
-    ai_business_keywords = [
+    "AI Business & Industry News": [
         'openai', 'chatgpt', 'funding', 'acquisition', 'startup', 'company', 'business',
         'budget', 'roi', 'cost', 'financial', 'spending', 'investment', 'valuation', 'revenue',
         'pricing', 'market', 'enterprise', 'sales'
-    ]
-    if any(keyword in title for keyword in ai_business_keywords):
-        return "AI Business & Industry News"
+    ],
+}
+
+def pre_filter_article(article):
+    """
+    Rule-based pre-filtering for obvious cases.
+    """
+    title = article.title.lower()
+    for category, keywords in PRE_FILTER_KEYWORDS.items():
+        if any(keyword in title for keyword in keywords):
+            return category
     
     return None  # Let LLM decide
 
-def relevance_gate_agent(article, target_category):
+@lru_cache(maxsize=None)
+def relevance_gate_prefix(target_category):
     """
-    Agent 1: Binary relevance gate. Returns True if article is relevant, False otherwise.
-    This is a strict gatekeeper that prevents irrelevant articles from reaching scoring.
+    Static part of the relevance gate prompt (category guidance and examples).
+    Cached per category and sent as the system message so provider prompt caching can hit.
     """
-    llm = get_llm()
-    
     # Category-specific examples for strict filtering
     if target_category == "Data Science & Analytics":
         positive_examples = """
@@ -689,36 +779,54 @@ CORE PRINCIPLE: Monday is for ML Engineers asking "What will happen next?"
 - NOT for: Pure data analysis, BI reporting, business metrics
 """
     
-    prompt = f"""You are a strict gatekeeper for a newsletter category: {target_category}.
+    return f"""You are a strict gatekeeper for a newsletter category: {target_category}.
 
-Your ONLY job: Answer YES or NO. Is this article relevant to {target_category}?
+Your ONLY job: Answer YES or NO. Is an article relevant to {target_category}?
 
 {category_guidance}
 {positive_examples}
 {negative_examples}
 
-Article to evaluate:
-Title: {article['title']}
-Summary: {article.get('summary', '')[:300]}
+You will receive one article. Answer ONLY with YES or NO (nothing else)."""
+
+def relevance_gate_agent(article, target_category):
+    """
+    Agent 1: Binary relevance gate. Returns True if article is relevant, False otherwise.
+    This is a strict gatekeeper that prevents irrelevant articles from reaching scoring.
+    A failed call also returns False, flagged as the 'relevance' fallback on article.stage.
+    """
+    article.stage.set_fallback('relevance', False)
+    if use_fused_judge():
+        judgment = judge_article(article, target_category)
+        if not judgment:
+            article.stage.set_fallback('relevance')
+            return False  # Fail closed, same as the LLM path
+        return judgment['relevant']
 
-Answer ONLY with YES or NO (nothing else):"""
+    llm = get_llm()
+    messages = build_messages(
+        relevance_gate_prefix(target_category),
+        format_article_suffix(article.title, article.summary, 'relevance_gate',
+                              instruction="Answer ONLY with YES or NO (nothing else):")
+    )
     
     try:
-        response = llm.invoke(prompt)
+        response = invoke_llm(llm, messages, agent='relevance_gate')
         answer = (response.content if hasattr(response, 'content') else str(response)).strip().upper()
         return answer == "YES"
+    except LLMUnavailableError:
+        raise
     except Exception as e:
-        print(f"Relevance gate failed for '{article['title']}': {e}")
+        print(f"Relevance gate failed for '{article.title}': {e}")
+        article.stage.set_fallback('relevance')
         return False  # Fail closed - reject on error
 
-def negative_filter_agent(article, target_category):
+@lru_cache(maxsize=None)
+def negative_filter_prefix(target_category):
     """
-    Agent 3: Negative filter with veto power. 
-    Returns True if article should be REJECTED (waste of time for readers).
-    Runs AFTER scoring to catch edge cases.
+    Static part of the negative filter prompt (audience context and waste examples).
+    Cached per category and sent as the system message so provider prompt caching can hit.
     """
-    llm = get_llm()
-    
     # Add category-specific context
     audience_context = ""
     if target_category == "Data Science & Analytics":
@@ -734,7 +842,7 @@ They ask: "What will happen next?" (prediction, not just analysis)
 Daily work: Training models, reading papers, implementing algorithms
 """
     
-    prompt = f"""You are protecting readers of a ${1}/week newsletter for {target_category}.
+    return f"""You are protecting readers of a ${1}/week newsletter for {target_category}.
 {audience_context}
 Question: Would readers feel CHEATED if they saw this article in their paid newsletter?
 
@@ -753,42 +861,146 @@ Examples of valuable articles (should NOT be rejected):
 - "Web scraping with Beautiful Soup" → Score 0/10 waste (data collection)
 - "Building dashboards in Tableau" → Score 0/10 waste (data visualization)
 
-Article to evaluate:
-Title: {article['title']}
-Summary: {article.get('summary', '')[:400]}
+You will receive one article. Answer ONLY with a number 0-10 (nothing else)."""
+
+def negative_filter_agent(article, target_category):
+    """
+    Agent 3: Negative filter with veto power. 
+    Returns True if article should be REJECTED (waste of time for readers).
+    Runs AFTER scoring to catch edge cases.
+    """
+    if use_fused_judge():
+        judgment = judge_article(article, target_category)
+        if not judgment:
+            return False  # Fail open, same as the LLM path
+        article.stage.waste_score = judgment['waste_score']
+        return judgment['waste_score'] > 5.0
 
-On a scale of 0-10, how much would readers feel this WASTES their time?
-Answer ONLY with a number 0-10 (nothing else):"""
+    llm = get_llm()
+    messages = build_messages(
+        negative_filter_prefix(target_category),
+        format_article_suffix(article.title, article.summary, 'negative_filter',
+                              instruction="On a scale of 0-10, how much would readers feel this WASTES their time?\nAnswer ONLY with a number 0-10 (nothing else):")
+    )
     
     try:
-        response = llm.invoke(prompt)
+        response = invoke_llm(llm, messages, agent='negative_filter')
         score_text = (response.content if hasattr(response, 'content') else str(response)).strip()
         waste_score = float(score_text.split()[0])  # Handle "8/10" or "8" format
         
         # Store for transparency
-        article['waste_score'] = waste_score
+        article.stage.waste_score = waste_score
         
         # Reject if waste_score > 5
         return waste_score > 5.0
+    except LLMUnavailableError:
+        raise
     except Exception as e:
-        print(f"Negative filter failed for '{article['title']}': {e}")
+        print(f"Negative filter failed for '{article.title}': {e}")
         return False  # Fail open - don't reject on error (scoring already did its job)
 
-def categorize_article(article):
+def use_fused_judge():
     """
-    Hybrid categorization: rule-based pre-filtering + LLM for edge cases.
+    Fused judge mode replaces the relevance gate, quality scoring and veto calls
+    with a single structured LLM call per article. Enable with USE_FUSED_JUDGE=true.
     """
-    # Step 1: Rule-based pre-filtering
-    rule_result = pre_filter_article(article)
-    if rule_result:
-        return rule_result
-    
-    # Step 2: LLM for edge cases with simple prompt
+    return os.getenv("USE_FUSED_JUDGE", "false").lower() == "true"
+
+def parse_judge_response(text):
+    """
+    Parses the fused judge's JSON answer into a normalized dict.
+    Tolerates code fences and prose around the JSON object.
+    """
+    import json
+    import re
+
+    match = re.search(r'\{.*\}', text, flags=re.DOTALL)
+    if not match:
+        raise ValueError(f"No JSON object in judge response: {text[:100]}")
+    data = json.loads(match.group(0))
+
+    relevant = data.get('relevant')
+    if isinstance(relevant, str):
+        relevant = relevant.strip().upper() in ("YES", "TRUE")
+
+    def clamp(value):
+        return max(0.0, min(10.0, float(value)))
+
+    return {
+        'relevant': bool(relevant),
+        'novelty': clamp(data['novelty']),
+        'practical': clamp(data['practical']),
+        'significance': clamp(data['significance']),
+        'waste_score': clamp(data['waste']),
+    }
+
+@lru_cache(maxsize=None)
+def fused_judge_prefix(target_category):
+    """
+    Static part of the fused judge prompt, cached per category for prompt caching.
+    """
+    audience_guidance = ""
+    if target_category == "Data Science & Analytics":
+        audience_guidance = """
+AUDIENCE: Data Scientists asking "What does the data say?" (analysis, reporting, visualization, statistical inference)
+NOT for them: Predictive modeling, training ML models, deep learning (that is Monday's ML newsletter)
+"""
+    elif target_category == "AI Research & Technical Deep Dives":
+        audience_guidance = """
+AUDIENCE: ML Engineers asking "What will happen next?" (building/training models, novel architectures, research papers)
+NOT for them: Pure data analysis, BI reporting, business metrics
+"""
+
+    return f"""You are the editor of a ${1}/week newsletter for {target_category}.
+{audience_guidance}
+Judge the article below on five questions:
+1. RELEVANT: Does it strictly belong in {target_category}? (YES or NO)
+2. NOVELTY (0-10): New methods, breakthrough results, innovative approaches
+3. PRACTICAL (0-10): Can readers immediately apply this? Tools, tutorials, how-tos
+4. SIGNIFICANCE (0-10): Will this matter in 6 months? Industry impact, paradigm shifts
+5. WASTE (0-10): Would readers feel CHEATED seeing this in their paid newsletter?
+   (off-topic = 10, product marketing / vendor press release = 8, beginner tutorial = 6, solid technique = 0)
+
+You will receive one article. Respond ONLY with a JSON object in this exact shape, nothing else:
+{{"relevant": "YES", "novelty": 8, "practical": 6, "significance": 9, "waste": 1}}"""
+
+def judge_article(article, target_category):
+    """
+    Fused judge: relevance, the three quality dimensions and the waste score in one call.
+    The judgment is cached on the article so the relevance, scoring and veto stages
+    can all read it without another round-trip. Returns None if the call failed.
+    """
+    cached = article.stage.judge
+    get_perf().record_cache('fused_judge', bool(cached and cached.get('category') == target_category))
+    if cached and cached.get('category') == target_category:
+        return None if cached.get('failed') else cached
+
     llm = get_llm()
-    simple_prompt = f"""Categorize this article:
+    citation_count = get_citation_count(article)
 
-Title: {article['title']}
-Summary: {article['summary']}
+    messages = build_messages(
+        fused_judge_prefix(target_category),
+        format_article_suffix(article.title, article.summary, 'fused_judge',
+                              extra={'Source': article.source,
+                                     'Citations': citation_count if citation_count > 0 else 'N/A'},
+                              instruction="Respond ONLY with a JSON object, nothing else:")
+    )
+
+    try:
+        response = invoke_llm(llm, messages, agent='fused_judge')
+        judgment = parse_judge_response(response.content if hasattr(response, 'content') else str(response))
+        judgment['citations'] = citation_count
+        judgment['category'] = target_category
+        article.stage.judge = judgment
+        return judgment
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        print(f"Fused judge failed for '{article.title}': {e}")
+        article.stage.judge = {'category': target_category, 'failed': True, 'citations': citation_count}
+        return None
+
+CATEGORIZE_PREFIX = """Categorize articles for an AI news digest.
 
 Options: AI Research & Technical Deep Dives, AI Business & Industry News, AI Ethics, Policy & Society, Data Science & Analytics, Irrelevant
 
@@ -799,14 +1011,37 @@ Rules:
 - AI Business = Company news, funding, products
 - AI Ethics, Policy & Society = Safety, regulation, policy, fairness, privacy, societal impact
 
-Answer with just the category name:"""
+You will receive one article. Answer with just the category name."""
+
+def categorize_article(article):
+    """
+    Hybrid categorization: rule-based pre-filtering + LLM for edge cases.
+    A failed call returns "Irrelevant", flagged as the 'categorize' fallback on article.stage.
+    """
+    article.stage.set_fallback('categorize', False)
+    # Step 1: Rule-based pre-filtering
+    rule_result = pre_filter_article(article)
+    if rule_result:
+        return rule_result
+    
+    # Step 2: LLM for edge cases with simple prompt
+    llm = get_llm()
+    messages = build_messages(
+        CATEGORIZE_PREFIX,
+        format_article_suffix(article.title, article.summary, 'categorize',
+                              instruction="Answer with just the category name:")
+    )
     
     try:
-        response = llm.invoke(simple_prompt)
+        response = invoke_llm(llm, messages, agent='categorize')
         # Clean up the response
         category = response.content if hasattr(response, 'content') else str(response)
         return next((c for c in CATEGORIES if c in category), "Irrelevant")
-    except:
+    except LLMUnavailableError:
+        raise
+    except Exception as e:
+        print(f"Categorization failed for '{article.title}': {e}")
+        article.stage.set_fallback('categorize')
         return "Irrelevant"
 
 def get_llm():
@@ -815,17 +1050,26 @@ def get_llm():
     Prefers Groq (free) if available, falls back to OpenAI.
     """
     if os.getenv("GROQ_API_KEY"):
-        return ChatGroq(model_name="llama-3.1-8b-instant", temperature=0.7)
+        from langchain_groq import ChatGroq
+        return ChatGroq(model_name="llama-3.1-8b-instant", temperature=0.7, max_retries=0)  # Retries handled by invoke_llm
     elif os.getenv("OPENAI_API_KEY"):
-        return ChatOpenAI(model_name="gpt-4o-mini", temperature=0.7)
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(model_name="gpt-4o-mini", temperature=0.7, max_retries=0)
     else:
         raise ValueError("No LLM API key found. Please set GROQ_API_KEY or OPENAI_API_KEY in .env")
 
-def summarize_article(article_content):
+SUMMARY_CONCURRENCY = 8  # Finalists summarized at once (the rate limiter still applies)
+SUMMARY_SINGLE_CALL_TOKENS = 3000  # Longer texts use map-reduce summarization
+SUMMARY_CHUNK_TOKENS = 2000
+SUMMARY_MAX_CHUNKS = 6  # Bounds latency and cost for any article size
+
+def build_summary_chain(llm):
     """
-    Summarizes the given article text using a LangChain chain.
+    Builds the summarization chain (prompt | llm | parser).
     """
-    llm = get_llm()
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
     prompt = ChatPromptTemplate.from_messages([
         ("system", """You are writing for data scientists, ML engineers, and AI researchers who pay $1/week for this newsletter.
 
@@ -850,10 +1094,12 @@ Write the summary NOW - no preamble, no meta-commentary, just the summary."""),
         ("human", "{article}")
     ])
     parser = StrOutputParser()
-    chain = prompt | llm | parser
-    summary = chain.invoke({"article": article_content})
-    
-    # Remove any markdown formatting and meta-commentary that slipped through
+    return prompt | llm | parser
+
+def clean_summary(summary):
+    """
+    Removes markdown formatting and meta-commentary that slipped through the prompt.
+    """
     import re
     
     # Remove meta-commentary (more aggressive patterns)
@@ -873,6 +1119,157 @@ Write the summary NOW - no preamble, no meta-commentary, just the summary."""),
     
     return summary
 
+def build_chunk_summary_chain(llm):
+    """
+    Builds the map-step chain that condenses one section of a long article into notes.
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", """You condense one section of a long technical article into notes for a newsletter writer.
+
+Write 3-5 plain-text sentences that keep every concrete detail from this section:
+- Numbers, benchmarks, and what they measure
+- Names of tools, models, libraries, datasets, and companies
+- How the described methods work
+
+No preamble, no markdown, no opinions. If the section is boilerplate (navigation, ads, author bio), answer with an empty line."""),
+        ("human", "{article}")
+    ])
+    return prompt | llm | StrOutputParser()
+
+def split_for_summary(article_content):
+    """
+    Returns None if the text fits a single summarization call,
+    otherwise the list of token-bounded chunks for map-reduce.
+    """
+    if count_tokens(article_content) <= SUMMARY_SINGLE_CALL_TOKENS:
+        return None
+    
+    max_tokens = SUMMARY_CHUNK_TOKENS * SUMMARY_MAX_CHUNKS
+    if count_tokens(article_content) > max_tokens:
+        # Articles almost always lead with the substance; drop the tail
+        article_content = truncate_to_tokens(article_content, max_tokens)
+    return split_into_token_chunks(article_content, SUMMARY_CHUNK_TOKENS)
+
+def join_chunk_notes(notes):
+    """Joins map-step notes into the input for the final (reduce) summary"""
+    return "\n\n".join(note.strip() for note in notes if note and note.strip())
+
+def summarize_article(article_content):
+    """
+    Summarizes the given article text using a LangChain chain.
+    Long texts are chunked by tokens, the chunks are summarized in parallel,
+    and the notes are reduced into the final 4-6 sentence summary.
+    """
+    llm = get_llm()
+    chunks = split_for_summary(article_content)
+    if chunks:
+        from concurrent.futures import ThreadPoolExecutor
+        chunk_chain = build_chunk_summary_chain(llm)
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            notes = list(executor.map(
+                lambda chunk: invoke_llm(chunk_chain, {"article": chunk}, agent='summarize_chunk'),
+                chunks
+            ))
+        article_content = join_chunk_notes(notes)
+
+    chain = build_summary_chain(llm)
+    summary = invoke_llm(chain, {"article": article_content}, agent='summarize')
+    return clean_summary(summary)
+
+async def asummarize_article(article_content, chain=None, chunk_chain=None):
+    """
+    Async, streaming variant of summarize_article().
+    Chunks are collected as they arrive and cleaned once the stream ends.
+    """
+    import asyncio
+
+    llm = None if chain and chunk_chain else get_llm()
+    chunks = split_for_summary(article_content)
+    if chunks:
+        chunk_chain = chunk_chain or build_chunk_summary_chain(llm)
+        notes = await asyncio.gather(*[
+            ainvoke_llm(chunk_chain, {"article": chunk}, agent='summarize_chunk') for chunk in chunks
+        ])
+        article_content = join_chunk_notes(notes)
+
+    chain = chain or build_summary_chain(llm)
+    streamed = []
+    async for chunk in astream_llm(chain, {"article": article_content}, agent='summarize'):
+        streamed.append(chunk)
+    return clean_summary(''.join(streamed))
+
+def presummarize_text(text):
+    """
+    Shrinks scraped text with the local extractive pre-summarizer (no LLM calls).
+    Disable with USE_EXTRACTIVE_PRESUMMARY=false; long texts then go through
+    map-reduce summarization instead.
+    """
+    if os.getenv("USE_EXTRACTIVE_PRESUMMARY", "true").lower() != "true":
+        return text
+    from src.extractive import extract_key_sentences  # Deferred: numpy stays out of CLI startup
+    return extract_key_sentences(text)
+
+def get_summary_input(article):
+    """
+    Picks the text to summarize: scraped full text when available, else the feed summary.
+    """
+    content_to_summarize = article.summary
+    
+    # Only scrape for non-arXiv and non-HackerNews articles
+    # HN articles link to external sites with unreliable scraping
+    if "arxiv" not in article.link and article.source != "Hacker News":
+        full_text = get_full_article_text(article.link)
+        if full_text:
+            content_to_summarize = presummarize_text(full_text)
+    
+    # For HN articles, use title as summary if summary is empty
+    if article.source == "Hacker News" and not content_to_summarize.strip():
+        content_to_summarize = article.title
+    
+    return content_to_summarize
+
+def summarize_finalists(articles, max_concurrency=SUMMARY_CONCURRENCY, on_complete=None):
+    """
+    Scrapes and summarizes all finalists concurrently, streaming each completion.
+    Each article's 'summary' is replaced as soon as its own summary finishes, so total
+    time is set by the slowest article rather than the sum of all of them.
+
+    Args:
+        articles: Finalist articles (updated in place)
+        max_concurrency: Maximum summaries in flight at once
+        on_complete: Optional callback(article) invoked as each summary lands
+    """
+    import asyncio
+
+    async def run_all():
+        llm = get_llm()
+        chain = build_summary_chain(llm)
+        chunk_chain = build_chunk_summary_chain(llm)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def summarize_one(article):
+            async with semaphore:
+                # Scraping uses blocking requests, keep it off the event loop
+                content = await asyncio.to_thread(get_summary_input, article)
+                return article, await asummarize_article(content, chain, chunk_chain)
+
+        tasks = [asyncio.create_task(summarize_one(article)) for article in articles]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                article, summary = await finished
+                article.summary = summary
+                if on_complete:
+                    on_complete(article)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    if articles:
+        asyncio.run(run_all())
+
 def generate_joke(article):
     """
     Generates a joke based on the article's title and summary.
@@ -883,8 +1280,12 @@ def generate_joke(article):
         # Fallback to generic LLM if OpenAI not available
         llm = get_llm()
     else:
-        llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.9)  # Higher temp for creativity
+        from langchain_openai import ChatOpenAI
+        llm = ChatOpenAI(model_name="gpt-4o-mini", temperature=0.9, max_retries=0)  # Higher temp for creativity
     
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
     prompt = ChatPromptTemplate.from_messages([
         ("system", """You are a witty comedian who tells jokes about technology and AI. 
 Create a short, clever one-liner joke based on the following article.
@@ -894,11 +1295,11 @@ Keep it light, professional, and punny. Make people smile, not groan."""),
     ])
     parser = StrOutputParser()
     chain = prompt | llm | parser
-    joke = chain.invoke({
-        "title": article['title'], 
-        "summary": article['summary'],
+    joke = invoke_llm(chain, {
+        "title": article.title, 
+        "summary": article.summary,
         "cache_bust": datetime.now().isoformat()  # Force fresh joke generation
-    })
+    }, agent='joke')
     return joke
 
 def generate_linkedin_post(categorized_articles, schedule):
@@ -918,8 +1319,11 @@ def generate_linkedin_post(categorized_articles, schedule):
     # Prepare article summaries for the prompt
     articles_text = ""
     for i, article in enumerate(articles[:3], 1):  # Top 3 for LinkedIn
-        articles_text += f"{i}. {article['title']}\n   {article['summary'][:150]}...\n\n"
+        articles_text += f"{i}. {article.title}\n   {article.summary[:150]}...\n\n"
     
+    from langchain_core.prompts import ChatPromptTemplate
+    from langchain_core.output_parsers import StrOutputParser
+
     prompt = ChatPromptTemplate.from_messages([
         ("system", """You are a professional LinkedIn content creator for AI/ML news.
         
@@ -944,11 +1348,11 @@ Create a LinkedIn post for this digest.""")
     parser = StrOutputParser()
     chain = prompt | llm | parser
     
-    linkedin_post = chain.invoke({
+    linkedin_post = invoke_llm(chain, {
         "theme_name": schedule['name'],
         "description": schedule['description'],
         "articles": articles_text
-    })
+    }, agent='linkedin_post')
     
     return linkedin_post
 
@@ -966,8 +1370,6 @@ def post_to_linkedin(content, access_token, organization_id=None):
     Returns:
         dict: Response from LinkedIn API or error message
     """
-    import requests
-    
     # LinkedIn API endpoint
     url = "https://api.linkedin.com/v2/ugcPosts"
     
@@ -978,7 +1380,7 @@ def post_to_linkedin(content, access_token, organization_id=None):
         # Get user's profile URN
         profile_url = "https://api.linkedin.com/v2/me"
         headers = {"Authorization": f"Bearer {access_token}"}
-        profile_response = requests.get(profile_url, headers=headers)
+        profile_response = timed_request('GET', profile_url, 'LinkedIn', headers=headers)
         
         if profile_response.status_code != 200:
             return {"error": "Failed to get user profile", "details": profile_response.text}
@@ -1010,7 +1412,7 @@ def post_to_linkedin(content, access_token, organization_id=None):
         "X-Restli-Protocol-Version": "2.0.0"
     }
     
-    response = requests.post(url, json=payload, headers=headers)
+    response = timed_request('POST', url, 'LinkedIn', json=payload, headers=headers)
     
     if response.status_code == 201:
         return {
@@ -1072,9 +1474,11 @@ def get_full_article_text(url):
     if "arxiv.org" in url:
         return None # Can't scrape PDFs, will use abstract summary
 
+    from bs4 import BeautifulSoup
+
     try:
         headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.36'}
-        response = requests.get(url, headers=headers, timeout=10)
+        response = timed_request('GET', url, urlsplit(url).netloc, headers=headers, timeout=10)
         soup = BeautifulSoup(response.content, 'html.parser')
         
         # Site-specific selectors to get ONLY main article content
@@ -1112,49 +1516,10 @@ def get_full_article_text(url):
 
 def format_html_email(categorized_articles, joke):
     """
-    Formats the categorized articles and joke into an HTML email body.
-    """
-    html = """
-    <html>
-        <head>
-            <style>
-                body { font-family: sans-serif; margin: 2em; }
-                h1 { color: #2c3e50; }
-                h2 { color: #34495e; border-bottom: 2px solid #bdc3c7; padding-bottom: 5px; }
-                h3 { color: #7f8c8d; }
-                p { line-height: 1.6; }
-                a { color: #2980b9; text-decoration: none; }
-                a:hover { text-decoration: underline; }
-                .category { margin-bottom: 3em; }
-                .article { margin-bottom: 2em; border-left: 3px solid #ecf0f1; padding-left: 1em; }
-                .joke { background-color: #ecf0f1; padding: 1em; border-radius: 5px; margin-bottom: 2em; }
-            </style>
-        </head>
-        <body>
-            <h1>Your AI News Digest</h1>
-            <div class="joke">
-                <h2>Joke of the Day</h2>
-                <p>""" + joke + """</p>
-            </div>
-    """
-    for category, articles in categorized_articles.items():
-        if not articles:
-            continue
-        html += f"""
-        <div class="category">
-            <h2>{category}</h2>
-        """
-        for article in articles:
-            html += f"""
-            <div class="article">
-                <h3><a href="{article['link']}">{article['title']}</a></h3>
-                <p><strong>Source:</strong> {article['source']}</p>
-                <p>{article['summary']}</p>
-            </div>
-            """
-        html += "</div>"
-    html += "</body></html>"
-    return html
+    Formats the categorized articles and joke into an HTML email body (src/templates/basic_email.html.j2).
+    """
+    from src.rendering import render
+    return render('basic_email.html.j2', categorized_articles=categorized_articles, joke=joke)
 
 def send_email(html_content):
     """
@@ -1179,6 +1544,10 @@ def send_email(html_content):
         print("Email credentials not found in .env file. Skipping email.")
         return
 
+    import smtplib
+    from email.mime.multipart import MIMEMultipart
+    from email.mime.text import MIMEText
+
     message = MIMEMultipart("alternative")
     message["Subject"] = f"AI News Digest - {datetime.now().strftime('%Y-%m-%d')}"
     message["From"] = sender_email
@@ -1188,7 +1557,7 @@ def send_email(html_content):
 
     try:
         print("Connecting to Gmail SMTP server...")
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
+        with get_perf().span('smtp.send'), smtplib.SMTP_SSL("smtp.gmail.com", 465) as server:
             server.login(sender_email, password)
             server.sendmail(sender_email, receiver_email, message.as_string())
         print("Email sent successfully!")
@@ -0,0 +1,136 @@
+"""
+Anytime Pipeline
+
+Alternative to the stage-by-stage pipeline (ANYTIME_PIPELINE=true): each
+candidate flows through categorize → dedup → relevance → score → veto →
+summarize on its own, so finished finalists exist long before the slowest
+stage has drained:
+- Candidates start in priority order (source conversion prior x recency), a
+  few at a time (ANYTIME_WORKERS), so the likeliest finalists finish first
+- Veto and summary are only spent on articles that would make the current
+  top N; everything else stops at its score
+- At the send deadline no new candidates start and in-flight ones are
+  cancelled: process() gets a threading.Event that is set at the deadline and
+  checks it before every stage, so an abandoned candidate stops after its
+  current LLM call without recording anything; the best fully summarized set
+  so far is published
+- The deadline is the daemon's send time, or SEND_DEADLINE_MINUTES after a
+  one-shot run starts, minus SEND_RESERVE_SECONDS for render and send
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from src.models import Article
+
+ANYTIME_WORKERS = int(os.getenv("ANYTIME_WORKERS", "4"))
+SEND_DEADLINE_MINUTES = float(os.getenv("SEND_DEADLINE_MINUTES", "60"))
+SEND_RESERVE_SECONDS = float(os.getenv("SEND_RESERVE_SECONDS", "120"))
+RECENCY_HALF_LIFE_DAYS = 3.0
+UNDATED_AGE_DAYS = 3.5  # Middle of the 7-day candidate window
+
+
+def use_anytime_pipeline() -> bool:
+    """Per-article anytime pipeline instead of whole stages (opt-in)"""
+    return os.getenv("ANYTIME_PIPELINE", "false").lower() == "true"
+
+
+def selection_deadline(send_at: Optional[float] = None) -> float:
+    """
+    Epoch seconds by which selection must stop: send_at (default: SEND_DEADLINE_MINUTES
+    from now) minus the reserve for rendering and sending.
+    """
+    if send_at is None:
+        send_at = time.time() + SEND_DEADLINE_MINUTES * 60
+    return send_at - SEND_RESERVE_SECONDS
+
+
+def order_by_priority(articles: Sequence[Article]) -> List[Article]:
+    """Likeliest finalists first: source conversion prior, halved every RECENCY_HALF_LIFE_DAYS of age"""
+    from src.source_scheduler import source_prior
+
+    now = datetime.now(timezone.utc)
+    priors = {}
+
+    def priority(article: Article) -> float:
+        if article.source not in priors:
+            priors[article.source] = source_prior(article.source)
+        published = article.published if isinstance(article.published, datetime) else None
+        age_days = max((now - published).total_seconds() / 86400, 0.0) if published else UNDATED_AGE_DAYS
+        return priors[article.source] * 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+
+    return sorted(articles, key=priority, reverse=True)
+
+
+class Leaderboard:
+    """
+    Approved candidates of one anytime run; only the top `size` by score can be published.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.lock = threading.Lock()
+        self.approved: List[Tuple[float, Article]] = []
+        self.completed = set()  # canonical URLs whose summary finished
+
+    def admits(self, score: float) -> bool:
+        """True if an article with this score would currently make the top `size`"""
+        with self.lock:
+            return sum(1 for approved_score, _ in self.approved if approved_score >= score) < self.size
+
+    def add(self, score: float, article: Article):
+        with self.lock:
+            self.approved.append((score, article))
+
+    def complete(self, article: Article):
+        with self.lock:
+            self.completed.add(article.canonical_url)
+
+    def best(self) -> List[Article]:
+        """Top `size` fully processed articles, best first"""
+        with self.lock:
+            ranked = sorted(self.approved, key=lambda item: item[0], reverse=True)
+            return [article for _, article in ranked if article.canonical_url in self.completed][:self.size]
+
+
+def run_until_deadline(articles: Sequence[Article], process: Callable[[Article, threading.Event], None],
+                       deadline: float, workers: int = ANYTIME_WORKERS) -> dict:
+    """
+    Run process(article, cancelled) for each article in order, at most `workers`
+    at a time, until all are done or the deadline passes. Articles are started
+    lazily, so anything not started by the deadline is never started; `cancelled`
+    is set at the deadline and process must check it before each stage and
+    return without side effects once it is set.
+
+    Returns:
+        Counts of 'processed', 'abandoned' (still running at the deadline) and 'not_started'
+    """
+    pending = iter(articles)
+    in_flight = set()
+    processed = 0
+    cancelled = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        while True:
+            while len(in_flight) < workers and time.time() < deadline:
+                article = next(pending, None)
+                if article is None:
+                    break
+                in_flight.add(executor.submit(process, article, cancelled))
+            if not in_flight or time.time() >= deadline:
+                break
+            done, in_flight = wait(in_flight, timeout=max(deadline - time.time(), 0), return_when=FIRST_COMPLETED)
+            for future in done:
+                processed += 1
+                error = future.exception()
+                if error:
+                    print(f"  ⚠️  Anytime candidate failed: {error}")
+    finally:
+        # In-flight workers see the event after their current call and stop there
+        cancelled.set()
+        executor.shutdown(wait=False, cancel_futures=True)
+    return {'processed': processed, 'abandoned': len(in_flight), 'not_started': sum(1 for _ in pending)}
@@ -9,9 +9,9 @@ import os
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
-import chromadb
-from chromadb.config import Settings
-from langchain_openai import OpenAIEmbeddings
+
+from src.models import Article
+from src.perf import get_perf
 
 # Constants
 SIMILARITY_THRESHOLD = 0.85  # Reject if >85% similar
@@ -27,6 +27,10 @@ class ArticleMemory:
     
     def __init__(self):
         """Initialize Chroma client and collection"""
+        import chromadb
+        from chromadb.config import Settings
+        from langchain_openai import OpenAIEmbeddings
+
         DB_PATH.mkdir(parents=True, exist_ok=True)
         
         self.client = chromadb.PersistentClient(
@@ -53,12 +57,12 @@ class ArticleMemory:
                 metadata={"description": "Articles sent in AI News Digest"}
             )
     
-    def check_if_duplicate(self, article: Dict) -> Tuple[bool, Optional[str]]:
+    def check_if_duplicate(self, article: Article) -> Tuple[bool, Optional[str]]:
         """
         Check if article is too similar to recently sent content.
         
         Args:
-            article: Article dict with 'title' and 'summary'
+            article: Article with title and summary
         
         Returns:
             (is_duplicate, reason) tuple
@@ -67,7 +71,7 @@ class ArticleMemory:
             return False, None
         
         # Create query text
-        query_text = f"{article['title']} {article.get('summary', '')}"
+        query_text = f"{article.title} {article.summary}"
         
         # Calculate cutoff date (as Unix timestamp)
         cutoff_date = datetime.now() - timedelta(days=LOOKBACK_DAYS)
@@ -75,11 +79,12 @@ class ArticleMemory:
         
         try:
             # Query for similar articles in last LOOKBACK_DAYS
-            results = self.collection.query(
-                query_texts=[query_text],
-                n_results=5,
-                where={"sent_date": {"$gte": cutoff_timestamp}}
-            )
+            with get_perf().span('memory.query'):
+                results = self.collection.query(
+                    query_texts=[query_text],
+                    n_results=5,
+                    where={"sent_date": {"$gte": cutoff_timestamp}}
+                )
             
             # Check similarity scores
             if results['distances'] and len(results['distances'][0]) > 0:
@@ -107,12 +112,33 @@ class ArticleMemory:
             print(f"⚠️  RAG similarity check failed: {e}")
             return False, None
     
-    def store_article(self, article: Dict, category: str, quality_score: float):
+    def max_similarities(self, articles: List[Article]) -> List[float]:
+        """
+        Highest similarity of each article to anything sent in the last LOOKBACK_DAYS,
+        in one batched query (0.0 for every article when RAG is disabled or the query fails).
+        """
+        if not self.collection or not articles:
+            return [0.0] * len(articles)
+        
+        cutoff_timestamp = (datetime.now() - timedelta(days=LOOKBACK_DAYS)).timestamp()
+        try:
+            with get_perf().span('memory.query'):
+                results = self.collection.query(
+                    query_texts=[f"{article.title} {article.summary}" for article in articles],
+                    n_results=1,
+                    where={"sent_date": {"$gte": cutoff_timestamp}}
+                )
+            return [1 / (1 + distances[0]) if distances else 0.0 for distances in results['distances']]
+        except Exception as e:
+            print(f"⚠️  RAG similarity query failed: {e}")
+            return [0.0] * len(articles)
+    
+    def store_article(self, article: Article, category: str, quality_score: float):
         """
         Store sent article for future duplicate detection.
         
         Args:
-            article: Article dict with 'title', 'summary', 'link'
+            article: Article with title, summary and link
             category: Category the article was sent under
             quality_score: Quality score assigned to article
         """
@@ -121,27 +147,28 @@ class ArticleMemory:
         
         try:
             # Create document text
-            doc_text = f"{article['title']} {article.get('summary', '')}"
+            doc_text = f"{article.title} {article.summary}"
             
             # Create metadata (store sent_date as Unix timestamp for ChromaDB queries)
             metadata = {
-                'title': article['title'],
-                'url': article.get('link', ''),
+                'title': article.title,
+                'url': article.link,
                 'category': category,
                 'quality_score': quality_score,
                 'sent_date': datetime.now().timestamp(),
-                'source': article.get('source', 'Unknown')
+                'source': article.source
             }
             
             # Generate unique ID
-            doc_id = f"{datetime.now().timestamp()}_{article['title'][:50]}"
+            doc_id = f"{datetime.now().timestamp()}_{article.title[:50]}"
             
             # Add to collection
-            self.collection.add(
-                documents=[doc_text],
-                metadatas=[metadata],
-                ids=[doc_id]
-            )
+            with get_perf().span('memory.store'):
+                self.collection.add(
+                    documents=[doc_text],
+                    metadatas=[metadata],
+                    ids=[doc_id]
+                )
             
         except Exception as e:
             print(f"⚠️  Failed to store article in RAG memory: {e}")
@@ -0,0 +1,278 @@
+"""
+Persistent Article Store
+
+SQLite index of every fetched article, kept up to date by an incremental
+ingester (python main_scheduled.py ingest, e.g. hourly) instead of rebuilding
+the 7-day window from every source at digest time:
+- One row per canonical URL, skipping re-syndicated copies (same content hash)
+- Indexes on published, source, category and content hash
+- RSS conditional-GET state (ETag / Last-Modified) so unchanged feeds cost a 304
+- New articles are categorized once at ingest; stage outputs are written back
+  to the row after each digest run
+
+Scheduled runs read their candidates from the store (USE_ARTICLE_STORE=true),
+so digest time no longer depends on how many sources there are or whether
+they respond.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.ingest_deadline import finish_ingest_run
+from src.models import Article, StageResults
+from src.perf import get_perf
+
+STORE_PATH = Path(__file__).parent.parent / 'data' / 'article_store.db'
+CANDIDATE_DAYS = 7  # Same lookback window as the fetchers
+RETENTION_DAYS = 60  # Rows older than this are pruned at ingest
+MAX_STALENESS_HOURS = 24  # Scheduled runs ingest inline if the store is older than this
+INGEST_SAVE_EVERY = 50  # Categorizations committed per batch (a crash loses at most this many)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    canonical_url TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL,
+    title TEXT NOT NULL,
+    link TEXT NOT NULL,
+    source TEXT NOT NULL,
+    summary TEXT NOT NULL DEFAULT '',
+    published REAL,
+    score INTEGER,
+    num_comments INTEGER,
+    category TEXT,
+    stage_json TEXT,
+    fetched_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_articles_published ON articles(published);
+CREATE INDEX IF NOT EXISTS idx_articles_source ON articles(source);
+CREATE INDEX IF NOT EXISTS idx_articles_category ON articles(category);
+CREATE INDEX IF NOT EXISTS idx_articles_content_hash ON articles(content_hash);
+
+CREATE TABLE IF NOT EXISTS feed_state (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    modified TEXT
+);
+
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+ARTICLE_COLUMNS = "title, link, source, summary, published, score, num_comments, canonical_url, content_hash, category, stage_json"
+
+
+def use_article_store() -> bool:
+    """Scheduled runs read candidates from the store instead of fetching (opt-in)"""
+    return os.getenv("USE_ARTICLE_STORE", "false").lower() == "true"
+
+
+class ArticleStore:
+    """
+    SQLite-backed article index. One connection shared across threads behind a lock.
+    """
+
+    def __init__(self, path: Path = STORE_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def upsert_articles(self, articles: List[Article]) -> List[Article]:
+        """
+        Insert new articles; refresh engagement counts on ones already stored.
+
+        Returns:
+            Articles that were not in the store before (by URL or content hash)
+        """
+        now = time.time()
+        new_articles = []
+        with self.lock, self.conn:
+            for article in articles:
+                exists = self.conn.execute(
+                    "SELECT 1 FROM articles WHERE canonical_url = ? OR content_hash = ? LIMIT 1",
+                    (article.canonical_url, article.content_hash)
+                ).fetchone()
+                if exists:
+                    self.conn.execute(
+                        "UPDATE articles SET score = COALESCE(?, score), num_comments = COALESCE(?, num_comments), "
+                        "updated_at = ? WHERE canonical_url = ?",
+                        (article.score, article.num_comments, now, article.canonical_url)
+                    )
+                    continue
+                self.conn.execute(
+                    "INSERT INTO articles (canonical_url, content_hash, title, link, source, summary, published, "
+                    "score, num_comments, category, stage_json, fetched_at, updated_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (article.canonical_url, article.content_hash, article.title, article.link, article.source,
+                     article.summary, article.published.timestamp() if article.published else None,
+                     article.score, article.num_comments, article.stage.category,
+                     None, now, now)
+                )
+                new_articles.append(article)
+        return new_articles
+
+    def candidates(self, days: int = CANDIDATE_DAYS, category: Optional[str] = None) -> List[Article]:
+        """
+        Articles published in the last `days`, newest first (optionally one category).
+        """
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).timestamp()
+        query = f"SELECT {ARTICLE_COLUMNS} FROM articles WHERE published > ?"
+        params = [since]
+        if category:
+            query += " AND category = ?"
+            params.append(category)
+        with self.lock:
+            rows = self.conn.execute(query + " ORDER BY published DESC", params).fetchall()
+        return [self._row_to_article(row) for row in rows]
+
+    def uncategorized(self, days: int = CANDIDATE_DAYS) -> List[Article]:
+        """Recent articles whose categorization has not succeeded yet"""
+        since = (datetime.now(timezone.utc) - timedelta(days=days)).timestamp()
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT {ARTICLE_COLUMNS} FROM articles WHERE published > ? AND category IS NULL", (since,)
+            ).fetchall()
+        return [self._row_to_article(row) for row in rows]
+
+    def save_stage_results(self, articles: List[Article]):
+        """Write each article's category and stage outputs back to its row"""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "UPDATE articles SET category = COALESCE(?, category), stage_json = ?, updated_at = ? "
+                "WHERE canonical_url = ?",
+                [(article.stage.category, json.dumps(article.to_dict()['stage']), now, article.canonical_url)
+                 for article in articles]
+            )
+
+    def stage_saved_at(self) -> Dict[str, float]:
+        """{canonical_url: when stage outputs were last written} for rows a digest run processed"""
+        with self.lock:
+            rows = self.conn.execute("SELECT canonical_url, updated_at FROM articles WHERE stage_json IS NOT NULL").fetchall()
+        return dict(rows)
+
+    def load_feed_state(self) -> Dict[str, Dict[str, Optional[str]]]:
+        with self.lock:
+            rows = self.conn.execute("SELECT url, etag, modified FROM feed_state").fetchall()
+        return {url: {'etag': etag, 'modified': modified} for url, etag, modified in rows}
+
+    def save_feed_state(self, feed_state: Dict[str, Dict[str, Optional[str]]]):
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO feed_state (url, etag, modified) VALUES (?, ?, ?)",
+                [(url, state.get('etag'), state.get('modified')) for url, state in feed_state.items()]
+            )
+
+    def prune(self, retention_days: int = RETENTION_DAYS) -> int:
+        """Delete rows published more than retention_days ago. Returns rows deleted."""
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=retention_days)).timestamp()
+        with self.lock, self.conn:
+            return self.conn.execute("DELETE FROM articles WHERE published < ?", (cutoff,)).rowcount
+
+    def mark_ingested(self):
+        with self.lock, self.conn:
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('last_ingest_at', ?)",
+                              (str(time.time()),))
+
+    def last_ingest_age_hours(self) -> Optional[float]:
+        """Hours since the last completed ingest, or None if never ingested"""
+        with self.lock:
+            row = self.conn.execute("SELECT value FROM meta WHERE key = 'last_ingest_at'").fetchone()
+        return (time.time() - float(row[0])) / 3600 if row else None
+
+    def get_stats(self) -> Dict:
+        """Row counts per category and for the current candidate window"""
+        since = (datetime.now(timezone.utc) - timedelta(days=CANDIDATE_DAYS)).timestamp()
+        with self.lock:
+            total = self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            recent = self.conn.execute("SELECT COUNT(*) FROM articles WHERE published > ?", (since,)).fetchone()[0]
+            by_category = dict(self.conn.execute(
+                "SELECT COALESCE(category, 'Uncategorized'), COUNT(*) FROM articles WHERE published > ? GROUP BY 1",
+                (since,)
+            ).fetchall())
+        return {
+            'total_articles': total,
+            'candidate_articles': recent,
+            'by_category': by_category,
+            'last_ingest_hours_ago': self.last_ingest_age_hours(),
+        }
+
+    @staticmethod
+    def _row_to_article(row) -> Article:
+        title, link, source, summary, published, score, num_comments, canonical_url, content_hash, category, stage_json = row
+        stage = StageResults(**json.loads(stage_json)) if stage_json else StageResults()
+        stage.category = category
+        return Article(
+            title=title, link=link, source=source, summary=summary,
+            published=datetime.fromtimestamp(published, tz=timezone.utc) if published else None,
+            score=score, num_comments=num_comments,
+            canonical_url=canonical_url, content_hash=content_hash, stage=stage,
+        )
+
+
+def ingest(store: Optional[ArticleStore] = None, categorize: bool = True) -> Dict[str, int]:
+    """
+    Incremental ingestion: fetch every source (unchanged feeds cost a 304),
+    store articles not seen before, and categorize anything still uncategorized.
+
+    Returns:
+        Counts of fetched, new and categorized articles
+    """
+    from config import get_all_categories
+    from src.agents import categorize_article, fetch_articles_for_categories
+
+    store = store or get_article_store()
+    feed_state = store.load_feed_state()
+    with get_perf().span('ingest.fetch'):
+        articles = fetch_articles_for_categories(get_all_categories(), feed_state=feed_state)
+    store.save_feed_state(feed_state)
+    new_articles = store.upsert_articles(articles)
+
+    categorized = 0
+    if categorize:
+        # Includes rows left uncategorized by an earlier failed ingest
+        pending = store.uncategorized()
+        with get_perf().span('ingest.categorize'):
+            for start in range(0, len(pending), INGEST_SAVE_EVERY):
+                batch = pending[start:start + INGEST_SAVE_EVERY]
+                for article in batch:
+                    category = categorize_article(article)
+                    # A failed call stays uncategorized, so the next ingest retries it
+                    article.stage.category = None if 'categorize' in article.stage.fallbacks else category
+                store.save_stage_results(batch)
+                categorized += len(batch)
+
+    ingest_run = finish_ingest_run()
+    if ingest_run and ingest_run.problem_sources():
+        ingest_run.print_report()
+
+    pruned = store.prune()
+    store.mark_ingested()
+    counts = {'fetched': len(articles), 'new': len(new_articles), 'categorized': categorized, 'pruned': pruned}
+    print(f"✓ Ingest: {counts['fetched']} fetched, {counts['new']} new, "
+          f"{counts['categorized']} categorized, {counts['pruned']} pruned")
+    return counts
+
+
+_store_instance = None
+_store_lock = threading.Lock()
+
+
+def get_article_store() -> ArticleStore:
+    """Get or create singleton instance of ArticleStore"""
+    global _store_instance
+    with _store_lock:
+        if _store_instance is None:
+            _store_instance = ArticleStore()
+        return _store_instance
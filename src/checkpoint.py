@@ -0,0 +1,176 @@
+"""
+Pipeline Checkpoints
+
+Every stage of run_digest_for_day writes its output to
+data/checkpoints/<day>_<date>/<run_id>/<stage>.json. A resumed run loads the
+stages that already completed and restarts from the first missing one, so a
+crash at summarization or SMTP doesn't repeat fetching and every LLM call.
+
+Runs pre-seeded by batch mode are only used while their fetch is at most
+MAX_SEED_AGE_HOURS old, and runs dated more than RETENTION_DAYS ago are
+pruned so the directory (cached between workflow runs) does not grow forever.
+"""
+
+import json
+import os
+import shutil
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, List, Optional
+
+from src.models import Article
+from src.perf import get_perf
+
+CHECKPOINT_DIR = Path(__file__).parent.parent / 'data' / 'checkpoints'
+STAGES = ['fetch', 'anytime', 'categorize', 'dedup', 'relevance', 'score', 'veto', 'summarize', 'render', 'send', 'publish']
+COMPLETE_MARKER = '_complete'
+BATCH_RUN_ID = 'batch'  # Run pre-seeded with fetch + categorize by batch mode
+MAX_SEED_AGE_HOURS = float(os.getenv("MAX_SEED_AGE_HOURS", "72"))  # Monday's seed serves Wednesday, not Friday
+RETENTION_DAYS = 7
+
+
+def _encode(obj: Any) -> Any:
+    """JSON default hook: tag Articles so they round-trip as Articles"""
+    if isinstance(obj, Article):
+        return {'__article__': obj.to_dict()}
+    return str(obj)
+
+
+def _decode(obj: dict) -> Any:
+    """JSON object hook: rebuild tagged Articles"""
+    if '__article__' in obj:
+        return Article.from_dict(obj['__article__'])
+    return obj
+
+
+def make_day_key(day_name: str, date: Optional[datetime] = None) -> str:
+    """Checkpoint key for one scheduled digest, e.g. 'monday_2025-10-20'"""
+    return f"{day_name.lower()}_{(date or datetime.now()).strftime('%Y-%m-%d')}"
+
+
+class PipelineCheckpoint:
+    """
+    Stage outputs for one pipeline run, persisted as JSON files.
+    """
+
+    def __init__(self, day_key: str, run_id: Optional[str] = None):
+        self.day_key = day_key
+        self.run_id = run_id or datetime.now().strftime('%H-%M-%S')
+        self.path = CHECKPOINT_DIR / day_key / self.run_id
+
+    @property
+    def key(self) -> str:
+        """'<day_key>/<run_id>': identifies this run (shared by a resumed run)"""
+        return f"{self.day_key}/{self.run_id}"
+
+    @classmethod
+    def latest(cls, day_key: str, include_batch: bool = True) -> Optional['PipelineCheckpoint']:
+        """
+        Most recent unfinished run for day_key, or None if there is nothing to resume.
+        With include_batch=False, a run seeded by batch mode is never picked.
+        """
+        day_dir = CHECKPOINT_DIR / day_key
+        if not day_dir.exists():
+            return None
+        for run_dir in sorted((p for p in day_dir.iterdir() if p.is_dir()), reverse=True):
+            if not include_batch and run_dir.name == BATCH_RUN_ID:
+                continue
+            checkpoint = cls(day_key, run_dir.name)
+            if not checkpoint.is_complete():
+                return checkpoint
+        return None
+
+    @classmethod
+    def has_completed_run(cls, day_key: str) -> bool:
+        """True if any run for day_key finished (used to avoid sending a digest twice)"""
+        day_dir = CHECKPOINT_DIR / day_key
+        return day_dir.exists() and any((run_dir / COMPLETE_MARKER).exists() for run_dir in day_dir.iterdir())
+
+    @classmethod
+    def seeded(cls, day_key: str) -> Optional['PipelineCheckpoint']:
+        """
+        Unfinished run for day_key pre-seeded by batch mode, or None (also if its
+        fetch is older than MAX_SEED_AGE_HOURS, so the run fetches fresh articles).
+        """
+        checkpoint = cls(day_key, BATCH_RUN_ID)
+        if not checkpoint.has('fetch') or checkpoint.is_complete():
+            return None
+        age_hours = (time.time() - checkpoint._stage_file('fetch').stat().st_mtime) / 3600
+        if age_hours > MAX_SEED_AGE_HOURS:
+            print(f"  ⏭️  Ignoring batch seed for {day_key}: fetched {age_hours:.0f}h ago (max {MAX_SEED_AGE_HOURS:.0f}h)")
+            return None
+        return checkpoint
+
+    def _stage_file(self, stage: str) -> Path:
+        return self.path / f"{stage}.json"
+
+    def has(self, stage: str) -> bool:
+        """True if the stage already completed in this run"""
+        return self._stage_file(stage).exists()
+
+    def load(self, stage: str) -> Any:
+        with open(self._stage_file(stage), 'r', encoding='utf-8') as f:
+            return json.load(f, object_hook=_decode)
+
+    def save(self, stage: str, data: Any):
+        """Write stage output atomically so a crash never leaves a half-written checkpoint"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp_file = self._stage_file(stage).with_suffix('.tmp')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, default=_encode)
+        os.replace(tmp_file, self._stage_file(stage))
+
+    def completed_stages(self) -> List[str]:
+        return [stage for stage in STAGES if self.has(stage)]
+
+    def mark_complete(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        (self.path / COMPLETE_MARKER).touch()
+
+    def is_complete(self) -> bool:
+        return (self.path / COMPLETE_MARKER).exists()
+
+
+def prune_checkpoints(retention_days: int = RETENTION_DAYS) -> int:
+    """
+    Delete every run (finished or abandoned) of days dated more than retention_days ago.
+    Returns the number of day directories removed.
+    """
+    if not CHECKPOINT_DIR.exists():
+        return 0
+    cutoff = (datetime.now() - timedelta(days=retention_days)).strftime('%Y-%m-%d')
+    removed = 0
+    for day_dir in CHECKPOINT_DIR.iterdir():
+        date = day_dir.name.rsplit('_', 1)[-1]
+        if day_dir.is_dir() and len(date) == 10 and date < cutoff:
+            shutil.rmtree(day_dir, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+def run_stage(checkpoint: Optional[PipelineCheckpoint], stage: str, compute, funnel=None):
+    """
+    Return the stage's checkpointed output if present, otherwise compute and save it.
+    Either way the stage is timed as a 'stage.<name>' span in the perf report.
+
+    Args:
+        checkpoint: Checkpoint for this run (None disables checkpointing)
+        stage: Stage name from STAGES
+        compute: Zero-argument callable producing JSON-serializable output
+        funnel: Optional FunnelCounter (src.funnel) that records the stage's wall clock
+                and LLM cost when it actually runs
+    """
+    resumed = bool(checkpoint and checkpoint.has(stage))
+    perf = get_perf()
+    with perf.span(f'stage.{stage}', resumed=resumed):
+        if resumed:
+            print(f"  ↻ Loaded '{stage}' from checkpoint {checkpoint.day_key}/{checkpoint.run_id}")
+            return checkpoint.load(stage)
+        started, cost = time.perf_counter(), perf.thread_cost_usd()
+        result = compute()
+        if funnel:
+            funnel.record_stage(stage, time.perf_counter() - started, perf.thread_cost_usd() - cost)
+        if checkpoint:
+            checkpoint.save(stage, result)
+        return result
@@ -0,0 +1,217 @@
+"""
+Citation Enrichment
+
+Citation counts for arXiv candidates, resolved once per run instead of one
+Semantic Scholar request per scored article and per ReACT tool call:
+- enrich() collects the run's arXiv IDs and resolves the missing ones through
+  the bulk endpoint (POST /paper/batch, up to BATCH_SIZE IDs per request)
+- Results (including "not found") go into a TTL cache persisted in SQLite
+  (data/citation_cache.db) and held in memory, so the judge, the scorer and
+  the ReACT citation tool read citation counts without a request
+- Title lookups from the ReACT tool match enriched papers by normalized
+  title first; only unknown titles fall back to one search request, whose
+  answer is cached too
+- A failed batch is not retried per article (RETRY_AFTER_SECONDS)
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.models import Article, compute_content_hash
+from src.perf import get_perf, timed_request
+
+# Module-level so benchmarks/ can point it at a local replay server
+SEMANTIC_SCHOLAR_API_URL = "https://api.semanticscholar.org/graph/v1"
+
+CACHE_PATH = Path(__file__).parent.parent / 'data' / 'citation_cache.db'
+CITATION_TTL_HOURS = 24  # Counts move slowly; one refresh per daily digest is enough
+BATCH_SIZE = 500  # Semantic Scholar's limit for /paper/batch
+REQUEST_TIMEOUT_SECONDS = 10
+RETRY_AFTER_SECONDS = 600
+
+ARXIV_ID = re.compile(r'arxiv\.org/(?:abs|pdf)/(\d{4}\.\d{4,5})')
+ARXIV_ID_QUERY = re.compile(r'^\s*(?:arXiv:)?(\d{4}\.\d{4,5})(?:v\d+)?\s*$', re.IGNORECASE)  # Bare ID from the ReACT tool
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS citations (
+    key TEXT PRIMARY KEY,
+    found INTEGER NOT NULL,
+    citation_count INTEGER NOT NULL,
+    title TEXT,
+    year INTEGER,
+    expires_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_citations_expires_at ON citations(expires_at);
+"""
+
+
+def arxiv_id_for(link: str) -> Optional[str]:
+    """arXiv ID (without version) of an abs/pdf link, or None"""
+    match = ARXIV_ID.search(link or '')
+    return match.group(1) if match else None
+
+
+class CitationIndex:
+    """
+    TTL cache of Semantic Scholar paper records, keyed by 'arXiv:<id>' or 'title:<hash>'.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, ttl_hours: float = CITATION_TTL_HOURS):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_hours * 3600
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.retry_at: Dict[str, float] = {}
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM citations WHERE expires_at < ?", (time.time(),))
+            rows = self.conn.execute("SELECT key, found, citation_count, title, year, expires_at FROM citations").fetchall()
+        self.records = {
+            key: {'found': bool(found), 'citations': count, 'title': title, 'year': year, 'expires_at': expires_at}
+            for key, found, count, title, year, expires_at in rows
+        }
+        self.titles = {compute_content_hash(record['title']): key for key, record in self.records.items() if record['title']}
+
+    def lookup(self, key: str) -> Optional[Dict]:
+        """Unexpired record for key, or None"""
+        record = self.records.get(key)
+        if record and record['expires_at'] < time.time():
+            return None
+        return record
+
+    def _store(self, records: Dict[str, Dict]):
+        expires_at = time.time() + self.ttl_seconds
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO citations (key, found, citation_count, title, year, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [(key, int(record['found']), record['citations'], record['title'], record['year'], expires_at)
+                 for key, record in records.items()]
+            )
+            for key, record in records.items():
+                self.records[key] = {**record, 'expires_at': expires_at}
+                if record['title']:
+                    self.titles[compute_content_hash(record['title'])] = key
+
+    def enrich(self, articles: Iterable[Article]) -> int:
+        """
+        Resolve citation counts for every arXiv article not already cached.
+
+        Returns:
+            Number of batch requests made (0 when everything was cached)
+        """
+        now = time.time()
+        missing = {}  # key -> article title hash, so the ReACT tool can find the paper by its feed title
+        for article in articles:
+            paper_id = arxiv_id_for(article.link)
+            if not paper_id:
+                continue
+            key = f"arXiv:{paper_id}"
+            if self.lookup(key) is None and self.retry_at.get(key, 0) <= now:
+                missing.setdefault(key, article.content_hash)
+            else:
+                get_perf().record_cache('citations', True)
+
+        requests = resolved = 0
+        pending = list(missing)
+        for start in range(0, len(pending), BATCH_SIZE):
+            keys = pending[start:start + BATCH_SIZE]
+            requests += 1
+            for _ in keys:
+                get_perf().record_cache('citations', False)
+            try:
+                response = timed_request(
+                    'POST', f"{SEMANTIC_SCHOLAR_API_URL}/paper/batch", 'Semantic Scholar',
+                    params={'fields': 'citationCount,title,year'}, json={'ids': keys},
+                    timeout=REQUEST_TIMEOUT_SECONDS,
+                )
+                response.raise_for_status()
+                papers = response.json()
+            except Exception as e:
+                print(f"  ⚠️  Citation batch failed ({len(keys)} papers): {e}")
+                for key in keys:
+                    self.retry_at[key] = now + RETRY_AFTER_SECONDS
+                continue
+            # Results are aligned with the requested IDs; unknown papers come back as null
+            self._store({
+                key: {'found': paper is not None, 'citations': (paper or {}).get('citationCount') or 0,
+                      'title': (paper or {}).get('title'), 'year': (paper or {}).get('year')}
+                for key, paper in zip(keys, papers)
+            })
+            for key in keys:
+                self.titles.setdefault(missing[key], key)
+            resolved += len(keys)
+        if resolved:
+            print(f"  ✓ Citation counts: {resolved} papers resolved in {requests} batch request(s)")
+        return requests
+
+    def citation_count(self, article: Article) -> int:
+        """
+        Citation count for an article (0 for non-arXiv or unknown papers).
+        Articles not enriched yet are resolved on their own (one batch request).
+        """
+        paper_id = arxiv_id_for(article.link)
+        if not paper_id:
+            return 0
+        record = self.lookup(f"arXiv:{paper_id}")
+        if record is None:
+            self.enrich([article])
+            record = self.lookup(f"arXiv:{paper_id}")
+        return record['citations'] if record else 0
+
+    def search(self, query: str) -> Optional[Dict]:
+        """
+        Paper record for an arXiv ID or a title: enriched papers first, then one
+        cached search request. Returns None if nothing was found.
+        """
+        id_match = ARXIV_ID_QUERY.match(query)
+        paper_id = arxiv_id_for(query) or (id_match.group(1) if id_match else None)
+        if paper_id:
+            key = f"arXiv:{paper_id}"
+            if self.lookup(key) is None:
+                self.enrich([Article(title='', link=f"https://arxiv.org/abs/{paper_id}", source='arXiv')])
+            record = self.lookup(key)
+            return record if record and record['found'] else None
+
+        title_hash = compute_content_hash(query)
+        key = f"title:{title_hash}"
+        record = next((self.lookup(candidate) for candidate in (self.titles.get(title_hash), key)
+                       if candidate and self.lookup(candidate)), None)
+        get_perf().record_cache('citations', record is not None)
+        if record:
+            return record if record['found'] else None
+
+        response = timed_request(
+            'GET', f"{SEMANTIC_SCHOLAR_API_URL}/paper/search", 'Semantic Scholar',
+            params={'query': query, 'limit': 1, 'fields': 'citationCount,title,year'},
+            timeout=REQUEST_TIMEOUT_SECONDS,
+        )
+        response.raise_for_status()
+        papers = response.json().get('data') or []
+        paper = papers[0] if papers else None
+        self._store({key: {'found': paper is not None, 'citations': (paper or {}).get('citationCount') or 0,
+                           'title': (paper or {}).get('title'), 'year': (paper or {}).get('year')}})
+        return self.lookup(key) if paper else None
+
+
+_index_instance = None
+_index_lock = threading.Lock()
+
+
+def get_citation_index() -> CitationIndex:
+    """Get or create singleton instance of CitationIndex"""
+    global _index_instance
+    with _index_lock:
+        if _index_instance is None:
+            _index_instance = CitationIndex()
+        return _index_instance
+
+
+def enrich_citations(articles: List[Article]) -> int:
+    """Enrichment stage: citation counts for every arXiv candidate of the run in a few batch requests"""
+    return get_citation_index().enrich(articles)
@@ -0,0 +1,242 @@
+"""
+Scheduler Daemon
+
+Long-running alternative to one-shot cron invocations (python main_scheduled.py daemon).
+The process stays up, so imports, the Chroma client, the article store and
+HTTP connection pools are warm for every job:
+- Ingests into the article store every INGEST_INTERVAL_MINUTES
+- Prepares each scheduled day's digest (fetch → summarize) PREPARE_LEAD_MINUTES
+  before send time, so at send time only render, send and publish remain
+  (with ANYTIME_PIPELINE=true, preparation stops in time for the send)
+- Sends on the WEEKLY_SCHEDULE timetable at DIGEST_TIME_UTC (same as the workflow cron)
+- Serves GET /health (JSON) and GET /metrics (Prometheus text) on DAEMON_PORT
+"""
+
+import json
+import os
+import signal
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict
+
+from config import WEEKLY_SCHEDULE
+from src.checkpoint import PipelineCheckpoint, make_day_key
+from src.perf import get_perf
+
+DIGEST_TIME_UTC = os.getenv("DIGEST_TIME_UTC", "08:00")
+PREPARE_LEAD_MINUTES = int(os.getenv("PREPARE_LEAD_MINUTES", "90"))
+INGEST_INTERVAL_MINUTES = int(os.getenv("INGEST_INTERVAL_MINUTES", "60"))
+DAEMON_PORT = int(os.getenv("DAEMON_PORT", "8765"))
+POLL_SECONDS = 30
+SEND_RETRY_MINUTES = 15
+MAX_SEND_ATTEMPTS = 3
+UNHEALTHY_INGEST_INTERVALS = 3  # /health reports 503 after this many missed ingests
+
+
+class DigestDaemon:
+    """
+    Runs ingestion and the digest timetable in one process.
+
+    Args:
+        run_digest: main_scheduled.run_digest_for_day
+        run_ingest: Callable performing one incremental ingest
+    """
+
+    def __init__(self, run_digest: Callable, run_ingest: Callable):
+        self.run_digest = run_digest
+        self.run_ingest = run_ingest
+        self.started_at = time.time()
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.jobs: Dict[str, Dict] = {}
+        self.llm_totals = {'calls': 0, 'input_tokens': 0, 'output_tokens': 0, 'cost_usd': 0.0}
+        self.next_ingest_at = 0.0
+        self.prepared = set()
+        self.send_attempts: Dict[str, Dict] = {}
+        self.current_job = None
+
+    def warm_up(self):
+        """Load the heavy clients once so jobs don't pay for them"""
+        from src.agents import get_llm
+        from src.article_memory import get_article_memory
+        from src.article_store import get_article_store
+        from src.perf import get_http_session
+        from src.prompts import count_tokens
+
+        print("🔥 Warming up (LLM client, Chroma, article store, HTTP pool, tokenizer)...")
+        get_llm()
+        get_article_memory()
+        get_article_store()
+        get_http_session()
+        count_tokens("warm up")
+
+    def send_time(self, now: datetime) -> datetime:
+        hour, minute = (int(part) for part in DIGEST_TIME_UTC.split(':'))
+        return now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+    def due_jobs(self, now: datetime):
+        """(job, day, callable) for everything due at `now` (UTC)"""
+        jobs = []
+        if time.time() >= self.next_ingest_at:
+            self.next_ingest_at = time.time() + INGEST_INTERVAL_MINUTES * 60
+            jobs.append(('ingest', None, self.run_ingest))
+
+        day = now.strftime('%A').lower()
+        if day not in WEEKLY_SCHEDULE:
+            return jobs
+        day_key = make_day_key(day)
+        if PipelineCheckpoint.has_completed_run(day_key):
+            return jobs
+
+        send_at = self.send_time(now)
+        prepare_at = send_at - timedelta(minutes=PREPARE_LEAD_MINUTES)
+        if prepare_at <= now < send_at and day_key not in self.prepared:
+            self.prepared.add(day_key)
+            # Batch seeds are ignored: the hourly ingest keeps the article store fresher than any batch fetch
+            jobs.append(('prepare', day, lambda: self.run_digest(day, prepare_only=True, send_at=send_at.timestamp(),
+                                                                 batch_seed=False)))
+        elif now >= send_at:
+            attempts = self.send_attempts.setdefault(day_key, {'count': 0, 'last': 0.0})
+            retry_due = time.time() - attempts['last'] >= SEND_RETRY_MINUTES * 60
+            if attempts['count'] < MAX_SEND_ATTEMPTS and retry_due:
+                attempts['count'] += 1
+                attempts['last'] = time.time()
+                # Resumes the prepared run, so only the final stages remain
+                jobs.append(('send', day, lambda: self.run_digest(day, resume=True, batch_seed=False)))
+        return jobs
+
+    def run_job(self, job: str, day, compute: Callable):
+        key = f"{job}:{day}" if day else job
+        with self.lock:
+            stats = self.jobs.setdefault(key, {
+                'job': job, 'day': day, 'runs': 0, 'failures': 0, 'last_status': None,
+                'last_error': None, 'last_duration_seconds': None, 'last_success_at': None,
+            })
+            self.current_job = key
+        print(f"\n⏰ [{datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M')} UTC] Running {key}")
+
+        started = time.time()
+        status, error = 'ok', None
+        try:
+            compute()
+        except Exception as e:
+            status, error = 'failed', str(e)
+            print(f"✗ {key} failed: {e}")
+
+        llm = get_perf().report()['llm_totals']  # The job's own perf run
+        with self.lock:
+            stats['runs'] += 1
+            stats['failures'] += status == 'failed'
+            stats['last_status'] = status
+            stats['last_error'] = error
+            stats['last_duration_seconds'] = round(time.time() - started, 2)
+            if status == 'ok':
+                stats['last_success_at'] = time.time()
+            for field in self.llm_totals:
+                self.llm_totals[field] += llm[field]
+            self.current_job = None
+
+    def loop(self):
+        while not self.stop_event.is_set():
+            for job, day, compute in self.due_jobs(datetime.now(timezone.utc)):
+                if self.stop_event.is_set():
+                    break
+                self.run_job(job, day, compute)
+            self.stop_event.wait(POLL_SECONDS)
+
+    def health(self) -> Dict:
+        with self.lock:
+            ingest = self.jobs.get('ingest', {})
+            last_ingest = ingest.get('last_success_at')
+            max_age = UNHEALTHY_INGEST_INTERVALS * INGEST_INTERVAL_MINUTES * 60
+            healthy = last_ingest is not None and time.time() - last_ingest < max_age
+            return {
+                'status': 'ok' if healthy or time.time() - self.started_at < max_age else 'degraded',
+                'uptime_seconds': round(time.time() - self.started_at),
+                'current_job': self.current_job,
+                'next_ingest_in_seconds': max(0, round(self.next_ingest_at - time.time())),
+                'jobs': json.loads(json.dumps(self.jobs)),
+            }
+
+    def metrics(self) -> str:
+        """Prometheus text exposition"""
+        lines = [
+            "# TYPE ainews_uptime_seconds gauge",
+            f"ainews_uptime_seconds {time.time() - self.started_at:.0f}",
+        ]
+        with self.lock:
+            for name, kind, field in [
+                ('ainews_job_runs_total', 'counter', 'runs'),
+                ('ainews_job_failures_total', 'counter', 'failures'),
+                ('ainews_job_last_duration_seconds', 'gauge', 'last_duration_seconds'),
+                ('ainews_job_last_success_timestamp', 'gauge', 'last_success_at'),
+            ]:
+                lines.append(f"# TYPE {name} {kind}")
+                for stats in self.jobs.values():
+                    if stats[field] is not None:
+                        lines.append(f'{name}{{job="{stats["job"]}",day="{stats["day"] or ""}"}} {stats[field]}')
+            lines.extend([
+                "# TYPE ainews_llm_calls_total counter",
+                f"ainews_llm_calls_total {self.llm_totals['calls']}",
+                "# TYPE ainews_llm_tokens_total counter",
+                f'ainews_llm_tokens_total{{direction="input"}} {self.llm_totals["input_tokens"]}',
+                f'ainews_llm_tokens_total{{direction="output"}} {self.llm_totals["output_tokens"]}',
+                "# TYPE ainews_llm_cost_usd_total counter",
+                f"ainews_llm_cost_usd_total {self.llm_totals['cost_usd']:.6f}",
+            ])
+        return "\n".join(lines) + "\n"
+
+    def start_health_server(self, port: int = DAEMON_PORT) -> ThreadingHTTPServer:
+        daemon = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/health':
+                    health = daemon.health()
+                    body = json.dumps(health, indent=2).encode('utf-8')
+                    self.send_response(200 if health['status'] == 'ok' else 503)
+                    self.send_header('Content-Type', 'application/json')
+                elif self.path == '/metrics':
+                    body = daemon.metrics().encode('utf-8')
+                    self.send_response(200)
+                    self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                else:
+                    self.send_error(404)
+                    return
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('0.0.0.0', port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"🩺 Health on http://localhost:{port}/health, metrics on /metrics")
+        return server
+
+
+def run_daemon(run_digest: Callable, run_ingest: Callable):
+    """
+    Run the scheduler until SIGINT/SIGTERM. Digests read from the article store.
+    """
+    os.environ["USE_ARTICLE_STORE"] = "true"
+    daemon = DigestDaemon(run_digest, run_ingest)
+    daemon.warm_up()
+    server = daemon.start_health_server()
+
+    def stop(signum, frame):
+        print("\n🛑 Stopping after the current job...")
+        daemon.stop_event.set()
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    print(f"📅 Daemon running: digests at {DIGEST_TIME_UTC} UTC on "
+          f"{', '.join(day.capitalize() for day in WEEKLY_SCHEDULE)}, ingest every {INGEST_INTERVAL_MINUTES} min")
+    try:
+        daemon.loop()
+    finally:
+        server.shutdown()
@@ -0,0 +1,286 @@
+"""
+RSS/Atom Feed Fetching
+
+Feeds are downloaded concurrently on threads (shared HTTP session, conditional
+GETs) and parsed in a process pool, so parse CPU spreads across cores instead
+of running inline one feed at a time:
+- Fast path: a streaming lxml parser (stdlib ElementTree if lxml is missing)
+  that keeps only title, link, summary and published per entry, clearing each
+  item as it goes, instead of feedparser's full structure
+- Malformed or unrecognized feeds fall back to feedparser
+- Workers return plain dicts, so only the four fields cross the process boundary
+
+FEED_PARSE_PROCESSES=0 parses inline (no pool).
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from io import BytesIO
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from src.ingest_deadline import get_ingest_run
+from src.perf import get_perf, timed_request
+
+FEED_FETCH_CONCURRENCY = 16  # Downloads in flight (bounded by the shared HTTP pool)
+FEED_TIMEOUT_SECONDS = 20  # Default for download_feed on its own; fetch_feeds uses the ingestion deadline
+FEED_HEADERS = {'User-Agent': 'Mozilla/5.0 (compatible; AInews/1.0; +https://github.com/Nordic-OG-Raven/AInews)'}
+
+ITEM_TAGS = {'item', 'entry'}  # RSS 2.0 / RSS 1.0 items, Atom entries (local names)
+SUMMARY_TAGS = ['description', 'summary', 'encoded', 'content']  # Preference order
+PUBLISHED_TAGS = ['pubDate', 'published', 'date', 'issued', 'updated']
+
+
+def feed_parse_processes() -> int:
+    return int(os.getenv("FEED_PARSE_PROCESSES", str(min(os.cpu_count() or 1, 8))))
+
+
+def _local_name(tag) -> str:
+    return tag.rsplit('}', 1)[-1] if isinstance(tag, str) else ''
+
+
+def _parse_date(value: Optional[str]) -> Optional[datetime]:
+    """RFC 822 (RSS) or ISO 8601 (Atom) date as an aware UTC datetime"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        try:
+            parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def _parse_fast(content: bytes, limit: Optional[int]) -> Dict:
+    """
+    Streaming parse keeping only the fields the pipeline uses.
+    Raises on malformed XML or if the document has no items.
+    """
+    try:
+        from lxml.etree import iterparse
+    except ImportError:
+        from xml.etree.ElementTree import iterparse
+
+    feed_title = None
+    entries = []
+    depth = 0
+    item_depth = None
+    fields = {}
+    for event, element in iterparse(BytesIO(content), events=('start', 'end')):
+        name = _local_name(element.tag)
+        if event == 'start':
+            depth += 1
+            if item_depth is None and name in ITEM_TAGS:
+                item_depth = depth
+                fields = {}
+            continue
+
+        if item_depth is None:
+            if name == 'title' and feed_title is None:
+                feed_title = ''.join(element.itertext()).strip()
+        elif depth == item_depth + 1:
+            if name == 'link':
+                # Atom: <link rel="alternate" href="..."/>; RSS: <link>url</link>
+                href = element.get('href')
+                if href and element.get('rel', 'alternate') == 'alternate':
+                    fields.setdefault('link', href)
+                elif not href and element.text:
+                    fields.setdefault('link', element.text.strip())
+            elif name in ('title', *SUMMARY_TAGS, *PUBLISHED_TAGS) and name not in fields:
+                fields[name] = ''.join(element.itertext()).strip()
+        elif depth == item_depth:
+            entries.append({
+                'title': fields.get('title', ''),
+                'link': fields.get('link', ''),
+                'summary': next((fields[tag] for tag in SUMMARY_TAGS if fields.get(tag)), ''),
+                'published': next((_parse_date(fields[tag]) for tag in PUBLISHED_TAGS if fields.get(tag)), None),
+            })
+            item_depth = None
+            if limit and len(entries) >= limit:
+                break
+
+        depth -= 1
+        if item_depth is None:
+            element.clear()  # Finished items and feed-level elements are no longer needed
+
+    if not entries:
+        raise ValueError("no items found")
+    return {'title': feed_title, 'entries': entries}
+
+
+def _parse_with_feedparser(content: bytes, limit: Optional[int]) -> Dict:
+    import calendar
+    import feedparser
+
+    feed = feedparser.parse(content)
+    entries = []
+    for entry in feed.entries[:limit] if limit else feed.entries:
+        parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+        entries.append({
+            'title': entry.get('title', ''),
+            'link': entry.get('link', ''),
+            'summary': entry.get('summary', ''),
+            'published': datetime.fromtimestamp(calendar.timegm(parsed), tz=timezone.utc) if parsed else None,
+        })
+    return {'title': feed.feed.get('title'), 'entries': entries}
+
+
+def parse_feed_content(content: bytes, limit: Optional[int] = None) -> Dict:
+    """
+    Parse one feed document. Runs in a pool worker.
+
+    Returns:
+        {'title': feed title or None, 'entries': [{'title', 'link', 'summary', 'published'}]}
+    """
+    try:
+        return _parse_fast(content, limit)
+    except Exception:
+        return _parse_with_feedparser(content, limit)
+
+
+def download_feed(url: str, state: Optional[Dict] = None, timeout: float = FEED_TIMEOUT_SECONDS):
+    """
+    Conditional GET of one feed.
+
+    Returns:
+        (content bytes or None if unchanged (HTTP 304), {'etag', 'modified'})
+    """
+    state = state or {}
+    headers = dict(FEED_HEADERS)
+    if state.get('etag'):
+        headers['If-None-Match'] = state['etag']
+    if state.get('modified'):
+        headers['If-Modified-Since'] = state['modified']
+    response = timed_request('GET', url, urlsplit(url).netloc, headers=headers, timeout=timeout)
+    if response.status_code == 304:
+        return None, state
+    response.raise_for_status()
+    return response.content, {'etag': response.headers.get('ETag'), 'modified': response.headers.get('Last-Modified')}
+
+
+_parse_pool = None
+_parse_pool_lock = threading.Lock()
+
+
+def get_parse_pool() -> Optional[ProcessPoolExecutor]:
+    """Shared parse pool (None when FEED_PARSE_PROCESSES=0). Workers start fresh, not forked mid-download."""
+    global _parse_pool
+    processes = feed_parse_processes()
+    if processes <= 0:
+        return None
+    with _parse_pool_lock:
+        if _parse_pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+            _parse_pool = ProcessPoolExecutor(max_workers=processes, mp_context=context)
+        return _parse_pool
+
+
+def _discard_parse_pool():
+    """Drop a broken pool so the next fetch starts a new one"""
+    global _parse_pool
+    with _parse_pool_lock:
+        _parse_pool = None
+
+
+def _submit_parse(pool: Optional[ProcessPoolExecutor], content: bytes, limit: Optional[int]):
+    """Parse job for the pool, or None to parse inline"""
+    if pool is None:
+        return None
+    try:
+        return pool.submit(parse_feed_content, content, limit)
+    except BrokenProcessPool:
+        _discard_parse_pool()
+        return None
+
+
+def fetch_feeds(urls: List[str], feed_state: Optional[Dict] = None, limit: Optional[int] = None,
+                limits: Optional[Dict[str, Optional[int]]] = None) -> Dict[str, Dict]:
+    """
+    Download and parse several feeds within the current ingestion deadline.
+
+    Args:
+        urls: Feed URLs
+        feed_state: Optional {url: {'etag', 'modified'}} for conditional GETs, updated in place.
+                    An unchanged feed (HTTP 304) comes back with no entries.
+        limit: Keep only the first `limit` entries of each feed
+        limits: Optional per-feed overrides of limit, {url: limit} (see src.source_scheduler)
+
+    Returns:
+        {url: parsed feed} in the order of urls; feeds that failed or missed the deadline are left out
+    """
+    run = get_ingest_run()
+    if run.expired():
+        for url in urls:
+            run.record(url, 'skipped', detail='ingestion deadline already passed')
+        return {}
+
+    def download(url):
+        # Queued downloads get whatever time is left when they start
+        if run.expired():
+            raise TimeoutError("ingestion deadline passed before the request started")
+        started = time.monotonic()
+        try:
+            return (*download_feed(url, (feed_state or {}).get(url), run.timeout()), time.monotonic() - started)
+        except Exception as e:
+            run.record_error(url, time.monotonic() - started, e)
+            raise
+
+    limits = {url: (limits or {}).get(url, limit) for url in urls}
+    pool = get_parse_pool()
+    parsed = {}
+    pending = {}
+    downloads = ThreadPoolExecutor(max_workers=FEED_FETCH_CONCURRENCY)
+    try:
+        with get_perf().span('feeds.fetch', feeds=len(urls)):
+            futures = {downloads.submit(download, url): url for url in urls}
+            try:
+                # Hand each document to the parse pool as soon as it arrives
+                for future in as_completed(futures, timeout=run.remaining()):
+                    url = futures[future]
+                    try:
+                        content, state, seconds = future.result()
+                    except Exception as e:
+                        print(f"  ✗ Feed {url}: {e}")
+                        continue
+                    run.record(url, 'ok', seconds)
+                    if feed_state is not None and (state.get('etag') or state.get('modified')):
+                        feed_state[url] = state
+                    if content is None:
+                        parsed[url] = {'title': None, 'entries': []}
+                    else:
+                        pending[url] = (_submit_parse(pool, content, limits[url]), content)
+            except FuturesTimeout:
+                abandoned = [url for future, url in futures.items() if not future.done()]
+                for url in abandoned:
+                    run.record(url, 'timeout', run.elapsed(), 'abandoned at the ingestion deadline')
+                print(f"  ⏱️  Ingestion deadline reached: abandoned {len(abandoned)} feeds")
+    finally:
+        downloads.shutdown(wait=False, cancel_futures=True)  # Don't wait on abandoned requests
+
+    with get_perf().span('feeds.parse', feeds=len(pending)):
+        for url, (job, content) in pending.items():
+            try:
+                parsed[url] = (job.result(timeout=max(run.remaining(), 1.0)) if job
+                               else parse_feed_content(content, limits[url]))
+            except BrokenProcessPool:
+                _discard_parse_pool()
+                parsed[url] = parse_feed_content(content, limits[url])  # Worker died: parse inline
+            except FuturesTimeout:
+                run.record(url, 'timeout', run.elapsed(), 'parse did not finish before the ingestion deadline')
+            except Exception as e:
+                print(f"  ✗ Feed {url}: could not parse ({e})")
+                run.record(url, 'failed', detail=f"parse error: {e}")
+    return {url: parsed[url] for url in urls if url in parsed}
@@ -0,0 +1,314 @@
+"""
+Funnel Analytics Store
+
+Per-source conversion funnels, stage latency and LLM cost for every digest
+run, kept in one append-only SQLite store (data/funnel.db) instead of a
+pretty-printed JSON file per day:
+- A FunnelCounter per run: the pipeline counts each stage's survivors by
+  source as the stage finishes, and times the stage and its LLM spend
+- One row per (run, stage, source) with indexes by source, stage and date,
+  written in a single transaction when the run ends; a resumed run replaces
+  its own rows instead of double counting
+- Each target-category candidate is also kept once per (category, article)
+  with whether it made a digest, so source conversion can be measured over
+  distinct articles even when the same stored article is a candidate in
+  several runs (src.source_scheduler)
+- Queried over months with plain SQL aggregates (python main_scheduled.py
+  funnel ...), without loading any per-run files
+
+Funnel stages, in order: fetched, categorized, dedup, relevance, quality, veto, final.
+"""
+
+import argparse
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from src.models import Article
+
+FUNNEL_DB_PATH = Path(__file__).parent.parent / 'data' / 'funnel.db'
+LEGACY_ANALYTICS_DIR = "outputs/source_analytics"  # Per-day JSON files written before the store existed
+FUNNEL_STAGES = ['fetched', 'categorized', 'dedup', 'relevance', 'quality', 'veto', 'final']
+CANDIDATE_STAGE = 'categorized'  # Articles that matched the run's category: the conversion denominator
+DEFAULT_QUERY_DAYS = 90
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS funnel_counts (
+    run_id TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    source TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (run_id, stage, source)
+);
+CREATE INDEX IF NOT EXISTS idx_funnel_counts_source ON funnel_counts(source, run_date);
+CREATE INDEX IF NOT EXISTS idx_funnel_counts_stage ON funnel_counts(stage, run_date);
+CREATE INDEX IF NOT EXISTS idx_funnel_counts_date ON funnel_counts(run_date);
+
+CREATE TABLE IF NOT EXISTS stage_runs (
+    run_id TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    cost_usd REAL NOT NULL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (run_id, stage)
+);
+CREATE INDEX IF NOT EXISTS idx_stage_runs_stage ON stage_runs(stage, run_date);
+CREATE INDEX IF NOT EXISTS idx_stage_runs_date ON stage_runs(run_date);
+
+CREATE TABLE IF NOT EXISTS source_articles (
+    category TEXT NOT NULL,
+    canonical_url TEXT NOT NULL,
+    source TEXT NOT NULL,
+    run_date TEXT NOT NULL,
+    final INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (category, canonical_url)
+);
+CREATE INDEX IF NOT EXISTS idx_source_articles_date ON source_articles(run_date);
+"""
+
+PERIOD_FORMATS = {'day': '%Y-%m-%d', 'week': '%Y-W%W', 'month': '%Y-%m'}
+
+
+class FunnelCounter:
+    """
+    Funnel counts and stage timings for one digest run, flushed to the store at the end.
+    """
+
+    def __init__(self, run_id: str, category: str, run_date: Optional[str] = None):
+        self.run_id = run_id
+        self.category = category
+        self.run_date = run_date or datetime.now().strftime('%Y-%m-%d')
+        self.lock = threading.Lock()
+        self.counts = defaultdict(lambda: defaultdict(int))  # stage -> source -> count
+        self.candidates = {}  # canonical URL -> source, for CANDIDATE_STAGE
+        self.finalists = set()  # canonical URLs counted as 'final'
+        self.stages = {}  # stage -> (seconds, cost_usd)
+
+    def count(self, stage: str, articles: Iterable[Article]) -> Iterable[Article]:
+        """Count a stage's surviving articles by source. Returns articles unchanged."""
+        with self.lock:
+            counts = self.counts[stage]
+            counts.clear()  # A stage reports its survivors once
+            for article in articles:
+                counts[article.source] += 1
+            if stage == CANDIDATE_STAGE:
+                self.candidates = {article.canonical_url: article.source for article in articles}
+            elif stage == 'final':
+                self.finalists = {article.canonical_url for article in articles}
+        return articles
+
+    def record_stage(self, stage: str, seconds: float, cost_usd: float):
+        with self.lock:
+            self.stages[stage] = (seconds, cost_usd)
+
+    def source_analytics(self) -> List[Dict]:
+        """Per-source funnel of this run, most productive sources first"""
+        with self.lock:
+            sources = list(self.counts['fetched'])
+            rows = [{'source': source, **{stage: self.counts[stage].get(source, 0) for stage in FUNNEL_STAGES}}
+                    for source in sources]
+        for row in rows:
+            row['cat_rate'] = f"{100 * row['categorized'] / row['fetched']:.1f}%"
+            row['final_rate'] = f"{100 * row['final'] / row['fetched']:.1f}%"
+        rows.sort(key=lambda row: row['final'], reverse=True)
+        return rows
+
+    def flush(self, store: Optional['FunnelStore'] = None):
+        """Write the run's rows (no-op if nothing was counted)"""
+        with self.lock:
+            counts = [(stage, source, count) for stage, by_source in self.counts.items()
+                      for source, count in by_source.items()]
+            stages = [(stage, seconds, cost) for stage, (seconds, cost) in self.stages.items()]
+            candidates = [(url, source, url in self.finalists) for url, source in self.candidates.items()]
+        if counts or stages:
+            (store or get_funnel_store()).append(self.run_id, self.run_date, self.category, counts, stages, candidates)
+
+
+class FunnelStore:
+    """
+    SQLite funnel history. One connection shared across threads behind a lock.
+    """
+
+    def __init__(self, path: Path = FUNNEL_DB_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def append(self, run_id: str, run_date: str, category: str, counts: List[tuple], stages: List[tuple],
+               candidates: Iterable[tuple] = ()):
+        """
+        Store one run in a single transaction.
+
+        Args:
+            counts: (stage, source, count) rows
+            stages: (stage, seconds, cost_usd) rows
+            candidates: (canonical_url, source, made_final) rows; an article already
+                recorded for this category keeps its first run date, and stays final once final
+        """
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO funnel_counts (run_id, run_date, category, stage, source, count, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, run_date, category, stage, source, count, now) for stage, source, count in counts]
+            )
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO stage_runs (run_id, run_date, category, stage, seconds, cost_usd, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(run_id, run_date, category, stage, seconds, cost, now) for stage, seconds, cost in stages]
+            )
+            self.conn.executemany(
+                "INSERT INTO source_articles (category, canonical_url, source, run_date, final) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (category, canonical_url) DO UPDATE SET final = MAX(final, excluded.final)",
+                [(category, url, source, run_date, int(final)) for url, source, final in candidates]
+            )
+
+    def last_recorded_at(self) -> Optional[float]:
+        with self.lock:
+            return self.conn.execute("SELECT MAX(recorded_at) FROM funnel_counts").fetchone()[0]
+
+    def source_conversions(self, days: int) -> Dict[str, Dict[str, int]]:
+        """
+        {source: {'candidates': n, 'final': n}} over distinct (category, article) candidates
+        first seen in the last `days`, however many runs they were candidates in.
+        """
+        since = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT source, COUNT(*), SUM(final) FROM source_articles WHERE run_date >= ? GROUP BY source", (since,)
+            ).fetchall()
+        return {source: {'candidates': candidates, 'final': final} for source, candidates, final in rows}
+
+    def legacy_conversions(self) -> Dict[str, Dict[str, int]]:
+        """
+        {source: {'candidates': n, 'final': n}} from imported pre-store JSON files (any age).
+        Those carry counts, not articles, so they only stand in for sources without newer history.
+        """
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT source, SUM(CASE WHEN stage = 'categorized' THEN count ELSE 0 END), "
+                "SUM(CASE WHEN stage = 'final' THEN count ELSE 0 END) FROM funnel_counts "
+                "WHERE run_id LIKE 'legacy/%' AND stage IN ('categorized', 'final') GROUP BY source"
+            ).fetchall()
+        return {source: {'candidates': candidates, 'final': final} for source, candidates, final in rows}
+
+    def conversion_trend(self, days: int = DEFAULT_QUERY_DAYS, period: str = 'week',
+                         source: Optional[str] = None, category: Optional[str] = None) -> List[tuple]:
+        """(period, source, fetched, final) rows, oldest period first"""
+        query = (f"SELECT strftime('{PERIOD_FORMATS[period]}', run_date) AS period, source, "
+                 "SUM(CASE WHEN stage = 'fetched' THEN count ELSE 0 END), "
+                 "SUM(CASE WHEN stage = 'final' THEN count ELSE 0 END) "
+                 "FROM funnel_counts WHERE run_date >= ? AND stage IN ('fetched', 'final')")
+        params = [(datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')]
+        if source:
+            query += " AND source LIKE ?"
+            params.append(f"%{source}%")
+        if category:
+            query += " AND category = ?"
+            params.append(category)
+        with self.lock:
+            return self.conn.execute(query + " GROUP BY period, source ORDER BY period, 4 DESC", params).fetchall()
+
+    def stage_trend(self, days: int = DEFAULT_QUERY_DAYS, period: str = 'week',
+                    category: Optional[str] = None) -> List[tuple]:
+        """(period, stage, runs, avg seconds, max seconds, total cost) rows, oldest period first"""
+        query = (f"SELECT strftime('{PERIOD_FORMATS[period]}', run_date) AS period, stage, COUNT(*), "
+                 "AVG(seconds), MAX(seconds), SUM(cost_usd) FROM stage_runs WHERE run_date >= ?")
+        params = [(datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')]
+        if category:
+            query += " AND category = ?"
+            params.append(category)
+        with self.lock:
+            return self.conn.execute(query + " GROUP BY period, stage ORDER BY period, stage", params).fetchall()
+
+    def import_legacy_json(self, analytics_dir: str = LEGACY_ANALYTICS_DIR) -> int:
+        """
+        Load the per-day JSON files written before this store existed
+        (fetched, categorized and final only). Their categorized/final counts
+        become the source scheduler's prior (legacy_conversions). Returns files imported.
+        """
+        imported = 0
+        for path in sorted(Path(analytics_dir).glob('*.json')):
+            match = re.search(r'^(.*)_(\d{4}-\d{2}-\d{2})\.json$', path.name)
+            if not match:
+                continue
+            with open(path) as f:
+                rows = json.load(f)
+            counts = [(stage, row['source'], row.get(stage, 0))
+                      for row in rows for stage in ('fetched', 'categorized', 'final')]
+            self.append(f"legacy/{path.stem}", match.group(2), 'unknown', counts, [])
+            imported += 1
+        return imported
+
+
+_store_instance = None
+_store_lock = threading.Lock()
+
+
+def get_funnel_store() -> FunnelStore:
+    """Get or create singleton instance of FunnelStore"""
+    global _store_instance
+    with _store_lock:
+        if _store_instance is None:
+            _store_instance = FunnelStore()
+        return _store_instance
+
+
+def print_conversion(store: FunnelStore, args):
+    rows = store.conversion_trend(args.days, args.period, args.source, args.category)
+    print(f"\n📊 CONVERSION BY SOURCE ({args.period}, last {args.days} days)")
+    print("="*80)
+    print(f"{'Period':<12} {'Source':<44} {'Fetched':>8} {'Final':>6} {'Conv %':>7}")
+    print("-"*80)
+    for period, source, fetched, final in rows:
+        rate = 100 * final / fetched if fetched else 0.0
+        print(f"{period:<12} {source[:43]:<44} {fetched:>8} {final:>6} {rate:>6.1f}%")
+
+
+def print_stages(store: FunnelStore, args, show: str):
+    rows = store.stage_trend(args.days, args.period, args.category)
+    title = 'STAGE LATENCY' if show == 'latency' else 'LLM COST BY STAGE'
+    print(f"\n⏱️  {title} ({args.period}, last {args.days} days)")
+    print("="*80)
+    if show == 'latency':
+        print(f"{'Period':<12} {'Stage':<14} {'Runs':>5} {'Avg s':>9} {'Max s':>9}")
+        print("-"*80)
+        for period, stage, runs, avg_seconds, max_seconds, _ in rows:
+            print(f"{period:<12} {stage:<14} {runs:>5} {avg_seconds:>9.1f} {max_seconds:>9.1f}")
+    else:
+        print(f"{'Period':<12} {'Stage':<14} {'Runs':>5} {'Total $':>10} {'Per run $':>10}")
+        print("-"*80)
+        for period, stage, runs, _, _, cost in rows:
+            print(f"{period:<12} {stage:<14} {runs:>5} {cost:>10.4f} {cost / runs:>10.4f}")
+
+
+def main(argv: Optional[List[str]] = None):
+    """python main_scheduled.py funnel [conversion|latency|cost|import] [--days N] [--period week] ..."""
+    parser = argparse.ArgumentParser(prog='main_scheduled.py funnel', description="Query the funnel analytics store")
+    parser.add_argument('report', nargs='?', default='conversion', choices=['conversion', 'latency', 'cost', 'import'])
+    parser.add_argument('--days', type=int, default=DEFAULT_QUERY_DAYS, help="How far back to look")
+    parser.add_argument('--period', default='week', choices=list(PERIOD_FORMATS), help="Trend bucket")
+    parser.add_argument('--source', help="Only sources containing this text")
+    parser.add_argument('--category', help="Only digests for this category")
+    args = parser.parse_args(argv)
+
+    store = get_funnel_store()
+    if args.report == 'import':
+        print(f"✓ Imported {store.import_legacy_json()} files from {LEGACY_ANALYTICS_DIR}")
+    elif args.report == 'conversion':
+        print_conversion(store, args)
+    else:
+        print_stages(store, args, args.report)
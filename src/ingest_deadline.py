@@ -0,0 +1,113 @@
+"""
+Ingestion Deadline
+
+Bounds how long fetching can take. Every fetch of one digest (or one ingest)
+shares an IngestRun with a global deadline:
+- Each request's timeout is the per-source timeout, capped by the time left
+- Sources still running at the deadline are abandoned; whatever finished is used
+- Slow, failed, timed-out and skipped sources are recorded for the source
+  validation report
+
+Worst-case ingestion latency is INGEST_DEADLINE_SECONDS (plus at most one
+SOURCE_TIMEOUT_SECONDS read for a request already in flight).
+"""
+
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+INGEST_DEADLINE_SECONDS = float(os.getenv("INGEST_DEADLINE_SECONDS", "180"))
+SOURCE_TIMEOUT_SECONDS = float(os.getenv("SOURCE_TIMEOUT_SECONDS", "15"))
+SLOW_SOURCE_SECONDS = 10.0  # Reported as slow even though it finished
+MIN_REQUEST_TIMEOUT_SECONDS = 0.5
+
+
+class IngestRun:
+    """
+    Deadline and per-source outcomes for one ingestion.
+    """
+
+    def __init__(self, deadline_seconds: float = INGEST_DEADLINE_SECONDS,
+                 source_timeout: float = SOURCE_TIMEOUT_SECONDS):
+        self.deadline_seconds = deadline_seconds
+        self.source_timeout = source_timeout
+        self.started = time.monotonic()
+        self.expires_at = self.started + deadline_seconds
+        self.lock = threading.Lock()
+        self.sources: Dict[str, Dict] = {}
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def timeout(self) -> float:
+        """Timeout for the next request: the per-source timeout, capped by the time left"""
+        return max(MIN_REQUEST_TIMEOUT_SECONDS, min(self.source_timeout, self.remaining()))
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def record(self, source: str, status: str, seconds: float = 0.0, detail: str = ''):
+        """
+        Record one source's outcome.
+
+        Args:
+            status: 'ok', 'failed', 'timeout' (abandoned at the deadline), 'partial'
+                    (cut short by the deadline) or 'skipped' (deadline already passed)
+        """
+        if status == 'ok' and seconds >= SLOW_SOURCE_SECONDS:
+            status = 'slow'
+        with self.lock:
+            self.sources[source] = {'status': status, 'seconds': round(seconds, 2), 'detail': detail}
+
+    def record_error(self, source: str, seconds: float, error: Exception):
+        """Record a source that raised (timeouts are told apart by exception name)"""
+        status = 'timeout' if 'Timeout' in type(error).__name__ else 'failed'
+        self.record(source, status, seconds, str(error)[:200])
+
+    def problem_sources(self) -> List[tuple]:
+        """(source, outcome) for every source that wasn't a plain success, slowest first"""
+        with self.lock:
+            problems = [(source, outcome) for source, outcome in self.sources.items() if outcome['status'] != 'ok']
+        return sorted(problems, key=lambda item: -item[1]['seconds'])
+
+    def print_report(self):
+        """Slow, failed, timed-out and skipped sources (part of the source validation report)"""
+        problems = self.problem_sources()
+        print(f"Ingestion took {self.elapsed():.1f}s (deadline {self.deadline_seconds:.0f}s, "
+              f"{len(self.sources) - len(problems)}/{len(self.sources)} sources OK)")
+        for source, outcome in problems:
+            detail = f": {outcome['detail']}" if outcome['detail'] else ''
+            print(f"- ⚠️  {source}: {outcome['status']} after {outcome['seconds']:.1f}s{detail}")
+
+
+_ingest_run: Optional[IngestRun] = None
+_ingest_run_lock = threading.Lock()
+
+
+def start_ingest_run(deadline_seconds: float = INGEST_DEADLINE_SECONDS) -> IngestRun:
+    """Start the deadline for a new ingestion"""
+    global _ingest_run
+    with _ingest_run_lock:
+        _ingest_run = IngestRun(deadline_seconds)
+        return _ingest_run
+
+
+def get_ingest_run() -> IngestRun:
+    """Current ingestion (one is started if a fetcher is called on its own)"""
+    global _ingest_run
+    with _ingest_run_lock:
+        if _ingest_run is None:
+            _ingest_run = IngestRun()
+        return _ingest_run
+
+
+def finish_ingest_run() -> Optional[IngestRun]:
+    """Hand over the finished ingestion for reporting (None if nothing was fetched)"""
+    global _ingest_run
+    with _ingest_run_lock:
+        run, _ingest_run = _ingest_run, None
+        return run
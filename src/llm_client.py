@@ -0,0 +1,389 @@
+"""
+Shared LLM Invocation Layer
+
+Every agent call goes through invoke_llm() so that all agents share one set of
+per-provider limits instead of failing independently on HTTP 429s:
+- Token buckets per provider (requests/min and tokens/min)
+- Jittered exponential backoff on rate limits, timeouts and 5xx errors
+- A circuit breaker that stops hammering a provider that keeps failing
+
+When a provider stays unavailable after all retries, LLMUnavailableError is
+raised instead of letting agents fall back to a default answer, so a provider
+outage can never silently reject (or approve) a whole batch of articles.
+
+Each call is recorded in the run's perf report (latency, limiter wait, retries,
+tokens and cost per agent) and tagged with the agent name for LangSmith traces.
+"""
+
+import asyncio
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+from src.perf import get_perf, model_name_for
+from src.prompts import count_tokens
+
+# Default limits per provider (Groq free tier / OpenAI tier 1). Override with
+# <PROVIDER>_RPM and <PROVIDER>_TPM environment variables.
+PROVIDER_LIMITS = {
+    'groq': {'rpm': 30, 'tpm': 6000},
+    'openai': {'rpm': 500, 'tpm': 200000},
+    'default': {'rpm': 60, 'tpm': 60000},
+}
+DEFAULT_COMPLETION_TOKENS = 150  # Reserved per call on top of the prompt
+MAX_RETRIES = 5
+BASE_BACKOFF_SECONDS = 1.0
+MAX_BACKOFF_SECONDS = 30.0
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive transient failures before opening
+CIRCUIT_RESET_SECONDS = 60.0  # Time before a half-open probe is allowed
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERROR_NAMES = {'RateLimitError', 'APITimeoutError', 'APIConnectionError',
+                         'InternalServerError', 'ServiceUnavailableError', 'Timeout',
+                         'ConnectionError', 'ReadTimeout'}
+
+
+class LLMUnavailableError(RuntimeError):
+    """Raised when a provider is still rate-limited or failing after all retries"""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Capacity is the per-minute limit, refilled continuously.
+    """
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def try_take(self, amount: float) -> float:
+        """
+        Take amount tokens if available.
+
+        Returns:
+            0.0 if the tokens were taken, otherwise seconds to wait before retrying
+        """
+        amount = min(amount, self.capacity)  # Oversized requests wait for a full bucket
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return 0.0
+            return (amount - self.tokens) / self.rate
+
+
+class ProviderLimiter:
+    """Requests/min and tokens/min buckets for one provider"""
+
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    def _try_acquire(self, tokens: int) -> float:
+        wait = self.requests.try_take(1)
+        if wait:
+            return wait
+        wait = self.tokens.try_take(tokens)
+        if wait:
+            # Give the request slot back so it isn't lost while we wait for tokens
+            with self.requests.lock:
+                self.requests.tokens = min(self.requests.capacity, self.requests.tokens + 1)
+        return wait
+
+    def acquire(self, tokens: int):
+        """Block until one request and the given number of tokens are available"""
+        while True:
+            wait = self._try_acquire(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int):
+        """Async variant of acquire() that yields to the event loop while waiting"""
+        while True:
+            wait = self._try_acquire(tokens)
+            if not wait:
+                return
+            await asyncio.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Opens after CIRCUIT_FAILURE_THRESHOLD consecutive transient failures.
+    While open, calls fail fast; after CIRCUIT_RESET_SECONDS one probe call is let
+    through, and every other caller keeps failing fast until the probe succeeds or fails
+    (or, if it ends any other way, for another CIRCUIT_RESET_SECONDS).
+    """
+
+    def __init__(self, provider: str):
+        self.provider = provider
+        self.failures = 0
+        self.opened_at = None
+        self.probe_started = None  # Set while the half-open probe is in flight
+        self.lock = threading.Lock()
+
+    def before_call(self):
+        with self.lock:
+            if self.opened_at is None:
+                return
+            now = time.monotonic()
+            probing = self.probe_started is not None and now - self.probe_started < CIRCUIT_RESET_SECONDS
+            if probing or now - self.opened_at < CIRCUIT_RESET_SECONDS:
+                raise LLMUnavailableError(
+                    f"Circuit open for {self.provider}: {self.failures} consecutive failures"
+                )
+            # Half-open: let this call (and only this one) probe the provider
+            self.probe_started = now
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probe_started = None
+
+    def record_failure(self) -> bool:
+        """Record a transient failure. Returns True if the circuit is now open."""
+        with self.lock:
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= CIRCUIT_FAILURE_THRESHOLD:
+                if self.opened_at is None:
+                    print(f"⚠️  Circuit opened for {self.provider} after {self.failures} consecutive failures")
+                # A failed probe re-opens the circuit for another CIRCUIT_RESET_SECONDS
+                self.opened_at = time.monotonic()
+                self.probe_started = None
+                return True
+            return False
+
+
+_limiters: Dict[str, ProviderLimiter] = {}
+_breakers: Dict[str, CircuitBreaker] = {}
+_registry_lock = threading.Lock()
+
+
+def get_limiter(provider: str) -> ProviderLimiter:
+    """Get or create the shared limiter for a provider"""
+    with _registry_lock:
+        if provider not in _limiters:
+            limits = PROVIDER_LIMITS.get(provider, PROVIDER_LIMITS['default'])
+            rpm = float(os.getenv(f"{provider.upper()}_RPM", limits['rpm']))
+            tpm = float(os.getenv(f"{provider.upper()}_TPM", limits['tpm']))
+            _limiters[provider] = ProviderLimiter(rpm, tpm)
+        return _limiters[provider]
+
+
+def get_circuit_breaker(provider: str) -> CircuitBreaker:
+    """Get or create the shared circuit breaker for a provider"""
+    with _registry_lock:
+        if provider not in _breakers:
+            _breakers[provider] = CircuitBreaker(provider)
+        return _breakers[provider]
+
+
+def provider_for(runnable: Any) -> str:
+    """
+    Infer the provider from a chat model, or from the model inside a chain.
+    """
+    candidates = [runnable] + list(getattr(runnable, 'steps', []))
+    for candidate in candidates:
+        name = type(candidate).__name__.lower()
+        if 'groq' in name:
+            return 'groq'
+        if 'openai' in name:
+            return 'openai'
+    return 'default'
+
+
+def estimate_tokens(payload: Any) -> int:
+    """Estimate prompt tokens for a string, message list or chain input dict"""
+    if payload is None:
+        return 0
+    if isinstance(payload, str):
+        return count_tokens(payload)
+    if isinstance(payload, dict):
+        return sum(estimate_tokens(value) for value in payload.values())
+    if isinstance(payload, (list, tuple)):
+        return sum(estimate_tokens(item) for item in payload)
+    return count_tokens(str(getattr(payload, 'content', '')))
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for rate limits, timeouts, connection errors and 5xx responses"""
+    status = getattr(error, 'status_code', None)
+    if status is None and getattr(error, 'response', None) is not None:
+        status = getattr(error.response, 'status_code', None)
+    if status in RETRYABLE_STATUS_CODES:
+        return True
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    message = str(error).lower()
+    return '429' in message or 'rate limit' in message or 'too many requests' in message
+
+
+def backoff_seconds(attempt: int, error: Optional[Exception] = None) -> float:
+    """
+    Full-jitter exponential backoff, honoring a Retry-After header when present.
+    """
+    response = getattr(error, 'response', None)
+    retry_after = getattr(response, 'headers', {}).get('retry-after') if response is not None else None
+    if retry_after:
+        try:
+            return min(MAX_BACKOFF_SECONDS, float(retry_after)) + random.uniform(0, BASE_BACKOFF_SECONDS)
+        except ValueError:
+            pass
+    return random.uniform(0, min(MAX_BACKOFF_SECONDS, BASE_BACKOFF_SECONDS * (2 ** attempt)))
+
+
+class _CallRecord:
+    """Accumulates timing for one logical call across retries and reports it to perf"""
+
+    def __init__(self, runnable: Any, agent: str, tokens: int):
+        self.model = model_name_for(runnable)
+        self.agent = agent
+        self.prompt_tokens = max(0, tokens - DEFAULT_COMPLETION_TOKENS)
+        self.started = time.perf_counter()
+        self.limiter_wait = 0.0
+        self.attempts = 1
+
+    @contextmanager
+    def waiting(self):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.limiter_wait += time.perf_counter() - started
+
+    def finish(self, result: Any, ok: bool = True):
+        get_perf().record_llm_call(self.agent, self.model, self.prompt_tokens, result,
+                                   time.perf_counter() - self.started, self.limiter_wait, self.attempts, ok)
+
+
+def invoke_llm(runnable: Any, payload: Any, agent: str = 'llm', provider: Optional[str] = None,
+               estimated_tokens: Optional[int] = None) -> Any:
+    """
+    Invoke a chat model, chain or agent through the shared rate limiter.
+
+    Args:
+        runnable: Anything with .invoke() (chat model, LCEL chain, LangChain agent)
+        payload: Input passed to runnable.invoke()
+        agent: Name of the calling agent (for logs, perf report and traces)
+        provider: Provider key; inferred from the runnable if omitted
+        estimated_tokens: Tokens to reserve; estimated from the payload if omitted
+
+    Returns:
+        Whatever runnable.invoke() returns
+
+    Raises:
+        LLMUnavailableError: Provider still failing after MAX_RETRIES or circuit open
+        Exception: Non-transient errors (bad request, auth) are re-raised unchanged
+    """
+    provider = provider or provider_for(runnable)
+    limiter = get_limiter(provider)
+    breaker = get_circuit_breaker(provider)
+    tokens = estimated_tokens or estimate_tokens(payload) + DEFAULT_COMPLETION_TOKENS
+
+    call = _CallRecord(runnable, agent, tokens)
+
+    for attempt in range(MAX_RETRIES + 1):
+        call.attempts = attempt + 1
+        try:
+            breaker.before_call()
+            with call.waiting():
+                limiter.acquire(tokens)
+            result = runnable.invoke(payload, config={'run_name': agent})
+            breaker.record_success()
+            call.finish(result)
+            return result
+        except Exception as e:
+            if isinstance(e, LLMUnavailableError) or not is_retryable(e):
+                call.finish(None, ok=False)
+                raise
+            circuit_open = breaker.record_failure()
+            if circuit_open or attempt == MAX_RETRIES:
+                call.finish(None, ok=False)
+                raise LLMUnavailableError(f"{agent} call to {provider} failed after {attempt + 1} attempts: {e}") from e
+            time.sleep(backoff_seconds(attempt, e))
+
+
+async def ainvoke_llm(runnable: Any, payload: Any, agent: str = 'llm', provider: Optional[str] = None,
+                      estimated_tokens: Optional[int] = None) -> Any:
+    """
+    Async variant of invoke_llm() using runnable.ainvoke().
+    """
+    provider = provider or provider_for(runnable)
+    limiter = get_limiter(provider)
+    breaker = get_circuit_breaker(provider)
+    tokens = estimated_tokens or estimate_tokens(payload) + DEFAULT_COMPLETION_TOKENS
+
+    call = _CallRecord(runnable, agent, tokens)
+
+    for attempt in range(MAX_RETRIES + 1):
+        call.attempts = attempt + 1
+        try:
+            breaker.before_call()
+            with call.waiting():
+                await limiter.acquire_async(tokens)
+            result = await runnable.ainvoke(payload, config={'run_name': agent})
+            breaker.record_success()
+            call.finish(result)
+            return result
+        except Exception as e:
+            if isinstance(e, LLMUnavailableError) or not is_retryable(e):
+                call.finish(None, ok=False)
+                raise
+            circuit_open = breaker.record_failure()
+            if circuit_open or attempt == MAX_RETRIES:
+                call.finish(None, ok=False)
+                raise LLMUnavailableError(f"{agent} call to {provider} failed after {attempt + 1} attempts: {e}") from e
+            await asyncio.sleep(backoff_seconds(attempt, e))
+
+
+async def astream_llm(runnable: Any, payload: Any, agent: str = 'llm', provider: Optional[str] = None,
+                      estimated_tokens: Optional[int] = None):
+    """
+    Stream chunks from runnable.astream() through the shared rate limiter.
+
+    Transient failures are retried only before the first chunk arrives; once
+    output has started streaming, a failure is raised so callers never see a
+    duplicated or spliced completion.
+
+    Yields:
+        Chunks as produced by runnable.astream()
+    """
+    provider = provider or provider_for(runnable)
+    limiter = get_limiter(provider)
+    breaker = get_circuit_breaker(provider)
+    tokens = estimated_tokens or estimate_tokens(payload) + DEFAULT_COMPLETION_TOKENS
+
+    call = _CallRecord(runnable, agent, tokens)
+
+    for attempt in range(MAX_RETRIES + 1):
+        call.attempts = attempt + 1
+        started = False
+        streamed = []
+        try:
+            breaker.before_call()
+            with call.waiting():
+                await limiter.acquire_async(tokens)
+            async for chunk in runnable.astream(payload, config={'run_name': agent}):
+                started = True
+                streamed.append(chunk if isinstance(chunk, str) else str(getattr(chunk, 'content', '') or ''))
+                yield chunk
+            breaker.record_success()
+            call.finish(''.join(streamed))
+            return
+        except Exception as e:
+            if started or isinstance(e, LLMUnavailableError) or not is_retryable(e):
+                call.finish(None, ok=False)
+                raise
+            circuit_open = breaker.record_failure()
+            if circuit_open or attempt == MAX_RETRIES:
+                call.finish(None, ok=False)
+                raise LLMUnavailableError(f"{agent} call to {provider} failed after {attempt + 1} attempts: {e}") from e
+            await asyncio.sleep(backoff_seconds(attempt, e))
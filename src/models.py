@@ -0,0 +1,142 @@
+"""
+Article Model
+
+Typed, compact representation of an article as it travels through the
+pipeline (fetch → agents → analytics → email). Derived fields are computed
+once at construction instead of on every use:
+- published is a timezone-aware datetime (no re-parsing during rendering)
+- source is interned (hundreds of articles share a handful of source names)
+- canonical_url and content_hash are precomputed for dedup, caching and batching
+Stage outputs (category, scores, veto, ReACT trail) live in a separate
+StageResults record instead of being mutated into the article as loose keys;
+results that are error defaults (e.g. "Irrelevant" after a failed call) are
+flagged there so they are never cached or learned from as real verdicts.
+"""
+
+import hashlib
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PARAM_PREFIXES = ('utm_', 'mc_')
+TRACKING_PARAMS = {'fbclid', 'gclid', 'ref', 'ref_src', 'source', 'guccounter'}  # Matched exactly: 'reference', 'sourceid' are real
+
+
+def canonicalize_url(url: str) -> str:
+    """
+    Normalize a URL so the same article from different feeds compares equal:
+    https scheme, lowercase host without 'www.', no tracking params, fragment
+    or trailing slash, and arXiv abstract links without the version suffix.
+    """
+    if not url:
+        return ''
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parts.path.rstrip('/') or '/'
+    if host.endswith('arxiv.org'):
+        path = re.sub(r'v\d+$', '', path)
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PARAM_PREFIXES)
+    ])
+    return urlunsplit(('https', host, path, query, ''))
+
+
+def compute_content_hash(title: str) -> str:
+    """
+    Hash of the normalized title (lowercase alphanumerics only), so the same
+    story syndicated with different punctuation or casing hashes the same.
+    """
+    normalized = re.sub(r'[^a-z0-9]+', ' ', (title or '').lower()).strip()
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def parse_published(value: Any) -> Optional[datetime]:
+    """Parse an ISO timestamp (as produced by the fetchers) into an aware datetime"""
+    if value is None or isinstance(value, datetime):
+        published = value
+    else:
+        try:
+            published = datetime.fromisoformat(str(value).replace('Z', '+00:00'))
+        except ValueError:
+            from dateutil import parser
+            published = parser.parse(str(value))
+    if published is not None and published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published
+
+
+@dataclass(slots=True)
+class StageResults:
+    """Outputs written by the pipeline stages"""
+    category: Optional[str] = None
+    metrics: Dict[str, Any] = field(default_factory=dict)  # novelty, practical, significance, final_score, citations
+    waste_score: Optional[float] = None
+    react_reasoning: List[str] = field(default_factory=list)
+    judge: Optional[Dict[str, Any]] = None  # Cached fused judge response
+    fallbacks: List[str] = field(default_factory=list)  # Stages whose result is an error default, not a judgment
+
+    def set_fallback(self, stage: str, fallback: bool = True):
+        """Flag (or clear) a stage result that came from an error path rather than the model"""
+        if fallback and stage not in self.fallbacks:
+            self.fallbacks.append(stage)
+        elif not fallback and stage in self.fallbacks:
+            self.fallbacks.remove(stage)
+
+
+@dataclass(slots=True)
+class Article:
+    """A candidate article with pre-parsed and precomputed fields"""
+    title: str
+    link: str
+    source: str
+    summary: str = ''
+    published: Optional[datetime] = None
+    score: Optional[int] = None  # Hacker News upvotes
+    num_comments: Optional[int] = None  # Hacker News comments
+    canonical_url: str = ''
+    content_hash: str = ''
+    stage: StageResults = field(default_factory=StageResults)
+
+    def __post_init__(self):
+        self.source = sys.intern(self.source or 'Unknown')
+        self.summary = self.summary or ''
+        self.published = parse_published(self.published)
+        if not self.canonical_url:
+            self.canonical_url = canonicalize_url(self.link)
+        if not self.content_hash:
+            self.content_hash = compute_content_hash(self.title)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-serializable dict (for checkpoints and stores)"""
+        return {
+            'title': self.title,
+            'link': self.link,
+            'source': self.source,
+            'summary': self.summary,
+            'published': self.published.isoformat() if self.published else None,
+            'score': self.score,
+            'num_comments': self.num_comments,
+            'canonical_url': self.canonical_url,
+            'content_hash': self.content_hash,
+            'stage': {
+                'category': self.stage.category,
+                'metrics': self.stage.metrics,
+                'waste_score': self.stage.waste_score,
+                'react_reasoning': self.stage.react_reasoning,
+                'judge': self.stage.judge,
+                'fallbacks': self.stage.fallbacks,
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Article':
+        """Inverse of to_dict()"""
+        data = dict(data)
+        stage = StageResults(**data.pop('stage', None) or {})
+        return cls(stage=stage, **data)
@@ -0,0 +1,356 @@
+"""
+Performance Instrumentation
+
+Collects timings and counters for one pipeline run and writes them as a JSON
+report to outputs/perf_reports (the per-source funnel goes to src.funnel):
+- Spans: wall-clock per pipeline stage and per instrumented call
+- LLM: calls, retries, rate-limiter wait, tokens and estimated cost per agent
+- HTTP: request count, latency percentiles and errors per source
+- Caches: hit/miss counters (fused judge, RAG memory, ...)
+
+Spans are also exported to OpenTelemetry when OTEL_EXPORTER_OTLP_ENDPOINT is
+set and the SDK is installed, and the finished report is attached to LangSmith
+when LANGCHAIN_TRACING_V2=true.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from src.prompts import count_tokens
+
+PERF_REPORT_DIR = "outputs/perf_reports"
+MAX_RECORDED_SPANS = 5000  # Individual spans kept in the report (aggregates are always complete)
+HTTP_POOL_HOSTS = 32  # Hosts with a kept-alive connection pool
+HTTP_POOL_SIZE = 16  # Connections per host (summaries scrape up to SUMMARY_CONCURRENCY at once)
+
+# USD per 1M tokens (input, output). Unknown models are reported with zero cost.
+MODEL_PRICES = {
+    'llama-3.1-8b-instant': (0.05, 0.08),
+    'llama-3.3-70b-versatile': (0.59, 0.79),
+    'gpt-4o-mini': (0.15, 0.60),
+    'gpt-4o': (2.50, 10.00),
+}
+
+
+def model_name_for(runnable: Any) -> Optional[str]:
+    """Model name of a chat model, or of the model inside a chain"""
+    for candidate in [runnable] + list(getattr(runnable, 'steps', [])):
+        name = getattr(candidate, 'model_name', None) or getattr(candidate, 'model', None)
+        if isinstance(name, str):
+            return name
+    return None
+
+
+def token_usage(result: Any) -> Optional[Dict[str, int]]:
+    """
+    Provider-reported token usage from an AIMessage, if present.
+
+    Returns:
+        {'input': n, 'output': n} or None when the result carries no usage
+    """
+    usage = getattr(result, 'usage_metadata', None)
+    if usage:
+        return {'input': usage.get('input_tokens', 0), 'output': usage.get('output_tokens', 0)}
+    usage = (getattr(result, 'response_metadata', None) or {}).get('token_usage')
+    if usage:
+        return {'input': usage.get('prompt_tokens', 0), 'output': usage.get('completion_tokens', 0)}
+    return None
+
+
+def result_text(result: Any) -> str:
+    """Text of an LLM result (message, string or agent output dict)"""
+    if isinstance(result, str):
+        return result
+    if isinstance(result, dict):
+        return ' '.join(str(value) for value in result.values())
+    return str(getattr(result, 'content', '') or '')
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class PerfRecorder:
+    """
+    Thread-safe collector for one run. Agents record into the shared instance
+    returned by get_perf(); main_scheduled starts it and writes the report.
+    """
+
+    def __init__(self, run_name: str = 'run'):
+        self.run_name = run_name
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.lock = threading.Lock()
+        self.spans = []
+        self.span_totals = defaultdict(lambda: {'count': 0, 'seconds': 0.0})
+        self.llm = defaultdict(lambda: {
+            'calls': 0, 'failures': 0, 'retries': 0, 'seconds': 0.0, 'limiter_wait_seconds': 0.0,
+            'input_tokens': 0, 'output_tokens': 0, 'estimated_tokens': False, 'cost_usd': 0.0,
+        })
+        self.http = defaultdict(lambda: {'requests': 0, 'errors': 0, 'bytes': 0, 'latencies': []})
+        self.caches = defaultdict(lambda: {'hits': 0, 'misses': 0})
+        self.thread_costs = defaultdict(float)  # LLM cost per calling thread (digests run concurrently in batch mode)
+        self._tracer = _get_otel_tracer()
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time a block of code and record it under name"""
+        otel_span = self._tracer.start_as_current_span(name, attributes=attributes) if self._tracer else None
+        if otel_span:
+            otel_span.__enter__()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - started
+            if otel_span:
+                otel_span.__exit__(None, None, None)
+            with self.lock:
+                totals = self.span_totals[name]
+                totals['count'] += 1
+                totals['seconds'] += seconds
+                if len(self.spans) < MAX_RECORDED_SPANS:
+                    self.spans.append({
+                        'name': name,
+                        'offset_seconds': round(started - self.start, 4),
+                        'seconds': round(seconds, 4),
+                        **attributes,
+                    })
+
+    def record_llm_call(self, agent: str, model: Optional[str], prompt_tokens: int, result: Any,
+                        seconds: float, limiter_wait: float = 0.0, attempts: int = 1, ok: bool = True):
+        """
+        Record one logical LLM call (including its retries).
+
+        Args:
+            agent: Calling agent name
+            model: Model name, used to price the call
+            prompt_tokens: Estimated prompt tokens (used if the provider reports no usage)
+            result: Raw result, inspected for provider-reported usage
+            seconds: Wall-clock including retries and limiter waits
+            limiter_wait: Seconds spent waiting on the rate limiter
+            attempts: Number of attempts made
+            ok: False if the call ultimately failed
+        """
+        usage = token_usage(result) if ok else None
+        input_tokens = usage['input'] if usage else prompt_tokens
+        output_tokens = usage['output'] if usage else (count_tokens(result_text(result)) if ok else 0)
+        input_price, output_price = MODEL_PRICES.get(model or '', (0.0, 0.0))
+
+        with self.lock:
+            stats = self.llm[agent]
+            stats['calls'] += 1
+            stats['failures'] += 0 if ok else 1
+            stats['retries'] += attempts - 1
+            stats['seconds'] += seconds
+            stats['limiter_wait_seconds'] += limiter_wait
+            stats['input_tokens'] += input_tokens
+            stats['output_tokens'] += output_tokens
+            stats['estimated_tokens'] = stats['estimated_tokens'] or usage is None
+            cost = (input_tokens * input_price + output_tokens * output_price) / 1_000_000
+            stats['cost_usd'] += cost
+            self.thread_costs[threading.get_ident()] += cost
+
+    def thread_cost_usd(self) -> float:
+        """Estimated LLM cost so far of calls made from the current thread"""
+        with self.lock:
+            return self.thread_costs.get(threading.get_ident(), 0.0)
+
+    def record_http(self, source: str, seconds: float, status: Optional[int] = None, size: int = 0):
+        """Record one HTTP request for a source (status None means it raised)"""
+        with self.lock:
+            stats = self.http[source]
+            stats['requests'] += 1
+            stats['errors'] += 1 if status is None or status >= 400 else 0
+            stats['bytes'] += size
+            stats['latencies'].append(seconds)
+
+    @contextmanager
+    def http_timer(self, source: str):
+        """Time a fetch done by a library (feedparser, arxiv) that hides the response"""
+        started = time.perf_counter()
+        status = None
+        try:
+            yield
+            status = 200
+        finally:
+            self.record_http(source, time.perf_counter() - started, status)
+
+    def record_cache(self, cache: str, hit: bool):
+        with self.lock:
+            self.caches[cache]['hits' if hit else 'misses'] += 1
+
+    def report(self) -> Dict[str, Any]:
+        """Build the JSON-serializable report"""
+        with self.lock:
+            llm = {}
+            for agent, stats in sorted(self.llm.items()):
+                llm[agent] = {**stats, 'seconds': round(stats['seconds'], 3),
+                              'limiter_wait_seconds': round(stats['limiter_wait_seconds'], 3),
+                              'cost_usd': round(stats['cost_usd'], 6)}
+            http = {}
+            for source, stats in sorted(self.http.items()):
+                latencies = stats['latencies']
+                http[source] = {
+                    'requests': stats['requests'],
+                    'errors': stats['errors'],
+                    'bytes': stats['bytes'],
+                    'total_seconds': round(sum(latencies), 3),
+                    'p50_seconds': round(percentile(latencies, 50), 3),
+                    'p95_seconds': round(percentile(latencies, 95), 3),
+                    'max_seconds': round(max(latencies, default=0.0), 3),
+                }
+            return {
+                'run': self.run_name,
+                'started_at': self.started_at.isoformat(),
+                'wall_seconds': round(time.perf_counter() - self.start, 3),
+                'stages': {name[len('stage.'):]: round(totals['seconds'], 3)
+                           for name, totals in self.span_totals.items() if name.startswith('stage.')},
+                'span_totals': {name: {'count': totals['count'], 'seconds': round(totals['seconds'], 3)}
+                                for name, totals in sorted(self.span_totals.items())},
+                'llm': llm,
+                'llm_totals': {
+                    'calls': sum(stats['calls'] for stats in llm.values()),
+                    'input_tokens': sum(stats['input_tokens'] for stats in llm.values()),
+                    'output_tokens': sum(stats['output_tokens'] for stats in llm.values()),
+                    'cost_usd': round(sum(stats['cost_usd'] for stats in llm.values()), 6),
+                },
+                'http': http,
+                'caches': {name: dict(stats) for name, stats in sorted(self.caches.items())},
+                'spans': list(self.spans),
+            }
+
+    def write_report(self, day_name: Optional[str] = None) -> str:
+        """
+        Print a summary, save the report to PERF_REPORT_DIR and export it to LangSmith.
+
+        Returns:
+            Path of the saved report
+        """
+        report = self.report()
+        os.makedirs(PERF_REPORT_DIR, exist_ok=True)
+        report_file = f"{PERF_REPORT_DIR}/{day_name or 'today'}_{self.started_at.strftime('%Y-%m-%d_%H-%M-%S')}.json"
+        with open(report_file, 'w') as f:
+            json.dump(report, f, indent=2)
+
+        print("\n⏱️  PERFORMANCE REPORT")
+        print("=" * 80)
+        print(f"Wall clock: {report['wall_seconds']:.1f}s")
+        for stage, seconds in report['stages'].items():
+            print(f"  {stage:<12} {seconds:>8.1f}s")
+        print(f"\n{'Agent':<22} {'Calls':<7} {'Retries':<8} {'Tokens in/out':<16} {'Wait':<8} {'Cost':<10}")
+        for agent, stats in report['llm'].items():
+            tokens = f"{stats['input_tokens']}/{stats['output_tokens']}"
+            print(f"{agent:<22} {stats['calls']:<7} {stats['retries']:<8} {tokens:<16} "
+                  f"{stats['limiter_wait_seconds']:<8.1f} ${stats['cost_usd']:<9.4f}")
+        slowest = sorted(report['http'].items(), key=lambda item: item[1]['total_seconds'], reverse=True)[:5]
+        if slowest:
+            print(f"\n{'Slowest sources':<40} {'Requests':<9} {'p95':<8} {'Total':<8}")
+            for source, stats in slowest:
+                print(f"{source[:39]:<40} {stats['requests']:<9} {stats['p95_seconds']:<8.2f} {stats['total_seconds']:<8.1f}")
+        print(f"\n✓ Perf report saved to: {report_file}\n")
+
+        _export_to_langsmith(report)
+        return report_file
+
+
+def _get_otel_tracer():
+    """OpenTelemetry tracer when an OTLP endpoint is configured and the SDK is installed"""
+    if not os.getenv('OTEL_EXPORTER_OTLP_ENDPOINT'):
+        return None
+    try:
+        from opentelemetry import trace
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    except ImportError:
+        print("⚠️  OTEL_EXPORTER_OTLP_ENDPOINT is set but opentelemetry-sdk is not installed")
+        return None
+
+    if not isinstance(trace.get_tracer_provider(), TracerProvider):
+        provider = TracerProvider(resource=Resource.create({'service.name': 'ainews'}))
+        provider.add_span_processor(BatchSpanProcessor(OTLPSpanExporter()))
+        trace.set_tracer_provider(provider)
+    return trace.get_tracer('ainews.pipeline')
+
+
+def _export_to_langsmith(report: Dict[str, Any]):
+    """Attach the run's perf report to LangSmith (alongside the LLM traces)"""
+    if os.getenv('LANGCHAIN_TRACING_V2', '').lower() != 'true':
+        return
+    try:
+        from langsmith import Client
+        summary = {key: value for key, value in report.items() if key != 'spans'}
+        Client().create_run(
+            name=f"perf_report:{report['run']}",
+            run_type='chain',
+            inputs={'run': report['run'], 'started_at': report['started_at']},
+            outputs=summary,
+            project_name=os.getenv('LANGCHAIN_PROJECT'),
+        )
+    except Exception as e:
+        print(f"⚠️  LangSmith perf export failed: {e}")
+
+
+_perf_instance = PerfRecorder()
+
+
+def get_perf() -> PerfRecorder:
+    """Get the recorder for the current run"""
+    return _perf_instance
+
+
+def start_perf_run(run_name: str) -> PerfRecorder:
+    """Start a fresh recorder (one per digest run)"""
+    global _perf_instance
+    _perf_instance = PerfRecorder(run_name)
+    return _perf_instance
+
+
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session():
+    """
+    Shared requests.Session so connections (and TLS handshakes) are reused across
+    requests to the same host, and stay warm between runs in daemon mode.
+    """
+    global _http_session
+    with _http_session_lock:
+        if _http_session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _http_session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=HTTP_POOL_HOSTS, pool_maxsize=HTTP_POOL_SIZE)
+            _http_session.mount('http://', adapter)
+            _http_session.mount('https://', adapter)
+        return _http_session
+
+
+def timed_request(method: str, url: str, source: str, **kwargs):
+    """
+    Request through the shared session, recording latency, status and size for the source.
+    """
+    perf = get_perf()
+    started = time.perf_counter()
+    try:
+        response = get_http_session().request(method, url, **kwargs)
+    except Exception:
+        perf.record_http(source, time.perf_counter() - started)
+        raise
+    perf.record_http(source, time.perf_counter() - started, response.status_code, len(response.content or b''))
+    return response
@@ -0,0 +1,155 @@
+"""
+Prompt Builder with Token Budgets
+
+Splits agent prompts into a stable prefix (instructions, audience definitions,
+examples) and a variable suffix (the article). The prefix is sent as the system
+message and is byte-identical for every article of a run, so provider-side
+prompt caching (OpenAI, Groq) can reuse it. Article text is trimmed to a
+per-agent token budget instead of fixed character slices.
+"""
+
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# Token budget for the article summary in each agent's variable suffix
+SUMMARY_TOKEN_BUDGETS = {
+    'relevance_gate': 80,
+    'negative_filter': 100,
+    'quality_score': 120,
+    'fused_judge': 120,
+    'react_scoring': 120,
+    'categorize': 150,
+}
+DEFAULT_TOKEN_BUDGET = 120
+CHARS_PER_TOKEN = 4  # Rough estimate when tiktoken is not installed
+ENCODING_NAME = "cl100k_base"
+
+
+@lru_cache(maxsize=1)
+def _get_encoder():
+    """Load the tiktoken encoder once, or None if tiktoken is unavailable"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding(ENCODING_NAME)
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens in text. Uses tiktoken when installed, otherwise estimates
+    from character length (close enough for budgeting Llama and GPT prompts).
+    """
+    if not text:
+        return 0
+    encoder = _get_encoder()
+    if encoder:
+        return len(encoder.encode(text))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Trim text to at most max_tokens, cutting at a word boundary.
+    """
+    if not text or count_tokens(text) <= max_tokens:
+        return text or ''
+
+    encoder = _get_encoder()
+    if encoder:
+        truncated = encoder.decode(encoder.encode(text)[:max_tokens])
+    else:
+        truncated = text[:max_tokens * CHARS_PER_TOKEN]
+
+    # Drop the partial last word
+    if ' ' in truncated:
+        truncated = truncated.rsplit(' ', 1)[0]
+    return truncated
+
+
+def clean_text(text: str) -> str:
+    """Strip HTML tags and collapse whitespace (RSS summaries are often HTML)"""
+    if not text:
+        return ''
+    text = re.sub(r'<[^>]+>', ' ', text)
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def trim_summary(text: str, agent: str) -> str:
+    """
+    Clean an article summary and trim it to the agent's token budget.
+    """
+    budget = SUMMARY_TOKEN_BUDGETS.get(agent, DEFAULT_TOKEN_BUDGET)
+    return truncate_to_tokens(clean_text(text), budget)
+
+
+def build_messages(prefix: str, suffix: str) -> List[Tuple[str, str]]:
+    """
+    Build chat messages with the cacheable prefix first.
+
+    Args:
+        prefix: Static instructions, identical for every article in a run
+        suffix: Variable part (the article under evaluation)
+
+    Returns:
+        List of (role, content) tuples accepted by any LangChain chat model
+    """
+    return [("system", prefix), ("human", suffix)]
+
+
+def prompt_tokens(messages: List[Tuple[str, str]]) -> int:
+    """Total token count of a message list (for rate limiting and budgets)"""
+    return sum(count_tokens(content) for _, content in messages)
+
+
+def format_article_suffix(title: str, summary: str, agent: str,
+                          extra: Optional[dict] = None, instruction: str = '') -> str:
+    """
+    Format the variable article block that follows the cached prefix.
+
+    Args:
+        title: Article title
+        summary: Raw article summary (trimmed to the agent's budget)
+        agent: Agent name used to look up the token budget
+        extra: Optional extra fields (e.g. Source, Citations) in display order
+        instruction: Final answer instruction appended after the article
+
+    Returns:
+        Suffix string
+    """
+    lines = ["Article to evaluate:", f"Title: {title}", f"Summary: {trim_summary(summary, agent)}"]
+    for key, value in (extra or {}).items():
+        lines.append(f"{key}: {value}")
+    if instruction:
+        lines.extend(["", instruction])
+    return "\n".join(lines)
+
+
+def split_into_token_chunks(text: str, chunk_tokens: int) -> List[str]:
+    """
+    Split long text into chunks of at most chunk_tokens, breaking at sentence
+    boundaries so each chunk can be summarized on its own.
+    """
+    sentences = []
+    for sentence in re.split(r'(?<=[.!?])\s+', text.strip()):
+        # Break up runaway "sentences" (tables, code, missing punctuation)
+        while count_tokens(sentence) > chunk_tokens:
+            piece = truncate_to_tokens(sentence, chunk_tokens) or sentence[:chunk_tokens * CHARS_PER_TOKEN]
+            sentences.append(piece)
+            sentence = sentence[len(piece):].lstrip()
+        if sentence:
+            sentences.append(sentence)
+
+    chunks, current, current_tokens = [], [], 0
+    for sentence in sentences:
+        sentence_tokens = count_tokens(sentence)
+        if current and current_tokens + sentence_tokens > chunk_tokens:
+            chunks.append(' '.join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += sentence_tokens
+
+    if current:
+        chunks.append(' '.join(current))
+    return chunks
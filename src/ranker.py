@@ -0,0 +1,427 @@
+"""
+Learned Quality Ranker
+
+Local logistic-regression model that predicts whether a candidate will be
+selected (passes the quality threshold and is not vetoed), trained on the
+pipeline's own past LLM decisions, so most articles skip the scoring call:
+- Features per article: category, source conversion prior, recency, keyword
+  and benchmark/number hits, novelty vs. sent articles (one batched Chroma
+  query), HN score and comments, citations
+- Every LLM-scored article becomes a training example (data/ranker.db); its
+  label is flipped to negative if the negative filter vetoes it. Neutral 5.0
+  scores from failed calls (see is_fallback_score) are never learned from
+- The model is refit with NumPy whenever examples were added (milliseconds) and
+  is used once MIN_TRAINING_EXAMPLES with both outcomes exist
+- Confident predictions are scored by the model (score = 10 x probability);
+  borderline ones and a random calibration sample still go to the LLM and keep
+  feeding the training set
+- `python main_scheduled.py ranker [stats|train|bootstrap]`; bootstrap imports
+  past scores from the article store, with age measured at scoring time and
+  novelty flagged as unknown (novelty_known = 0) rather than guessed
+"""
+
+import json
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from src.models import Article
+
+DB_PATH = Path(__file__).parent.parent / 'data' / 'ranker.db'
+MODEL_PATH = Path(__file__).parent.parent / 'data' / 'ranker_model.json'
+FEATURE_VERSION = 2  # Bump when FEATURE_NAMES change; older examples are ignored
+MIN_TRAINING_EXAMPLES = 200
+MIN_CLASS_EXAMPLES = 20  # Need both outcomes before the model is trusted
+BORDERLINE_LOW = 0.25  # Predictions inside [LOW, HIGH] are scored by the LLM
+BORDERLINE_HIGH = 0.75
+DEFAULT_CALIBRATION_RATE = 0.1  # Share of confident predictions still sent to the LLM
+L2_PENALTY = 1e-3
+LEARNING_RATE = 0.5
+TRAINING_ITERATIONS = 500
+HOLDOUT_FRACTION = 0.2  # Newest examples held out for the reported AUC
+MAX_AGE_DAYS = 14.0
+
+RANKED_CATEGORIES = ["AI Research & Technical Deep Dives", "AI Business & Industry News",
+                     "AI Ethics, Policy & Society", "Data Science & Analytics"]
+FEATURE_NAMES = [
+    'source_prior', 'age_days', 'keyword_hits', 'benchmark_hits', 'number_hits', 'named_entities',
+    'summary_length', 'novelty', 'novelty_known', 'hn_score', 'hn_comments', 'citations', 'is_arxiv', 'is_hn',
+] + [f"category:{category}" for category in RANKED_CATEGORIES]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS examples (
+    canonical_url TEXT NOT NULL,
+    category TEXT NOT NULL,
+    title TEXT,
+    features TEXT NOT NULL,
+    feature_version INTEGER NOT NULL,
+    llm_score REAL NOT NULL,
+    label INTEGER NOT NULL,
+    recorded_at REAL NOT NULL,
+    PRIMARY KEY (canonical_url, category)
+);
+CREATE INDEX IF NOT EXISTS idx_examples_recorded_at ON examples(recorded_at);
+"""
+
+
+def use_ranker() -> bool:
+    """Learned ranker enabled (default); it only scores once it has enough examples"""
+    return os.getenv("USE_RANKER", "true").lower() == "true"
+
+
+def calibration_rate() -> float:
+    return float(os.getenv("RANKER_CALIBRATION_RATE", DEFAULT_CALIBRATION_RATE))
+
+
+def is_fallback_score(article: Article) -> bool:
+    """
+    True if the article's score is an error default rather than an LLM judgment.
+    Rows stored before fallbacks were flagged are recognized by the neutral 5/5/5.
+    """
+    if 'score' in article.stage.fallbacks:
+        return True
+    metrics = article.stage.metrics
+    return all(metrics.get(name) == 5.0 for name in ('novelty', 'practical', 'significance'))
+
+
+def article_features(articles: Sequence[Article], category: str,
+                     novelty: Optional[Sequence[Optional[float]]] = None,
+                     scored_at: Optional[Sequence[float]] = None):
+    """
+    Feature matrix (len(articles) x len(FEATURE_NAMES)) for one target category.
+
+    Args:
+        novelty: 1 - max similarity to sent articles per article (None = unknown,
+            imputed as 0 with novelty_known = 0); computed from ArticleMemory in one
+            batched query if not given
+        scored_at: Epoch seconds each article was scored, so age is measured as the
+            scorer saw it (default: now)
+    """
+    import numpy as np
+    from src.agents import PRE_FILTER_KEYWORDS
+    from src.citations import arxiv_id_for, get_citation_index
+    from src.extractive import BENCHMARK_PATTERN, NAMED_ENTITY_PATTERN, NUMBER_PATTERN
+    from src.source_scheduler import source_prior
+
+    if novelty is None:
+        from src.article_memory import get_article_memory
+        novelty = [1.0 - similarity for similarity in get_article_memory().max_similarities(list(articles))]
+    keywords = PRE_FILTER_KEYWORDS.get(category, [])
+    category_flags = [float(category == ranked) for ranked in RANKED_CATEGORIES]
+    now = time.time()
+    priors = {}
+    citations = get_citation_index()
+    citations.enrich(articles)  # No request if the enrichment stage already resolved them
+
+    rows = []
+    for article, article_novelty, at in zip(articles, novelty, scored_at or [now] * len(articles)):
+        text = f"{article.title} {article.summary}"
+        lowered = text.lower()
+        if article.source not in priors:
+            priors[article.source] = source_prior(article.source)
+        published = article.published if isinstance(article.published, datetime) else None
+        age_days = (at - published.timestamp()) / 86400 if published else MAX_AGE_DAYS / 2
+        is_arxiv = arxiv_id_for(article.link) is not None
+        rows.append([
+            priors[article.source],
+            min(max(age_days, 0.0), MAX_AGE_DAYS),
+            math.log1p(sum(keyword in lowered for keyword in keywords)),
+            math.log1p(len(BENCHMARK_PATTERN.findall(text))),
+            math.log1p(len(NUMBER_PATTERN.findall(text))),
+            math.log1p(len(NAMED_ENTITY_PATTERN.findall(text))),
+            math.log1p(len(article.summary or '')),
+            article_novelty if article_novelty is not None else 0.0,
+            float(article_novelty is not None),
+            math.log1p(max(article.score or 0, 0)),
+            math.log1p(max(article.num_comments or 0, 0)),
+            math.log1p(citations.citation_count(article)) if is_arxiv else 0.0,
+            float(is_arxiv),
+            float(article.score is not None),
+            *category_flags,
+        ])
+    return np.asarray(rows, dtype=float).reshape(len(rows), len(FEATURE_NAMES))
+
+
+class RankerModel:
+    """
+    Standardized-feature logistic regression fit by full-batch gradient descent
+    with balanced class weights and an L2 penalty.
+    """
+
+    def __init__(self, mean, std, weights, bias: float, stats: Optional[Dict] = None):
+        import numpy as np
+        self.mean = np.asarray(mean, dtype=float)
+        self.std = np.asarray(std, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.bias = float(bias)
+        self.stats = stats or {}
+
+    @classmethod
+    def fit(cls, X, y) -> 'RankerModel':
+        import numpy as np
+        mean = X.mean(axis=0)
+        std = X.std(axis=0)
+        std[std == 0] = 1.0
+        Z = (X - mean) / std
+        positives = max(y.sum(), 1.0)
+        negatives = max(len(y) - y.sum(), 1.0)
+        sample_weights = np.where(y == 1, len(y) / (2 * positives), len(y) / (2 * negatives))
+
+        weights = np.zeros(Z.shape[1])
+        bias = 0.0
+        for _ in range(TRAINING_ITERATIONS):
+            error = sample_weights * (_sigmoid(Z @ weights + bias) - y)
+            weights -= LEARNING_RATE * (Z.T @ error / len(y) + L2_PENALTY * weights)
+            bias -= LEARNING_RATE * error.mean()
+        return cls(mean, std, weights, bias)
+
+    def predict(self, X):
+        """Selection probability per row"""
+        return _sigmoid((X - self.mean) / self.std @ self.weights + self.bias)
+
+    def to_dict(self) -> Dict:
+        return {
+            'feature_names': FEATURE_NAMES,
+            'feature_version': FEATURE_VERSION,
+            'mean': self.mean.tolist(),
+            'std': self.std.tolist(),
+            'weights': self.weights.tolist(),
+            'bias': self.bias,
+            'stats': self.stats,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> Optional['RankerModel']:
+        """Model from to_dict(), or None if it was trained on other features"""
+        if data.get('feature_version') != FEATURE_VERSION or data.get('feature_names') != FEATURE_NAMES:
+            return None
+        return cls(data['mean'], data['std'], data['weights'], data['bias'], data.get('stats'))
+
+
+def _sigmoid(z):
+    import numpy as np
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+
+def _auc(probabilities, labels) -> Optional[float]:
+    """Area under the ROC curve (rank formulation), or None with a single class"""
+    import numpy as np
+    positives = int(labels.sum())
+    negatives = len(labels) - positives
+    if not positives or not negatives:
+        return None
+    ranks = np.empty(len(probabilities))
+    ranks[np.argsort(probabilities, kind='mergesort')] = np.arange(1, len(probabilities) + 1)
+    return float((ranks[labels == 1].sum() - positives * (positives + 1) / 2) / (positives * negatives))
+
+
+class TrainingExamples:
+    """
+    SQLite store of (features, LLM outcome) per article and target category.
+    """
+
+    def __init__(self, path: Path = DB_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def add(self, category: str, articles: Sequence[Article], X, scores: Sequence[float], threshold: float):
+        """Record LLM-scored articles; label is 1 if the score passed the threshold"""
+        now = time.time()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO examples "
+                "(canonical_url, category, title, features, feature_version, llm_score, label, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(article.canonical_url, category, article.title, json.dumps([round(v, 6) for v in row]),
+                  FEATURE_VERSION, float(score), int(score >= threshold), now)
+                 for article, row, score in zip(articles, X.tolist(), scores)]
+            )
+
+    def mark_vetoed(self, category: str, articles: Sequence[Article]):
+        """Vetoed articles were not selected after all"""
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "UPDATE examples SET label = 0 WHERE canonical_url = ? AND category = ?",
+                [(article.canonical_url, category) for article in articles]
+            )
+
+    def load(self):
+        """(X, y) for every example with the current features, oldest first"""
+        import numpy as np
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT features, label FROM examples WHERE feature_version = ? ORDER BY recorded_at",
+                (FEATURE_VERSION,)
+            ).fetchall()
+        X = np.asarray([json.loads(features) for features, _ in rows], dtype=float).reshape(len(rows), len(FEATURE_NAMES))
+        return X, np.asarray([label for _, label in rows], dtype=float)
+
+    def version(self) -> tuple:
+        """Changes whenever examples are added or relabeled"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(label), 0), COALESCE(MAX(recorded_at), 0) FROM examples "
+                "WHERE feature_version = ?", (FEATURE_VERSION,)
+            ).fetchone()
+
+
+def train(examples: TrainingExamples) -> Optional[RankerModel]:
+    """
+    Fit on all examples and save to MODEL_PATH.
+
+    Returns:
+        The model, or None if there are not enough examples of each outcome yet
+    """
+    X, y = examples.load()
+    positives = int(y.sum())
+    if len(y) < MIN_TRAINING_EXAMPLES or min(positives, len(y) - positives) < MIN_CLASS_EXAMPLES:
+        return None
+
+    holdout = int(len(y) * HOLDOUT_FRACTION)
+    validation = RankerModel.fit(X[:-holdout], y[:-holdout]) if holdout else None
+    model = RankerModel.fit(X, y)
+    model.stats = {
+        'examples': len(y),
+        'positives': positives,
+        'holdout_auc': _auc(validation.predict(X[-holdout:]), y[-holdout:]) if validation else None,
+        'trained_at': datetime.now().isoformat(),
+        'version': list(examples.version()),
+    }
+    MODEL_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with open(MODEL_PATH, 'w') as f:
+        json.dump(model.to_dict(), f, indent=2)
+    return model
+
+
+class Ranker:
+    """
+    Training examples plus the current model (refit when the examples change).
+    """
+
+    def __init__(self, examples: Optional[TrainingExamples] = None):
+        self.examples = examples or TrainingExamples()
+        self.lock = threading.Lock()
+        self.model = None
+        self.model_version = None
+        if MODEL_PATH.exists():
+            try:
+                with open(MODEL_PATH, 'r') as f:
+                    data = json.load(f)
+                self.model = RankerModel.from_dict(data)
+                self.model_version = tuple(data.get('stats', {}).get('version') or ()) or None
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️  Could not load ranker model: {e}")
+
+    def current_model(self) -> Optional[RankerModel]:
+        """Model trained on the latest examples, or None until there are enough"""
+        with self.lock:
+            version = tuple(self.examples.version())
+            if version != self.model_version:
+                self.model = train(self.examples)
+                self.model_version = version
+            return self.model
+
+    def split(self, articles: List[Article], category: str):
+        """
+        Predict every candidate at once and decide who still needs the LLM.
+
+        Returns:
+            (features, probabilities or None without a model, [needs_llm per article])
+        """
+        X = article_features(articles, category)
+        model = self.current_model()
+        if model is None:
+            return X, None, [True] * len(articles)
+        probabilities = model.predict(X)
+        rate = calibration_rate()
+        needs_llm = [BORDERLINE_LOW <= p <= BORDERLINE_HIGH or random.random() < rate for p in probabilities]
+        return X, probabilities, needs_llm
+
+    def bootstrap(self, threshold: float, veto_threshold: float = 5.0) -> int:
+        """
+        Import past LLM scores kept with each article-store row as training examples.
+
+        Returns:
+            Number of examples recorded
+        """
+        from src.article_store import RETENTION_DAYS, get_article_store
+
+        store = get_article_store()
+        articles = [article for article in store.candidates(days=RETENTION_DAYS)
+                    if 'novelty' in article.stage.metrics and not is_fallback_score(article)]
+        # Rows scored before 'scored_at' was recorded: the stage results were written right after the run
+        saved_at = store.stage_saved_at()
+
+        recorded = 0
+        for category in RANKED_CATEGORIES:
+            scored = [article for article in articles
+                      if article.stage.category == category and 'final_score' in article.stage.metrics]
+            if not scored:
+                continue
+            # Novelty vs. sent articles is unknowable after the fact (they may be the sent ones): impute it
+            X = article_features(scored, category, novelty=[None] * len(scored), scored_at=[
+                article.stage.metrics.get('scored_at') or saved_at[article.canonical_url] for article in scored
+            ])
+            self.examples.add(category, scored, X, [article.stage.metrics['final_score'] for article in scored], threshold)
+            self.examples.mark_vetoed(category, [article for article in scored
+                                                 if (article.stage.waste_score or 0) > veto_threshold])
+            recorded += len(scored)
+        return recorded
+
+    def print_stats(self):
+        model = self.current_model()
+        count, positives, _ = self.examples.version()
+        print(f"\n🧮 LEARNED RANKER ({count} examples, {positives} selected)")
+        print("="*80)
+        if model is None:
+            print(f"  Not active yet: needs {MIN_TRAINING_EXAMPLES} examples with at least "
+                  f"{MIN_CLASS_EXAMPLES} of each outcome")
+            return
+        auc = model.stats.get('holdout_auc')
+        print(f"  Holdout AUC: {auc:.3f}" if auc is not None else "  Holdout AUC: n/a")
+        print(f"  LLM band: {BORDERLINE_LOW:.2f}-{BORDERLINE_HIGH:.2f} + {calibration_rate():.0%} calibration sample")
+        print(f"\n{'Feature':<50} {'Weight':>10}")
+        print("-"*80)
+        for name, weight in sorted(zip(FEATURE_NAMES, model.weights), key=lambda item: -abs(item[1])):
+            print(f"{name:<50} {weight:>+10.3f}")
+
+
+_ranker_instance = None
+_ranker_lock = threading.Lock()
+
+
+def get_ranker() -> Optional[Ranker]:
+    """Shared ranker, or None if disabled"""
+    global _ranker_instance
+    if not use_ranker():
+        return None
+    with _ranker_lock:
+        if _ranker_instance is None:
+            _ranker_instance = Ranker()
+        return _ranker_instance
+
+
+def main(argv: List[str], threshold: float):
+    """`ranker [stats|train|bootstrap]` CLI"""
+    ranker = get_ranker()
+    if ranker is None:
+        print("Learned ranker is disabled (USE_RANKER=false).")
+        return
+    command = argv[0] if argv else 'stats'
+    if command == 'bootstrap':
+        print(f"✓ Imported {ranker.bootstrap(threshold)} scored articles from the article store")
+    elif command == 'train':
+        ranker.model_version = None  # Force a refit
+    elif command != 'stats':
+        print(f"Unknown ranker command '{command}' (use stats, train or bootstrap)")
+        return
+    ranker.print_stats()
@@ -6,9 +6,14 @@ Uses external tools to verify claims and gather context.
 """
 
 import os
-from typing import Dict, Tuple, List
-from langchain.agents.factory import create_agent
-import requests
+from typing import Tuple, List
+
+from src.models import Article
+from src.prompts import trim_summary
+from src.llm_client import (invoke_llm, provider_for, estimate_tokens, LLMUnavailableError,
+                            DEFAULT_COMPLETION_TOKENS)
+from src.perf import get_perf, model_name_for
+from src.citations import get_citation_index
 
 
 def web_search(query: str) -> str:
@@ -23,7 +28,7 @@ def web_search(query: str) -> str:
     try:
         from ddgs import DDGS
         
-        with DDGS() as ddgs:
+        with get_perf().http_timer('DuckDuckGo'), DDGS() as ddgs:
             results = list(ddgs.text(query, max_results=3))
             
         if not results:
@@ -50,18 +55,12 @@ def citation_lookup(paper_title: str) -> str:
         Citation count and basic paper info
     """
     try:
-        base_url = "https://api.semanticscholar.org/graph/v1/paper/search"
-        params = {"query": paper_title, "limit": 1, "fields": "citationCount,title,year"}
-        
-        response = requests.get(base_url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
-        if data.get('data'):
-            paper = data['data'][0]
+        # Papers enriched for this run (and earlier lookups) are answered from the cache
+        paper = get_citation_index().search(paper_title)
+        if paper:
             return (
-                f"Found: '{paper['title']}' ({paper.get('year', 'N/A')})\n"
-                f"Citations: {paper.get('citationCount', 0)}"
+                f"Found: '{paper['title']}' ({paper.get('year') or 'N/A'})\n"
+                f"Citations: {paper['citations']}"
             )
         else:
             return "No paper found with that title"
@@ -84,7 +83,7 @@ def trend_check(topic: str) -> str:
         
         recent_query = f"{topic} latest news 2025"
         
-        with DDGS() as ddgs:
+        with get_perf().http_timer('DuckDuckGo'), DDGS() as ddgs:
             results = list(ddgs.text(recent_query, max_results=10))
         
         mention_count = len(results)
@@ -100,18 +99,55 @@ def trend_check(topic: str) -> str:
         return f"Trend check failed: {str(e)}"
 
 
-def score_article_with_react(article: Dict, target_category: str, llm) -> Tuple[float, List]:
+class _ModelTurn:
+    """One model call of a ReACT agent, shaped like a runnable for invoke_llm()"""
+
+    def __init__(self, handler, llm):
+        self.handler = handler
+        self.model_name = model_name_for(llm)
+        self.response = None
+
+    def invoke(self, request, config=None):
+        self.response = self.handler(request)
+        return self.response.result[-1]  # The AIMessage, so perf sees the provider's token usage
+
+
+def rate_limited_model_calls(llm, agent: str = 'react_scoring'):
+    """
+    Agent middleware that sends every model call of the agent loop through invoke_llm().
+    Each turn takes its own request slot and tokens from the provider's limiter and is
+    retried on its own; tool calls between turns hold no slot.
+    """
+    from langchain.agents.middleware import wrap_model_call
+
+    provider = provider_for(llm)
+
+    @wrap_model_call
+    def limit_model_call(request, handler):
+        turn = _ModelTurn(handler, llm)
+        tokens = estimate_tokens([request.system_prompt, *request.messages]) + DEFAULT_COMPLETION_TOKENS
+        invoke_llm(turn, request, agent=agent, provider=provider, estimated_tokens=tokens)
+        return turn.response
+
+    return limit_model_call
+
+
+def score_article_with_react(article: Article, target_category: str, llm) -> Tuple[float, List]:
     """
     Score article quality using ReACT agent with tool use.
     
     Args:
-        article: Article dict with title and summary
+        article: Article with title and summary
         target_category: Target newsletter category
         llm: Language model instance
         
     Returns:
-        (score, reasoning_trail) tuple
+        (score, reasoning_trail) tuple; a neutral 5.0 when the agent fails or gives no
+        score, flagged as the 'score' fallback on article.stage
     """
+    from langchain.agents.factory import create_agent
+
+    article.stage.set_fallback('score', False)
     try:
         # Create ReACT agent with tools
         tools = [web_search, citation_lookup, trend_check]
@@ -140,24 +176,27 @@ After using tools, provide a final score from 0-10 with brief reasoning."""
         agent = create_agent(
             model=llm,
             tools=tools,
-            system_prompt=system_prompt
+            system_prompt=system_prompt,
+            middleware=[rate_limited_model_calls(llm)]
         )
         
         # Create query
         query = f"""Evaluate this article:
 
-Title: {article['title']}
-Summary: {article.get('summary', '')[:500]}
-Source: {article.get('source', 'Unknown')}
+Title: {article.title}
+Summary: {trim_summary(article.summary, 'react_scoring')}
+Source: {article.source}
 
 Use your tools to verify claims and assess quality. Then provide a score from 0-10."""
         
-        # Run agent
-        result = agent.invoke({"messages": [{"role": "user", "content": query}]})
+        # Run agent (each model turn is rate-limited and retried by the middleware)
+        result = agent.invoke({"messages": [{"role": "user", "content": query}]},
+                              config={'run_name': 'react_scoring'})
         
         # Extract final message
         messages = result.get('messages', [])
         if not messages:
+            article.stage.set_fallback('score')
             return 5.0, ["No response from agent"]
         
         final_message = messages[-1]
@@ -181,14 +220,19 @@ Use your tools to verify claims and assess quality. Then provide a score from 0-
                 score = float(numbers[0])
                 if score > 10:
                     score = score / 10
+            else:
+                article.stage.set_fallback('score')
         except:
-            pass
+            article.stage.set_fallback('score')
         
         return score, reasoning_trail
         
+    except LLMUnavailableError:
+        raise  # Let the caller fall back to regular scoring instead of a silent 5.0
     except Exception as e:
         print(f"⚠️  ReACT scoring failed: {e}")
         # Fallback to simple scoring
+        article.stage.set_fallback('score')
         return 5.0, [f"ReACT agent failed: {str(e)}"]
 
 
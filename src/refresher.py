@@ -7,6 +7,8 @@ import json
 from datetime import datetime
 from pathlib import Path
 
+from src.llm_client import invoke_llm
+
 REFRESHERS_FILE = Path(__file__).parent.parent / 'refreshers.yaml'
 HISTORY_FILE = Path(__file__).parent.parent / 'data' / 'refresher_history.json'
 
@@ -89,7 +91,7 @@ def generate_refresher_explanation(topic, llm):
     Returns a 2-3 sentence explanation suitable for the newsletter.
     """
     try:
-        response = llm.invoke(topic['explanation_prompt'])
+        response = invoke_llm(llm, topic['explanation_prompt'], agent='refresher')
         explanation = response.content if hasattr(response, 'content') else str(response)
         return explanation.strip()
     except Exception as e:
@@ -99,30 +101,7 @@ def generate_refresher_explanation(topic, llm):
 
 def format_refresher_html(topic, explanation):
     """
-    Format refresher as HTML for email insertion.
-    """
-    html = f"""
-    <div style="background-color: #f0fdf4; border-left: 4px solid #10b981; padding: 20px; margin: 20px 0; border-radius: 0 8px 8px 0;">
-        <div style="color: #059669; font-weight: 600; font-size: 14px; text-transform: uppercase; letter-spacing: 0.5px; margin-bottom: 10px;">
-            🔄 Refresher: {topic['name']}
-        </div>
-        <div style="color: #374151; font-size: 14px; line-height: 1.6; margin-bottom: 12px;">
-            {explanation}
-        </div>
-        <div style="background-color: #fef3c7; border-left: 3px solid #f59e0b; padding: 12px; margin-top: 12px; border-radius: 0 4px 4px 0;">
-            <div style="color: #92400e; font-weight: 600; font-size: 12px; margin-bottom: 6px;">
-                ⚠️ Common Misconception:
-            </div>
-            <div style="color: #78350f; font-size: 13px; line-height: 1.5;">
-                {topic['misconception']}
-            </div>
-        </div>
-        <div style="margin-top: 12px; font-size: 12px;">
-            <a href="{topic['source']}" style="color: #059669; text-decoration: none;">
-                📚 Learn more →
-            </a>
-        </div>
-    </div>
+    Format refresher as HTML for email insertion (src/templates/refresher.html.j2).
     """
-    return html
-
+    from src.rendering import render
+    return render('refresher.html.j2', topic=topic, explanation=explanation)
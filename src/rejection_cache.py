@@ -0,0 +1,139 @@
+"""
+Rejection Cache
+
+Negative counterpart of ArticleMemory: remembers articles the pipeline already
+rejected so the next scheduled run doesn't pay the LLM again to reject them.
+- Keyed by canonical URL and content hash (re-syndicated copies match too);
+  untitled articles all share one content hash, so they are keyed by URL only
+- Per target category, with the stage and reason (categorize, relevance,
+  quality, veto); 'Irrelevant' categorizations apply to every category
+- Entries expire after REJECTION_TTL_DAYS, the width of the candidate window
+- Persisted in SQLite; all unexpired keys are held in a set for O(1) lookups,
+  so repeat candidates are dropped right after fetch, before any LLM work
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from src.models import Article, compute_content_hash
+
+CACHE_PATH = Path(__file__).parent.parent / 'data' / 'rejection_cache.db'
+REJECTION_TTL_DAYS = 7
+ANY_CATEGORY = '*'  # Rejections that hold for every target category
+EMPTY_TITLE_HASH = compute_content_hash('')  # Never used as a key
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rejections (
+    canonical_url TEXT NOT NULL,
+    content_hash TEXT NOT NULL,
+    category TEXT NOT NULL,
+    stage TEXT NOT NULL,
+    reason TEXT,
+    title TEXT,
+    rejected_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (canonical_url, category)
+);
+CREATE INDEX IF NOT EXISTS idx_rejections_content_hash ON rejections(content_hash, category);
+CREATE INDEX IF NOT EXISTS idx_rejections_expires_at ON rejections(expires_at);
+"""
+
+
+def use_rejection_cache() -> bool:
+    """Skip articles rejected by an earlier run (on by default)"""
+    return os.getenv("USE_REJECTION_CACHE", "true").lower() == "true"
+
+
+class RejectionCache:
+    """
+    SQLite-backed rejection index with an in-memory key set.
+    """
+
+    def __init__(self, path: Path = CACHE_PATH, ttl_days: int = REJECTION_TTL_DAYS):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_days * 86400
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self.prune()
+        with self.lock:
+            rows = self.conn.execute("SELECT canonical_url, content_hash, category FROM rejections").fetchall()
+        self.keys = set()
+        for canonical_url, content_hash, category in rows:
+            self._add_keys(canonical_url, content_hash, category)
+
+    def _add_keys(self, canonical_url: str, content_hash: str, category: str):
+        self.keys.add((canonical_url, category))
+        if content_hash != EMPTY_TITLE_HASH:
+            self.keys.add((content_hash, category))
+
+    def is_rejected(self, article: Article, category: str) -> bool:
+        keys = self.keys
+        lookup = [article.canonical_url]
+        if article.content_hash != EMPTY_TITLE_HASH:
+            lookup.append(article.content_hash)
+        return any((key, scope) in keys for key in lookup for scope in (category, ANY_CATEGORY))
+
+    def filter(self, articles: List[Article], category: str) -> List[Article]:
+        """Articles not previously rejected for `category`"""
+        return [article for article in articles if not self.is_rejected(article, category)]
+
+    def add(self, rejections: Iterable[Tuple[Article, str, str, str]]):
+        """
+        Record rejections in one transaction.
+
+        Args:
+            rejections: (article, category, stage, reason) tuples; category may be ANY_CATEGORY
+        """
+        now = time.time()
+        rows = [
+            (article.canonical_url, article.content_hash, category, stage, reason, article.title,
+             now, now + self.ttl_seconds)
+            for article, category, stage, reason in rejections
+        ]
+        if not rows:
+            return
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO rejections (canonical_url, content_hash, category, stage, reason, title, "
+                "rejected_at, expires_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            for canonical_url, content_hash, category, *_ in rows:
+                self._add_keys(canonical_url, content_hash, category)
+
+    def prune(self) -> int:
+        """Delete expired rejections. Returns rows deleted."""
+        with self.lock, self.conn:
+            return self.conn.execute("DELETE FROM rejections WHERE expires_at < ?", (time.time(),)).rowcount
+
+    def get_stats(self) -> Dict[str, int]:
+        """Unexpired rejections per stage"""
+        with self.lock:
+            return dict(self.conn.execute(
+                "SELECT stage, COUNT(*) FROM rejections WHERE expires_at >= ? GROUP BY stage", (time.time(),)
+            ).fetchall())
+
+
+def record_rejections(rejections: List[Tuple[Article, str, str, str]]):
+    """Record (article, category, stage, reason) tuples if the cache is enabled"""
+    if rejections and use_rejection_cache():
+        get_rejection_cache().add(rejections)
+
+
+_cache_instance = None
+_cache_lock = threading.Lock()
+
+
+def get_rejection_cache() -> RejectionCache:
+    """Get or create singleton instance of RejectionCache"""
+    global _cache_instance
+    with _cache_lock:
+        if _cache_instance is None:
+            _cache_instance = RejectionCache()
+        return _cache_instance
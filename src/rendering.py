@@ -0,0 +1,154 @@
+"""
+Digest Rendering
+
+Email HTML is produced by Jinja2 templates in src/templates/ instead of
+string concatenation:
+- One Environment per process; compiled templates are kept in memory and in a
+  bytecode cache (data/template_cache/), so later runs skip parsing entirely
+- HTML autoescaping for every article field, joke and refresher
+- A digest view (plain dicts) is built once in a single pass: joke article
+  first, metrics and dates formatted once, so every template renders in linear time
+- The same view renders the email/archive HTML and the blog payload; templates
+  can also be streamed straight to a file
+"""
+
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.models import Article
+
+TEMPLATES_DIR = Path(__file__).parent / 'templates'
+BYTECODE_CACHE_DIR = Path(__file__).parent.parent / 'data' / 'template_cache'
+JOKE_TITLE_MAX_CHARS = 60
+
+_env = None
+_env_lock = threading.Lock()
+
+
+def get_template_env():
+    """Get or create the shared Jinja2 Environment (autoescaping, bytecode cache)"""
+    global _env
+    with _env_lock:
+        if _env is None:
+            from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+            BYTECODE_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            _env = Environment(
+                loader=FileSystemLoader(str(TEMPLATES_DIR)),
+                autoescape=select_autoescape(['html', 'html.j2']),
+                bytecode_cache=FileSystemBytecodeCache(str(BYTECODE_CACHE_DIR)),
+                trim_blocks=True,
+                lstrip_blocks=True,
+                auto_reload=False,
+            )
+        return _env
+
+
+def article_metrics(article: Article) -> List[str]:
+    """
+    Metric labels (date, citations, engagement) shown under an article.
+    Only metrics that are actually available for the source.
+    """
+    metrics = []
+    if article.published:
+        metrics.append(f"Published: {article.published.strftime('%b %d, %Y')}")
+    # Citation count (arXiv only, via Semantic Scholar)
+    if article.stage.metrics.get('citations', 0) > 0:
+        metrics.append(f"Citations: {article.stage.metrics['citations']}")
+    if 'hacker news' in article.source.lower():
+        if article.score:
+            metrics.append(f"Upvotes: {article.score}")
+        if article.num_comments:
+            metrics.append(f"Comments: {article.num_comments}")
+    return metrics
+
+
+def article_view(article: Article) -> Dict:
+    return {
+        'title': article.title,
+        'link': article.link,
+        'source': article.source,
+        'summary': article.summary,
+        'metrics': article_metrics(article),
+    }
+
+
+def build_digest_view(schedule: Dict, categorized_articles: Dict[str, List[Article]], joke: str,
+                      joke_article: Optional[Article] = None, refresher: Optional[Dict] = None,
+                      date: Optional[datetime] = None) -> Dict:
+    """
+    Everything the templates need, computed once.
+
+    Args:
+        schedule: Day schedule (name, description, category)
+        categorized_articles: {category: [Article]} finalists
+        joke: Joke of the day
+        joke_article: Article the joke is about (shown first in the featured category)
+        refresher: Optional {'topic': refresher topic, 'explanation': str}
+        date: Digest date (defaults to now)
+    """
+    featured_category = schedule['category']
+    joke_link = joke_article.link if joke_article else None
+
+    # Single pass: the joke article goes first, the rest keep their order
+    joke_view, featured = None, []
+    for article in categorized_articles.get(featured_category) or []:
+        if joke_link and article.link == joke_link:
+            joke_view = joke_view or article_view(article)
+        else:
+            featured.append(article_view(article))
+    if joke_view:
+        featured.insert(0, joke_view)
+
+    joke_title = joke_article.title if joke_article else ''
+    if len(joke_title) > JOKE_TITLE_MAX_CHARS:
+        joke_title = joke_title[:JOKE_TITLE_MAX_CHARS] + "..."
+
+    return {
+        'name': schedule['name'],
+        'description': schedule['description'],
+        'date': (date or datetime.now()).strftime('%B %d, %Y'),
+        'published_date': (date or datetime.now()).strftime('%Y-%m-%d'),
+        'featured_category': featured_category,
+        'featured': featured,
+        'joke': joke,
+        'joke_article_title': joke_title,
+        'refresher': refresher,
+        'other_categories': [
+            {'name': category, 'articles': [article_view(article) for article in articles]}
+            for category, articles in categorized_articles.items()
+            if category != featured_category and articles
+        ],
+    }
+
+
+def render(template_name: str, **context) -> str:
+    return get_template_env().get_template(template_name).render(**context)
+
+
+def stream_to_file(path, template_name: str, **context):
+    """Render a template chunk by chunk straight into a file"""
+    template = get_template_env().get_template(template_name)
+    with open(path, 'w', encoding='utf-8') as f:
+        template.stream(**context).dump(f)
+
+
+def render_digest_email(view: Dict) -> str:
+    """Themed email HTML (also used verbatim as the archive copy)"""
+    return render('themed_email.html.j2', digest=view)
+
+
+def digest_blog_payload(view: Dict) -> Dict:
+    """Blog digest record (title, published_date, content) from the same view"""
+    articles = view['featured'] + [article for category in view['other_categories'] for article in category['articles']]
+    return {
+        'title': view['name'],
+        'published_date': view['published_date'],
+        'content': [
+            {'title': article['title'], 'url': article['link'], 'summary': article['summary'], 'source': article['source']}
+            for article in articles
+        ],
+        'status': 'draft',
+    }
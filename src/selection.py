@@ -0,0 +1,115 @@
+"""
+Final Selection
+
+Picks the digest's articles from the scored candidates in one vectorized pass
+instead of a plain sort on score:
+- Utility per candidate from a NumPy feature matrix: quality score, recency
+  (exponential decay) and novelty vs. articles already sent (one batched
+  ArticleMemory query)
+- Maximal Marginal Relevance over the candidates' text similarity, so five
+  versions of the same story cannot fill the digest: each pick maximizes
+  MMR_LAMBDA * utility - (1 - MMR_LAMBDA) * max similarity to earlier picks
+- Text vectors are hashed TF-IDF (fixed width, CPU only), and only the
+  similarity column of the latest pick is computed per step, so selecting K of
+  N costs O(N * K) dot products and no N x N matrix is built
+- NumPy is imported by the functions that use it, so importing this module
+  keeps CLI startup light
+"""
+
+import zlib
+from datetime import datetime, timezone
+from typing import List, Optional, Sequence, Tuple
+
+from src.models import Article
+
+QUALITY_WEIGHT = 0.7
+RECENCY_WEIGHT = 0.15
+NOVELTY_WEIGHT = 0.15
+RECENCY_HALF_LIFE_DAYS = 3.0
+MMR_LAMBDA = 0.7  # 1.0 = pure utility order, lower = more diversity
+HASH_DIMENSIONS = 2048
+
+
+def text_vectors(articles: Sequence[Article]):
+    """
+    L2-normalized hashed TF-IDF vectors of title + summary (one row per article).
+    """
+    import numpy as np
+    from src.extractive import STOPWORDS, TOKEN_PATTERN
+
+    rows, cols = [], []
+    for row, article in enumerate(articles):
+        for token in TOKEN_PATTERN.findall(f"{article.title} {article.summary}".lower()):
+            if token not in STOPWORDS:
+                rows.append(row)
+                cols.append(zlib.crc32(token.encode()) % HASH_DIMENSIONS)
+
+    matrix = np.zeros((len(articles), HASH_DIMENSIONS), dtype=np.float32)
+    if not rows:
+        return matrix
+    np.add.at(matrix, (np.array(rows), np.array(cols)), 1.0)
+
+    document_frequency = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1 + len(articles)) / (1 + document_frequency)) + 1.0
+    matrix = np.log1p(matrix) * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def utility_scores(scores: Sequence[float], articles: Sequence[Article],
+                   novelty: Optional[Sequence[float]] = None):
+    """
+    Combined utility in [0, 1] per candidate.
+
+    Args:
+        scores: Quality scores (0-10)
+        novelty: 1 - max similarity to sent articles; from ArticleMemory if not given
+    """
+    import numpy as np
+
+    if novelty is None:
+        from src.article_memory import get_article_memory
+        novelty = [1.0 - similarity for similarity in get_article_memory().max_similarities(list(articles))]
+
+    now = datetime.now(timezone.utc)
+    age_days = np.array([
+        (now - article.published).total_seconds() / 86400 if isinstance(article.published, datetime) else np.nan
+        for article in articles
+    ], dtype=float)
+    recency = np.where(np.isnan(age_days), 0.5, np.exp2(-np.clip(age_days, 0, None) / RECENCY_HALF_LIFE_DAYS))
+
+    features = np.column_stack([np.clip(np.asarray(scores, dtype=float) / 10, 0, 1), recency,
+                                np.clip(np.asarray(novelty, dtype=float), 0, 1)])
+    return features @ np.array([QUALITY_WEIGHT, RECENCY_WEIGHT, NOVELTY_WEIGHT])
+
+
+def mmr_order(utility, vectors, k: int, diversity_lambda: float = MMR_LAMBDA) -> List[int]:
+    """
+    Indices of the k candidates chosen greedily by Maximal Marginal Relevance, in pick order.
+    """
+    import numpy as np
+
+    k = min(k, len(utility))
+    max_similarity = np.zeros(len(utility))
+    available = np.ones(len(utility), dtype=bool)
+    order = []
+    for _ in range(k):
+        marginal = np.where(available, diversity_lambda * utility - (1 - diversity_lambda) * max_similarity, -np.inf)
+        pick = int(np.argmax(marginal))
+        order.append(pick)
+        available[pick] = False
+        np.maximum(max_similarity, vectors @ vectors[pick], out=max_similarity)
+    return order
+
+
+def select_diverse(scored_articles: Sequence[Tuple[float, Article]], k: int,
+                   novelty: Optional[Sequence[float]] = None) -> List[Tuple[float, Article]]:
+    """
+    Top k (score, article) pairs by utility with MMR diversity, best first.
+    """
+    if not scored_articles:
+        return []
+    scores = [score for score, _ in scored_articles]
+    articles = [article for _, article in scored_articles]
+    order = mmr_order(utility_scores(scores, articles, novelty), text_vectors(articles), k)
+    return [scored_articles[index] for index in order]
@@ -0,0 +1,302 @@
+"""
+Source Scheduler
+
+Reads the conversion funnels recorded by every digest run back from the
+funnel store (src.funnel, data/funnel.db), and uses them to decide how much
+network and LLM budget each source gets:
+- Conversion is measured over distinct articles: of a source's articles that
+  were candidates for a digest's category (first seen in the last HISTORY_DAYS),
+  how many made that digest. Stored articles re-entering the candidate window
+  on later runs are not counted again, and articles that never matched the
+  run's category are not counted at all
+- Conversion prior per source: Beta centered on the mean conversion of all
+  sources, worth PRIOR_STRENGTH candidates, updated with the source's counts
+- Sources with no such history fall back to the per-source counts imported
+  from the pre-store JSON files (`funnel import`); sources with too little
+  history are explored at full budget
+- Tiers are relative to the mean conversion, so they hold whatever the
+  categories' typical hit rate is: sources well above it get every entry,
+  low-conversion ones are demoted (fewer entries, polled at most every
+  DEMOTED_INTERVAL_HOURS), and near-zero ones are skipped and only re-checked
+  every SKIPPED_RECHECK_DAYS so they can recover
+- Candidates are evaluated best-converting source first
+
+Sources are scheduled per fetcher ('arXiv API', 'arXiv API (statistics)',
+'Hacker News' or a feed URL), the same names the ingestion deadline reports
+use. Funnel rows are keyed by display name (feed title, "arXiv: ... • author"),
+so feed titles seen at fetch time are remembered in data/source_schedule.json
+together with when each source was last polled.
+
+USE_SOURCE_SCHEDULER=false fetches and evaluates everything as before.
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.funnel import FunnelStore, get_funnel_store
+from src.models import Article
+
+STATE_PATH = Path(__file__).parent.parent / 'data' / 'source_schedule.json'
+HISTORY_DAYS = 28
+
+PRIOR_MEAN = 0.05  # Conversion assumed before any history exists
+PRIOR_STRENGTH = 10  # The prior is worth this many candidates
+MIN_SAMPLES = 20  # Distinct candidates before a source can be promoted, demoted or skipped
+PROMOTE_FACTOR = 1.6  # Tiers as multiples of the mean conversion of all sources
+DEMOTE_FACTOR = 0.4
+SKIP_FACTOR = 0.1
+
+DEMOTED_INTERVAL_HOURS = 6
+SKIPPED_RECHECK_DAYS = 7
+POLL_SLACK_SECONDS = 300  # An hourly ingest that starts a little early still counts as due
+DEMOTED_ENTRY_FRACTION = 0.5
+DEMOTED_MAX_ENTRIES = 5  # Cap for demoted feeds that normally have no entry limit
+SKIPPED_MAX_ENTRIES = 2  # Entries fetched when a skipped source is re-checked
+
+ARXIV_STATS_SOURCE = re.compile(r'^arXiv: (Statistics|.*\(Statistics\)|stat\.)')
+
+
+def use_source_scheduler() -> bool:
+    """Adapt polling and evaluation order to historical conversion (on by default)"""
+    return os.getenv("USE_SOURCE_SCHEDULER", "true").lower() == "true"
+
+
+def source_group(source: str) -> str:
+    """
+    Scheduling key for a funnel display name. arXiv papers are listed per
+    category and first author, but all come from one of two API queries.
+    """
+    name = source.split(' • ', 1)[0]
+    if name.startswith('arXiv'):
+        return 'arXiv API (statistics)' if ARXIV_STATS_SOURCE.match(name) else 'arXiv API'
+    return name
+
+
+@dataclass(slots=True)
+class SourcePlan:
+    """What one source gets this run"""
+    origin: str
+    tier: str  # 'explore', 'promoted', 'normal', 'demoted' or 'skipped'
+    rate: float  # Posterior mean final conversion
+    candidates: int  # Distinct category candidates from it in the history window
+    final: int  # Of which made it into a digest
+    interval_seconds: float  # Minimum time between polls
+
+
+class SourceScheduler:
+    """
+    Conversion priors from the funnel history plus per-source poll state.
+    """
+
+    def __init__(self, store: Optional[FunnelStore] = None, state_path: Path = STATE_PATH,
+                 history_days: int = HISTORY_DAYS):
+        self.store = store or get_funnel_store()
+        self.state_path = state_path
+        self.history_days = history_days
+        self.lock = threading.Lock()
+        self.state = self._load_state()
+        self.history: Dict[str, Dict[str, int]] = {}
+        self.mean_rate = PRIOR_MEAN
+        self.history_version = None
+        self.reload()
+
+    def _load_state(self) -> Dict:
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            state = {}
+        return {'titles': state.get('titles', {}), 'polled': state.get('polled', {})}
+
+    def _save_state(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def reload(self):
+        """Re-aggregate the funnel history if a run was recorded since the last load"""
+        version = self.store.last_recorded_at()
+        if self.history_version is not None and version == self.history_version:
+            return
+        history = {}
+        for source, totals in self.store.source_conversions(self.history_days).items():
+            stats = history.setdefault(source_group(source), {'candidates': 0, 'final': 0})
+            stats['candidates'] += totals['candidates']
+            stats['final'] += totals['final']
+        legacy = {}
+        for source, totals in self.store.legacy_conversions().items():
+            stats = legacy.setdefault(source_group(source), {'candidates': 0, 'final': 0})
+            stats['candidates'] += totals['candidates']
+            stats['final'] += totals['final']
+        for group, stats in legacy.items():
+            history.setdefault(group, stats)
+        candidates = sum(stats['candidates'] for stats in history.values())
+        final = sum(stats['final'] for stats in history.values())
+        with self.lock:
+            self.history = history
+            self.mean_rate = (PRIOR_MEAN * PRIOR_STRENGTH + final) / (PRIOR_STRENGTH + candidates)
+            self.history_version = version
+
+    def has_history(self, origin: str) -> bool:
+        """True if the funnel history (or a legacy import) has counts for this source"""
+        return self.group_for(origin) in self.history
+
+    def group_for(self, origin: str) -> str:
+        """Analytics key of a fetcher: the last seen title for feed URLs"""
+        return self.state['titles'].get(origin, origin)
+
+    def conversion(self, stats: Dict[str, int]) -> float:
+        """Posterior mean conversion: the mean of all sources, updated with one source's counts"""
+        return (self.mean_rate * PRIOR_STRENGTH + stats['final']) / (PRIOR_STRENGTH + stats['candidates'])
+
+    def plan(self, origin: str) -> SourcePlan:
+        stats = self.history.get(self.group_for(origin), {'candidates': 0, 'final': 0})
+        rate = self.conversion(stats)
+        if stats['candidates'] < MIN_SAMPLES:
+            tier, interval = 'explore', 0
+        elif rate < SKIP_FACTOR * self.mean_rate:
+            tier, interval = 'skipped', SKIPPED_RECHECK_DAYS * 86400
+        elif rate < DEMOTE_FACTOR * self.mean_rate:
+            tier, interval = 'demoted', DEMOTED_INTERVAL_HOURS * 3600
+        elif rate >= PROMOTE_FACTOR * self.mean_rate:
+            tier, interval = 'promoted', 0
+        else:
+            tier, interval = 'normal', 0
+        return SourcePlan(origin, tier, rate, stats['candidates'], stats['final'], interval)
+
+    def is_due(self, origin: str) -> bool:
+        """True if the source should be polled now (its interval has passed)"""
+        plan = self.plan(origin)
+        last = self.state['polled'].get(origin)
+        return last is None or time.time() - last >= plan.interval_seconds - POLL_SLACK_SECONDS
+
+    def entries(self, origin: str, default: Optional[int]) -> Optional[int]:
+        """
+        Max entries to take from a source this run.
+
+        Args:
+            default: The fetcher's usual limit (None = every entry)
+        """
+        tier = self.plan(origin).tier
+        if tier == 'skipped':
+            return SKIPPED_MAX_ENTRIES
+        if tier == 'demoted':
+            return max(SKIPPED_MAX_ENTRIES, int(default * DEMOTED_ENTRY_FRACTION)) if default else DEMOTED_MAX_ENTRIES
+        if tier == 'promoted' and default and default < 10:
+            return None  # Small per-feed caps only; API page sizes stay as they are
+        return default
+
+    def select(self, origins: Iterable[str], default: Optional[int] = None) -> Dict[str, Optional[int]]:
+        """
+        Sources due this run with their entry limits, {origin: limit}.
+        Prints what was held back.
+        """
+        due, held_back = {}, []
+        for origin in origins:
+            if self.is_due(origin):
+                due[origin] = self.entries(origin, default)
+            else:
+                held_back.append(origin)
+        if held_back:
+            names = ', '.join(self.group_for(origin) for origin in held_back[:5])
+            more = f" and {len(held_back) - 5} more" if len(held_back) > 5 else ''
+            print(f"  ⏭️  Source scheduler: not due this run (low conversion): {names}{more}")
+        return due
+
+    def mark_polled(self, origins: Iterable[str], titles: Optional[Dict[str, str]] = None):
+        """Record a poll (and the feed titles it returned) in data/source_schedule.json"""
+        now = time.time()
+        with self.lock:
+            for origin in origins:
+                self.state['polled'][origin] = now
+            for url, title in (titles or {}).items():
+                if title:
+                    self.state['titles'][url] = title
+            self._save_state()
+
+    def prior(self, source: str) -> float:
+        """Posterior mean conversion for an article's display source"""
+        return self.conversion(self.history.get(source_group(source), {'candidates': 0, 'final': 0}))
+
+    def order(self, articles: List[Article]) -> List[Article]:
+        """Articles from the best-converting sources first (stable within a source)"""
+        priors = {}
+        for article in articles:
+            if article.source not in priors:
+                priors[article.source] = self.prior(article.source)
+        return sorted(articles, key=lambda article: -priors[article.source])
+
+    def report(self) -> List[Tuple[str, SourcePlan]]:
+        """(funnel source key, plan) for every source with history, best first"""
+        groups = {self.group_for(origin): origin for origin in self.state['polled']}
+        plans = [(group, self.plan(groups.get(group, group))) for group in self.history]
+        return sorted(plans, key=lambda item: -item[1].rate)
+
+    def print_report(self):
+        print(f"\n📡 SOURCE SCHEDULE (last {self.history_days} days of digest runs, "
+              f"mean conversion {100 * self.mean_rate:.1f}%)")
+        print("="*80)
+        print(f"{'Source':<46} {'Tier':<10} {'Final':>6} {'Candidates':>10} {'Prior':>7}")
+        print("-"*80)
+        for group, plan in self.report():
+            print(f"{group[:45]:<46} {plan.tier:<10} {plan.final:>6} {plan.candidates:>10} {100 * plan.rate:>6.1f}%")
+
+
+def poll_limits(origins: Iterable[str], default: Optional[int] = None) -> Dict[str, Optional[int]]:
+    """{origin: max entries} for the sources to fetch now (all of them, at default, if the scheduler is off)"""
+    scheduler = get_source_scheduler()
+    if scheduler is None:
+        return {origin: default for origin in origins}
+    return scheduler.select(origins, default)
+
+
+def record_polls(origins: Iterable[str], titles: Optional[Dict[str, str]] = None):
+    """Record successful polls if the scheduler is enabled"""
+    scheduler = get_source_scheduler()
+    if scheduler is not None:
+        scheduler.mark_polled(origins, titles)
+
+
+def has_source_history(origin: str) -> bool:
+    """True if the scheduler is enabled and has conversion history for the source"""
+    scheduler = get_source_scheduler()
+    return scheduler is not None and scheduler.has_history(origin)
+
+
+def source_prior(source: str) -> float:
+    """Conversion prior for an article's display source (the prior mean if the scheduler is off)"""
+    scheduler = get_source_scheduler()
+    if scheduler is None:
+        return PRIOR_MEAN
+    return scheduler.prior(source)
+
+
+def order_by_source_prior(articles: List[Article]) -> List[Article]:
+    """Best-converting sources first, or unchanged if the scheduler is off"""
+    scheduler = get_source_scheduler()
+    return scheduler.order(articles) if scheduler is not None else articles
+
+
+_scheduler_instance = None
+_scheduler_lock = threading.Lock()
+
+
+def get_source_scheduler() -> Optional[SourceScheduler]:
+    """Shared scheduler (history re-read if a run was recorded since), or None if disabled"""
+    global _scheduler_instance
+    if not use_source_scheduler():
+        return None
+    with _scheduler_lock:
+        if _scheduler_instance is None:
+            _scheduler_instance = SourceScheduler()
+        else:
+            _scheduler_instance.reload()
+        return _scheduler_instance
@@ -0,0 +1,313 @@
+"""
+Durable Work Queue
+
+Queue-backed execution of the per-article LLM stages (USE_WORK_QUEUE=true),
+so throughput is not capped by one interpreter and one provider key:
+- Stages enqueue one task per article (categorize, relevance, score, veto,
+  summarize) into SQLite (data/work_queue.db, WAL, safe across processes)
+- Any number of workers claim tasks (`python main_scheduled.py worker`, e.g.
+  one per API key via its own environment, or on other hosts sharing the
+  database file); the dispatching run works on its own tasks too, so it
+  finishes even with no other worker running
+- Claims are leases: a task whose worker died is claimed again after
+  LEASE_SECONDS; failures are retried with backoff up to MAX_ATTEMPTS
+- Idempotency key per (run, stage, category, article), the run being the
+  checkpoint's day_key/run_id: a resumed run re-enqueues the same keys and reuses
+  finished results instead of paying the LLM again, while a new run (e.g. after
+  a prompt, model or threshold change) always gets fresh tasks
+- Tasks carry their run scope, so a dispatch claims only its own run's tasks
+  of its stage with one indexed filter, however many articles the stage has
+- Results carry the article's updated state and are joined back in input order
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from src.models import Article
+
+QUEUE_PATH = Path(__file__).parent.parent / 'data' / 'work_queue.db'
+LEASE_SECONDS = 300  # A claimed task is handed out again if not finished by then
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF_SECONDS = 5  # Doubled per attempt
+POLL_SECONDS = 0.2
+PROGRESS_SECONDS = 1.0  # While tasks keep coming, a dispatch checks results at most this often
+RETENTION_DAYS = 2  # Finished tasks older than this are pruned
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    idempotency_key TEXT NOT NULL UNIQUE,
+    scope TEXT NOT NULL DEFAULT '',
+    kind TEXT NOT NULL,
+    category TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL,
+    lease_until REAL,
+    worker TEXT,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status, available_at);
+CREATE INDEX IF NOT EXISTS idx_tasks_scope ON tasks(scope, kind, status);
+CREATE INDEX IF NOT EXISTS idx_tasks_updated_at ON tasks(updated_at);
+"""
+
+
+class WorkQueueError(Exception):
+    """A task failed on every attempt"""
+
+
+def use_work_queue() -> bool:
+    """Run the LLM stages through the durable work queue (opt-in)"""
+    return os.getenv("USE_WORK_QUEUE", "false").lower() == "true"
+
+
+def task_key(kind: str, category: str, article: Article, scope: str) -> str:
+    """Idempotency key: the same stage for the same article and category within one run (scope)"""
+    return f"{scope}:{kind}:{category}:{article.canonical_url}:{article.content_hash}"
+
+
+class WorkQueue:
+    """
+    SQLite task table shared by the dispatching run and any number of worker processes.
+    """
+
+    def __init__(self, path: Path = QUEUE_PATH):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        # Autocommit mode so claims can take the write lock up front (BEGIN IMMEDIATE)
+        self.conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(tasks)")}
+        if columns and 'scope' not in columns:
+            # Queue created before tasks carried their run scope
+            self.conn.execute("ALTER TABLE tasks ADD COLUMN scope TEXT NOT NULL DEFAULT ''")
+        self.conn.executescript(SCHEMA)
+
+    def enqueue(self, kind: str, category: str, articles: Sequence[Article], scope: str) -> List[str]:
+        """
+        Add one task per article (existing keys are left as they are).
+
+        Returns:
+            Idempotency keys, in article order
+        """
+        now = time.time()
+        keys = [task_key(kind, category, article, scope) for article in articles]
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO tasks (idempotency_key, scope, kind, category, payload, available_at, "
+                    "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(key, scope, kind, category, json.dumps(article.to_dict()), now, now, now)
+                     for key, article in zip(keys, articles)]
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        return keys
+
+    def claim(self, worker: str, scope: Optional[str] = None, kind: Optional[str] = None) -> Optional[Dict]:
+        """
+        Lease the oldest runnable task (optionally only one run's tasks of one kind). Returns the task or None.
+        """
+        now = time.time()
+        query = ("SELECT id, idempotency_key, kind, category, payload, attempts FROM tasks "
+                 "WHERE ((status = 'pending' AND available_at <= ?) OR (status = 'running' AND lease_until < ?))")
+        params: list = [now, now]
+        if scope is not None:
+            query += " AND scope = ? AND kind = ?"
+            params += [scope, kind]
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute(query + " ORDER BY id LIMIT 1", params).fetchone()
+                if row:
+                    self.conn.execute(
+                        "UPDATE tasks SET status = 'running', attempts = attempts + 1, lease_until = ?, worker = ?, "
+                        "updated_at = ? WHERE id = ?", (now + LEASE_SECONDS, worker, now, row[0])
+                    )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+        if not row:
+            return None
+        task_id, key, kind, category, payload, attempts = row
+        return {'id': task_id, 'key': key, 'kind': kind, 'category': category,
+                'article': Article.from_dict(json.loads(payload)), 'attempt': attempts + 1}
+
+    def complete(self, task: Dict, result: Dict):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE tasks SET status = 'done', result = ?, error = NULL, lease_until = NULL, updated_at = ? WHERE id = ?",
+                (json.dumps(result), time.time(), task['id'])
+            )
+
+    def fail(self, task: Dict, error: str):
+        """Back to pending with exponential backoff, or failed after MAX_ATTEMPTS"""
+        now = time.time()
+        with self.lock:
+            if task['attempt'] >= MAX_ATTEMPTS:
+                self.conn.execute(
+                    "UPDATE tasks SET status = 'failed', error = ?, lease_until = NULL, updated_at = ? WHERE id = ?",
+                    (error, now, task['id'])
+                )
+            else:
+                self.conn.execute(
+                    "UPDATE tasks SET status = 'pending', error = ?, lease_until = NULL, available_at = ?, "
+                    "updated_at = ? WHERE id = ?",
+                    (error, now + RETRY_BACKOFF_SECONDS * 2 ** (task['attempt'] - 1), now, task['id'])
+                )
+
+    def outcomes(self, keys: Sequence[str]) -> Dict[str, tuple]:
+        """{key: (status, result, error)} for the given keys"""
+        outcomes = {}
+        with self.lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                outcomes.update({
+                    key: (status, json.loads(result) if result else None, error)
+                    for key, status, result, error in self.conn.execute(
+                        f"SELECT idempotency_key, status, result, error FROM tasks "
+                        f"WHERE idempotency_key IN ({','.join('?' * len(chunk))})", chunk
+                    )
+                })
+        return outcomes
+
+    def retry_failed(self, keys: Sequence[str]):
+        """Give permanently failed tasks a fresh set of attempts (a new run asked for them again)"""
+        with self.lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                self.conn.execute(
+                    f"UPDATE tasks SET status = 'pending', attempts = 0, available_at = ?, updated_at = ? "
+                    f"WHERE status = 'failed' AND idempotency_key IN ({','.join('?' * len(chunk))})",
+                    [time.time(), time.time(), *chunk]
+                )
+
+    def prune(self, retention_days: float = RETENTION_DAYS) -> int:
+        """Delete finished tasks not updated for retention_days. Returns rows deleted."""
+        with self.lock:
+            return self.conn.execute(
+                "DELETE FROM tasks WHERE status IN ('done', 'failed') AND updated_at < ?",
+                (time.time() - retention_days * 86400,)
+            ).rowcount
+
+    def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """{kind: {status: count}}"""
+        stats: Dict[str, Dict[str, int]] = {}
+        with self.lock:
+            for kind, status, count in self.conn.execute("SELECT kind, status, COUNT(*) FROM tasks GROUP BY kind, status"):
+                stats.setdefault(kind, {})[status] = count
+        return stats
+
+
+def execute(queue: WorkQueue, task: Dict, handlers: Dict[str, Callable]):
+    """
+    Run one claimed task. The result keeps the handler's return value and the
+    article's state afterwards (category, metrics, judge, summary, ...).
+    """
+    article = task['article']
+    try:
+        value = handlers[task['kind']](article, task['category'])
+    except Exception as e:
+        print(f"  ⚠️  Task {task['kind']} failed (attempt {task['attempt']}/{MAX_ATTEMPTS}) "
+              f"for '{article.title[:40]}...': {e}")
+        queue.fail(task, str(e))
+        return
+    queue.complete(task, {'value': value, 'article': article.to_dict()})
+
+
+def run_worker(handlers: Dict[str, Callable], worker: Optional[str] = None, stop_event: Optional[threading.Event] = None):
+    """Claim and run tasks until stopped (one worker process)"""
+    queue = get_work_queue()
+    worker = worker or f"{os.uname().nodename}:{os.getpid()}"
+    print(f"👷 Worker {worker} polling {QUEUE_PATH}")
+    while not (stop_event and stop_event.is_set()):
+        task = queue.claim(worker)
+        if task is None:
+            time.sleep(POLL_SECONDS)
+            continue
+        execute(queue, task, handlers)
+
+
+def dispatch(kind: str, articles: Sequence[Article], category: str, handlers: Dict[str, Callable],
+             scope: Optional[str] = None, on_complete: Optional[Callable[[int], None]] = None) -> List:
+    """
+    Enqueue `kind` for every article and wait for the results, working on them
+    too. Each article's state is updated in place from its task's result.
+
+    Args:
+        scope: Run key (checkpoint day_key/run_id); finished tasks are only reused
+            within the same scope. Without one, nothing is reused
+        on_complete: Optional callback(count) as results come in (progress bars)
+
+    Returns:
+        Handler return values, in article order
+
+    Raises:
+        WorkQueueError: A task failed MAX_ATTEMPTS times
+    """
+    if not articles:
+        return []
+    queue = get_work_queue()
+    scope = scope or f"adhoc-{uuid.uuid4().hex}"
+    keys = queue.enqueue(kind, category, articles, scope)
+    queue.retry_failed(keys)
+    worker = f"{os.uname().nodename}:{os.getpid()}:dispatch-{uuid.uuid4().hex[:6]}"
+
+    finished, checked_at = 0, 0.0
+    while True:
+        task = queue.claim(worker, scope, kind)
+        if task is not None:
+            execute(queue, task, handlers)
+            if time.time() - checked_at < PROGRESS_SECONDS:
+                continue
+        outcomes = queue.outcomes(keys)
+        checked_at = time.time()
+        failed = [key for key in keys if outcomes[key][0] == 'failed']
+        if failed:
+            raise WorkQueueError(f"{len(failed)} {kind} task(s) failed: {outcomes[failed[0]][2]}")
+        done = sum(1 for key in keys if outcomes[key][0] == 'done')
+        if on_complete and done > finished:
+            on_complete(done - finished)
+        finished = done
+        if done == len(keys):
+            break
+        if task is None:
+            time.sleep(POLL_SECONDS)  # Everything left is leased by other workers or backing off
+
+    values = []
+    for article, key in zip(articles, keys):
+        result = outcomes[key][1]
+        updated = Article.from_dict(result['article'])
+        article.summary = updated.summary
+        article.stage = updated.stage
+        values.append(result['value'])
+    return values
+
+
+_queue_instance = None
+_queue_lock = threading.Lock()
+
+
+def get_work_queue() -> WorkQueue:
+    """Get or create singleton instance of WorkQueue"""
+    global _queue_instance
+    with _queue_lock:
+        if _queue_instance is None:
+            _queue_instance = WorkQueue()
+            _queue_instance.prune()
+        return _queue_instance